@@ -0,0 +1,96 @@
+from typing import Annotated, Optional
+from fastapi import Header, HTTPException, Request
+from .services.delivery_zones import DeliveryZones
+from .services.quote_cache import QuoteCache
+from .services.venue_index import VenueGeoIndex
+from .services.venue_service import VenueService
+from .utils.admission import AdmissionController
+from .utils.deadline import Deadline
+from .utils.constants import (
+    REQUEST_DEADLINE_HEADER,
+    REQUEST_TIMEOUT,
+    REQUEST_TIMEOUT_MAX,
+    WEBHOOK_MAX_CLOCK_SKEW,
+    WEBHOOK_SECRET,
+)
+from .utils.webhook import verify_signature
+
+
+def get_venue_service(request: Request) -> VenueService:
+    """Return the application-wide VenueService created by the lifespan."""
+    venue_service = getattr(request.app.state, "venue_service", None)
+    if venue_service is None:
+        # Lifespan did not run (e.g. TestClient used without a context manager)
+        venue_service = VenueService()
+        request.app.state.venue_service = venue_service
+    return venue_service
+
+
+def get_quote_cache(request: Request) -> QuoteCache:
+    """Return the application-wide QuoteCache created by the lifespan."""
+    quote_cache = getattr(request.app.state, "quote_cache", None)
+    if quote_cache is None:
+        quote_cache = QuoteCache()
+        request.app.state.quote_cache = quote_cache
+    return quote_cache
+
+
+def get_venue_index(request: Request) -> VenueGeoIndex:
+    """Return the application-wide VenueGeoIndex created by the lifespan."""
+    venue_index = getattr(request.app.state, "venue_index", None)
+    if venue_index is None:
+        venue_index = VenueGeoIndex()
+        venue_index.attach(get_venue_service(request))
+        request.app.state.venue_index = venue_index
+    return venue_index
+
+
+def get_delivery_zones(request: Request) -> DeliveryZones:
+    """Return the application-wide DeliveryZones created by the lifespan."""
+    delivery_zones = getattr(request.app.state, "delivery_zones", None)
+    if delivery_zones is None:
+        delivery_zones = DeliveryZones()
+        delivery_zones.attach(get_venue_service(request))
+        request.app.state.delivery_zones = delivery_zones
+    return delivery_zones
+
+
+def get_admission_controller(request: Request) -> AdmissionController:
+    """Return the application-wide AdmissionController created by the lifespan."""
+    admission = getattr(request.app.state, "admission", None)
+    if admission is None:
+        # Unlimited until the lifespan installs the configured controller
+        admission = AdmissionController(max_concurrency=0, max_queue=0, queue_timeout=0)
+        request.app.state.admission = admission
+    return admission
+
+
+def get_deadline(
+    budget_ms: Annotated[Optional[str], Header(alias=REQUEST_DEADLINE_HEADER)] = None,
+) -> Deadline:
+    """Request deadline from the X-DOPC-Deadline-Ms header (milliseconds the
+    client is willing to wait), or DOPC_REQUEST_TIMEOUT by default."""
+    return Deadline.from_header(budget_ms, REQUEST_TIMEOUT, REQUEST_TIMEOUT_MAX)
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """Return once the client has closed the connection."""
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def verify_webhook_signature(
+    request: Request,
+    x_dopc_timestamp: Annotated[Optional[str], Header()] = None,
+    x_dopc_signature: Annotated[Optional[str], Header()] = None,
+) -> None:
+    """Reject internal webhook calls not signed with DOPC_WEBHOOK_SECRET."""
+    if not WEBHOOK_SECRET:
+        raise HTTPException(status_code=404, detail="Not Found")
+    verify_signature(
+        WEBHOOK_SECRET,
+        await request.body(),
+        x_dopc_timestamp,
+        x_dopc_signature,
+        WEBHOOK_MAX_CLOCK_SKEW,
+    )
@@ -1,17 +1,509 @@
-from typing import Annotated
-from fastapi import FastAPI, HTTPException, Query
-from .models import DeliveryQueryParams
+import asyncio
+from contextlib import asynccontextmanager
+from time import perf_counter
+from typing import Annotated, Optional
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import (
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from .dependencies import (
+    get_admission_controller,
+    get_deadline,
+    get_delivery_zones,
+    get_quote_cache,
+    get_venue_index,
+    get_venue_service,
+    verify_webhook_signature,
+    wait_for_disconnect,
+)
+from .models import (
+    BatchDeliveryPriceRequest,
+    BatchDeliveryPriceResponse,
+    DeliveryFeeMatrixRequest,
+    DeliveryFeeMatrixResponse,
+    DeliveryPriceResponse,
+    DeliveryQueryParams,
+    DeliveryZoneLookupResponse,
+    DeliveryZoneQueryParams,
+    NearbyVenuesQueryParams,
+    NearbyVenuesResponse,
+    VenueUpdateNotification,
+    VenueUpdateResponse,
+)
+from .services.batch_price_calculator import BatchPriceCalculator
 from .services.delivery_fee_calculator import DeliveryFeeCalculator
+from .services.delivery_zones import DeliveryZones, VenueZones
+from .services.fee_matrix import (
+    calculate_fee_matrix,
+    fee_matrix_to_dict,
+    stream_fee_matrix,
+)
+from .services.quote_cache import QuoteCache, etag_matches
+from .services.venue_index import VenueGeoIndex
+from .services.venue_service import VenueService
+from .services.venue_snapshot import VenueSnapshot
+from .services.warmup import VenueWarmup
+from .utils.admission import AdmissionController
+from .utils.cache_backends import create_cache_backend
+from .utils.concurrency import gather_or_cancel
+from .utils.constants import (
+    ADMISSION_MAX_CONCURRENCY,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_QUEUE_TIMEOUT,
+    ADMISSION_VENUE_SHARE,
+    CACHE_BACKEND_URL,
+    DELIVERY_ZONE_HTTP_MAX_AGE,
+    QUOTE_HTTP_MAX_AGE,
+    SERVER_DRAIN_TIMEOUT,
+    SNAPSHOT_INTERVAL,
+    SNAPSHOT_PATH,
+    VENUE_ENDPOINT,
+    WARMUP_VENUES,
+)
+from .utils.deadline import Deadline, run_with_deadline
+from .utils.fast_json import FastJSONResponse
+from .utils.http_client import HTTPClient
 from .utils.logging import logger
+from .utils.metrics import (
+    REGISTRY,
+    STAGE_LATENCY,
+    CallbackGauge,
+    MetricsMiddleware,
+)
+from .utils.resilience import BreakerState
 
-app = FastAPI(title="Delivery Order Price Calculator (DOPC)")
 
+def register_cache_metrics(
+    venue_service: VenueService, quote_cache: Optional[QuoteCache] = None
+) -> None:
+    """Expose VenueService (and quote cache) statistics, read at scrape time."""
 
-@app.get("/api/v1/delivery-order-price")
-async def handle_delivery_price(filter_query: Annotated[DeliveryQueryParams, Query()]):
+    def cache_stats():
+        stats = venue_service.cache_stats()
+        if quote_cache is not None:
+            stats["quote"] = quote_cache.stats()
+        return stats
+
+    def stat(name: str):
+        return lambda: {
+            (cache,): stats[name]
+            for cache, stats in cache_stats().items()
+            if name in stats
+        }
+
+    for name, documentation in (
+        ("hit_ratio", "Venue cache hit ratio (fresh and stale hits / lookups)"),
+        ("size", "Venue cache entries"),
+        ("evictions", "Venue cache LRU evictions"),
+    ):
+        REGISTRY.register(
+            CallbackGauge(f"dopc_cache_{name}", documentation, ("cache",), stat(name))
+        )
+
+
+def register_upstream_metrics(http_client: HTTPClient) -> None:
+    """Expose venue API circuit breaker state and retry budget."""
+    REGISTRY.register(
+        CallbackGauge(
+            "dopc_upstream_circuit_open",
+            "1 while the venue API circuit breaker for an endpoint is not closed",
+            ("endpoint",),
+            lambda: {
+                (kind,): int(breaker.state is not BreakerState.CLOSED)
+                for kind, breaker in http_client.breakers.items()
+            },
+        )
+    )
+    REGISTRY.register(
+        CallbackGauge(
+            "dopc_upstream_retry_budget_tokens",
+            "Retries the venue API client may still spend",
+            (),
+            lambda: {(): http_client.retry_budget.tokens},
+        )
+    )
+
+
+def register_admission_metrics(admission: AdmissionController) -> None:
+    """Expose admission control slots in use and queue depth."""
+    REGISTRY.register(
+        CallbackGauge(
+            "dopc_admission_active",
+            "Price requests holding an admission slot",
+            (),
+            lambda: {(): admission.active},
+        )
+    )
+    REGISTRY.register(
+        CallbackGauge(
+            "dopc_admission_queue_depth",
+            "Price requests waiting for an admission slot",
+            (),
+            lambda: {(): admission.queued},
+        )
+    )
+
+
+def create_admission_controller() -> AdmissionController:
+    # One venue may hold at most ADMISSION_VENUE_SHARE of slots and queue
+    share = ADMISSION_VENUE_SHARE
+    return AdmissionController(
+        max_concurrency=ADMISSION_MAX_CONCURRENCY,
+        max_queue=ADMISSION_MAX_QUEUE,
+        queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+        max_venue_concurrency=max(1, int(ADMISSION_MAX_CONCURRENCY * share)),
+        max_venue_queue=max(1, int(ADMISSION_MAX_QUEUE * share)),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client per worker, shared by every request
+    http_client = HTTPClient(VENUE_ENDPOINT)
+    shared_cache = create_cache_backend(CACHE_BACKEND_URL)
+    # Last known venue data from the previous run, restored on first use
+    snapshot = None
+    if SNAPSHOT_PATH:
+        snapshot = VenueSnapshot(SNAPSHOT_PATH)
+        snapshot.load()
+    venue_service = VenueService(
+        http_client, shared_cache=shared_cache, snapshot=snapshot
+    )
+    app.state.venue_service = venue_service
+    # Follows the venue caches, so it fills up as venues are fetched
+    venue_index = VenueGeoIndex()
+    venue_index.attach(venue_service)
+    app.state.venue_index = venue_index
+    delivery_zones = DeliveryZones()
+    delivery_zones.attach(venue_service)
+    app.state.delivery_zones = delivery_zones
+    quote_cache = QuoteCache()
+    app.state.quote_cache = quote_cache
+    register_cache_metrics(venue_service, quote_cache)
+    register_upstream_metrics(http_client)
+    admission = create_admission_controller()
+    app.state.admission = admission
+    register_admission_metrics(admission)
+    # Warm hot venues in the background; /health/ready reports 503 until done
+    warmup = VenueWarmup(venue_service, WARMUP_VENUES)
+    app.state.warmup = warmup
+    background_tasks = [asyncio.create_task(warmup.run())]
+    if snapshot is not None:
+        background_tasks.append(
+            asyncio.create_task(venue_service.run_snapshots(SNAPSHOT_INTERVAL))
+        )
     try:
-        calculator = DeliveryFeeCalculator(filter_query)
-        return await calculator.calculate_price()
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+        # Let in-flight venue fetches finish before closing the client
+        await venue_service.aclose(drain_timeout=SERVER_DRAIN_TIMEOUT)
+        if snapshot is not None:
+            # Deploys restart from what this worker knew last
+            await venue_service.save_snapshot()
+            snapshot.close()
+        await http_client.aclose()
+        if shared_cache is not None:
+            await shared_cache.aclose()
+        # Flush log records still queued for the background sink
+        await logger.complete()
+
+
+app = FastAPI(
+    title="Delivery Order Price Calculator (DOPC)",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+app.add_middleware(MetricsMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def handle_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/health/ready", include_in_schema=False)
+async def handle_readiness(request: Request) -> FastJSONResponse:
+    """Ready once startup warm-up has finished (successfully or not)."""
+    warmup = getattr(request.app.state, "warmup", None)
+    if warmup is None:
+        return FastJSONResponse({"ready": True})
+    progress = warmup.progress()
+    return FastJSONResponse(progress, status_code=200 if progress["ready"] else 503)
+
+
+@app.get("/api/v1/delivery-order-price", response_model=DeliveryPriceResponse)
+async def handle_delivery_price(
+    request: Request,
+    filter_query: Annotated[DeliveryQueryParams, Query()],
+    venue_service: Annotated[VenueService, Depends(get_venue_service)],
+    quote_cache: Annotated[QuoteCache, Depends(get_quote_cache)],
+    admission: Annotated[AdmissionController, Depends(get_admission_controller)],
+    deadline: Annotated[Deadline, Depends(get_deadline)],
+    if_none_match: Annotated[Optional[str], Header()] = None,
+):
+    """Identical requests (coordinates rounded) against unchanged venue data
+    are answered from the quote cache. Responses carry an ETag, and a
+    matching If-None-Match gets 304 Not Modified.
+
+    Under overload requests are queued briefly and then shed with 503 (429
+    when a single venue exceeds its share) and a Retry-After header.
+
+    Clients may send `X-DOPC-Deadline-Ms`; venue API calls only get the time
+    that is left, and the work is cancelled with 504 once it runs out, or
+    as soon as the client disconnects."""
+    start_time = getattr(request.state, "start_time", None)
+    if start_time is not None:
+        STAGE_LATENCY.observe(perf_counter() - start_time, "params")
+    return await run_with_deadline(
+        _admitted_delivery_price(
+            filter_query, venue_service, quote_cache, admission, deadline, if_none_match
+        ),
+        deadline,
+        lambda: wait_for_disconnect(request),
+    )
+
+
+async def _admitted_delivery_price(
+    filter_query: DeliveryQueryParams,
+    venue_service: VenueService,
+    quote_cache: QuoteCache,
+    admission: AdmissionController,
+    deadline: Deadline,
+    if_none_match: Optional[str],
+) -> Response:
+    async with admission.admit(filter_query.venue_slug, deadline.remaining()):
+        return await _delivery_price(
+            filter_query, venue_service, quote_cache, deadline, if_none_match
+        )
+
+
+async def _delivery_price(
+    filter_query: DeliveryQueryParams,
+    venue_service: VenueService,
+    quote_cache: QuoteCache,
+    deadline: Deadline,
+    if_none_match: Optional[str],
+) -> Response:
+    try:
+        calculator = DeliveryFeeCalculator(filter_query, venue_service, deadline)
+        static_data, dynamic_data = await calculator.fetch_venue_data(
+            filter_query.venue_slug
+        )
+        key = quote_cache.key(
+            filter_query,
+            static_data.location,
+            dynamic_data.delivery_specs.compiled.version,
+        )
+        memo = quote_cache.get(key)
+        if memo is None:
+            quote = calculator.quote_for_venue(static_data, dynamic_data)
+            # Serialize the internal quote directly, skipping response model validation
+            with STAGE_LATENCY.time("serialization"):
+                memo = quote_cache.put(key, quote)
+        headers = {
+            "ETag": memo.etag,
+            "Cache-Control": f"public, max-age={QUOTE_HTTP_MAX_AGE}",
+        }
+        if etag_matches(if_none_match, memo.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(memo.body, media_type="application/json", headers=headers)
     except HTTPException as e:
-        logger.error(f"Error processing request: {e.detail}")
+        logger.error("Error processing request: {}", e.detail)
         raise
+
+
+@app.post("/api/v1/delivery-order-price/batch")
+async def handle_batch_delivery_price(
+    batch: BatchDeliveryPriceRequest,
+    venue_service: Annotated[VenueService, Depends(get_venue_service)],
+) -> BatchDeliveryPriceResponse:
+    calculator = BatchPriceCalculator(batch.items, venue_service)
+    return BatchDeliveryPriceResponse(results=await calculator.calculate_prices())
+
+
+@app.post(
+    "/api/v1/venues/{venue_slug}/delivery-fee-matrix",
+    response_model=DeliveryFeeMatrixResponse,
+)
+async def handle_delivery_fee_matrix(
+    venue_slug: str,
+    points: DeliveryFeeMatrixRequest,
+    venue_service: Annotated[VenueService, Depends(get_venue_service)],
+    accept: Annotated[Optional[str], Header()] = None,
+):
+    """Delivery fees from one venue to many points.
+
+    Send `Accept: application/x-ndjson` to receive one JSON line per point,
+    streamed in chunks, instead of a single JSON document.
+    """
+    static_data, dynamic_data = await gather_or_cancel(
+        venue_service.get_venue_static(venue_slug),
+        venue_service.get_venue_dynamic(venue_slug),
+    )
+    if accept and "application/x-ndjson" in accept:
+        return StreamingResponse(
+            stream_fee_matrix(
+                static_data.location,
+                dynamic_data.delivery_specs,
+                points.user_lats,
+                points.user_lons,
+            ),
+            media_type="application/x-ndjson",
+        )
+    matrix = calculate_fee_matrix(
+        static_data.location,
+        dynamic_data.delivery_specs,
+        points.user_lats,
+        points.user_lons,
+    )
+    # Serialized directly: revalidating and re-encoding up to MATRIX_MAX_POINTS
+    # points through response_model would block the event loop far longer
+    # than computing them
+    return FastJSONResponse({"venue_slug": venue_slug, **fee_matrix_to_dict(matrix)})
+
+
+@app.get("/api/v1/venues/nearby", response_model=NearbyVenuesResponse)
+async def handle_nearby_venues(
+    query: Annotated[NearbyVenuesQueryParams, Query()],
+    venue_index: Annotated[VenueGeoIndex, Depends(get_venue_index)],
+):
+    """Venues that deliver to the point, each priced for the cart, sorted by
+    fee or distance.
+
+    Answered from the geo index of venues this worker has cached (fetched,
+    warmed up or pushed); venues it has never seen are not listed.
+    """
+    matches = venue_index.nearby(
+        query.user_lat, query.user_lon, query.cart_value, query.sort, query.limit
+    )
+    return FastJSONResponse(
+        {
+            "venues": [
+                {"venue_slug": match.venue_slug, **match.quote.to_dict()}
+                for match in matches
+            ]
+        }
+    )
+
+
+async def _venue_zones(
+    venue_slug: str,
+    venue_service: VenueService,
+    delivery_zones: DeliveryZones,
+    deadline: Deadline,
+) -> VenueZones:
+    # Venue data comes from the cache in the common case; zones are only
+    # rendered on the first request and when the venue's location or specs changed
+    static_data, dynamic_data = await gather_or_cancel(
+        venue_service.get_venue_static(venue_slug, deadline),
+        venue_service.get_venue_dynamic(venue_slug, deadline),
+    )
+    return delivery_zones.render(
+        venue_slug, static_data.location, dynamic_data.delivery_specs.compiled
+    )
+
+
+@app.get("/api/v1/venues/{venue_slug}/delivery-zones")
+async def handle_delivery_zones(
+    venue_slug: str,
+    venue_service: Annotated[VenueService, Depends(get_venue_service)],
+    delivery_zones: Annotated[DeliveryZones, Depends(get_delivery_zones)],
+    deadline: Annotated[Deadline, Depends(get_deadline)],
+    if_none_match: Annotated[Optional[str], Header()] = None,
+) -> Response:
+    """Fee tiers of the venue as a GeoJSON FeatureCollection, one ring
+    (Polygon with the inner circle as a hole) per distance range, with the
+    tier's fee band in its properties.
+
+    Responses carry an ETag that changes only with the venue's location or
+    delivery specs; a matching If-None-Match gets 304 Not Modified.
+    """
+    zones = await _venue_zones(venue_slug, venue_service, delivery_zones, deadline)
+    headers = {
+        "ETag": zones.etag,
+        "Cache-Control": f"public, max-age={DELIVERY_ZONE_HTTP_MAX_AGE}",
+    }
+    if etag_matches(if_none_match, zones.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(zones.body, media_type="application/geo+json", headers=headers)
+
+
+@app.get(
+    "/api/v1/venues/{venue_slug}/delivery-zones/lookup",
+    response_model=DeliveryZoneLookupResponse,
+)
+async def handle_delivery_zone_lookup(
+    venue_slug: str,
+    query: Annotated[DeliveryZoneQueryParams, Query()],
+    venue_service: Annotated[VenueService, Depends(get_venue_service)],
+    delivery_zones: Annotated[DeliveryZones, Depends(get_delivery_zones)],
+    deadline: Annotated[Deadline, Depends(get_deadline)],
+):
+    """Whether the venue delivers to the point, its fee and the fee tier it
+    falls in, from the venue's precomputed tiers. Unlike the price endpoint,
+    an undeliverable point is a normal answer, not a 400."""
+    zones = await _venue_zones(venue_slug, venue_service, delivery_zones, deadline)
+    match = zones.lookup(query.user_lat, query.user_lon)
+    return FastJSONResponse(
+        {
+            "venue_slug": venue_slug,
+            "deliverable": match.tier is not None,
+            "distance": match.distance,
+            "fee": match.fee,
+            "tier": match.tier._asdict() if match.tier is not None else None,
+        }
+    )
+
+
+@app.post(
+    "/internal/v1/venue-updates",
+    include_in_schema=False,
+    dependencies=[Depends(verify_webhook_signature)],
+)
+async def handle_venue_update(
+    notification: VenueUpdateNotification,
+    venue_service: Annotated[VenueService, Depends(get_venue_service)],
+) -> VenueUpdateResponse:
+    """Apply a venue change pushed by the venue platform.
+
+    Pushed data replaces this worker's cache and the shared cache at once,
+    so venue data can be cached with long TTLs. Other workers see the new
+    update stamp in the shared cache and drop their copy within
+    DOPC_SHARED_UPDATE_CHECK_INTERVAL; without a shared cache only this
+    worker is updated.
+    """
+    venue_slug = notification.venue_slug
+    if notification.dynamic is not None:
+        try:
+            notification.dynamic.delivery_specs.compiled
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid delivery specs: {e}")
+
+    replaced = []
+    for kind in ("static", "dynamic"):
+        value = getattr(notification, kind)
+        if value is not None:
+            await venue_service.replace_venue_data(kind, venue_slug, value)
+            replaced.append(kind)
+    invalidated = []
+    for kind in dict.fromkeys(notification.invalidate):
+        if kind not in replaced:
+            await venue_service.invalidate_venue_data(kind, venue_slug)
+            invalidated.append(kind)
+
+    logger.info(
+        "Venue update for {}: replaced={}, invalidated={}",
+        venue_slug,
+        replaced,
+        invalidated,
+    )
+    return VenueUpdateResponse(
+        venue_slug=venue_slug, replaced=replaced, invalidated=invalidated
+    )
@@ -1,6 +1,25 @@
+from .compiled_specs import CompiledDeliverySpecs, DistanceFees
 from .coordinates import GPSCoordinates
 from .external_api_mapping import VenueStatic, VenueDynamic, DeliverySpecs, DistanceRange
-from .http_info import DeliveryQueryParams, DeliveryPriceResponse, DeliveryFeeInfo
+from .http_info import (
+    DeliveryQueryParams,
+    DeliveryPriceResponse,
+    DeliveryFeeInfo,
+    BatchDeliveryPriceRequest,
+    BatchDeliveryPriceItem,
+    BatchDeliveryPriceResponse,
+    DeliveryFeeMatrixRequest,
+    DeliveryFeeMatrixResponse,
+    VenueUpdateNotification,
+    VenueUpdateResponse,
+    NearbyVenuesQueryParams,
+    NearbyVenue,
+    NearbyVenuesResponse,
+    DeliveryZoneQueryParams,
+    FeeTierInfo,
+    DeliveryZoneLookupResponse,
+)
+from .quote import PriceQuote
 
 __all__ = [
     'DeliveryQueryParams',
@@ -10,5 +29,21 @@ __all__ = [
     'VenueDynamic',
     'DeliverySpecs',
     'DistanceRange',
-    'DeliveryFeeInfo'
+    'DeliveryFeeInfo',
+    'BatchDeliveryPriceRequest',
+    'BatchDeliveryPriceItem',
+    'BatchDeliveryPriceResponse',
+    'DeliveryFeeMatrixRequest',
+    'DeliveryFeeMatrixResponse',
+    'VenueUpdateNotification',
+    'VenueUpdateResponse',
+    'NearbyVenuesQueryParams',
+    'NearbyVenue',
+    'NearbyVenuesResponse',
+    'DeliveryZoneQueryParams',
+    'FeeTierInfo',
+    'DeliveryZoneLookupResponse',
+    'CompiledDeliverySpecs',
+    'DistanceFees',
+    'PriceQuote',
 ]
\ No newline at end of file
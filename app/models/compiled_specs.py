@@ -0,0 +1,141 @@
+import hashlib
+from bisect import bisect_right
+from typing import TYPE_CHECKING, NamedTuple, Optional, Tuple
+import numpy as np
+from numpy.typing import ArrayLike
+from app.utils.constants import DISTANCE_FEE_DIVISOR
+
+if TYPE_CHECKING:
+    from .external_api_mapping import DeliverySpecs
+
+
+"""Delivery specs compiled for fast fee lookups.
+
+The venue API sends distance ranges as a list of objects. For pricing we
+only need sorted boundaries, so they are compiled once per venue into
+parallel tuples (min, max, a, b) and searched with bisect. Validation of the
+range layout happens once, at compile time.
+"""
+
+
+class DistanceFees(NamedTuple):
+    """Bulk lookup result; `fees` is only meaningful where `available`."""
+    fees: np.ndarray
+    available: np.ndarray
+
+
+class CompiledDeliverySpecs:
+    __slots__ = (
+        "order_minimum_no_surcharge",
+        "base_price",
+        "mins",
+        "maxs",
+        "a",
+        "b",
+        "max_allowed_distance",
+        "version",
+        "_arrays",
+    )
+
+    def __init__(
+        self,
+        order_minimum_no_surcharge: int,
+        base_price: int,
+        mins: Tuple[int, ...],
+        maxs: Tuple[int, ...],
+        a: Tuple[int, ...],
+        b: Tuple[int, ...],
+    ):
+        self.order_minimum_no_surcharge = order_minimum_no_surcharge
+        self.base_price = base_price
+        self.mins = mins
+        self.maxs = maxs
+        self.a = a
+        self.b = b
+        self.max_allowed_distance = mins[-1]
+        # Content hash: identical specs refetched from upstream keep the version
+        self.version = hashlib.blake2b(
+            repr((order_minimum_no_surcharge, base_price, mins, maxs, a, b)).encode(),
+            digest_size=8,
+        ).hexdigest()
+        self._arrays = None
+
+    @classmethod
+    def compile(cls, delivery_specs: "DeliverySpecs") -> "CompiledDeliverySpecs":
+        """Validate and compile distance ranges.
+
+        Ranges must be sorted by `min`, and each range except the last must
+        end exactly where the next one starts (no gaps, no overlaps). The
+        last range may have max 0, meaning "delivery not available".
+
+        Raises:
+            ValueError: if the ranges are empty, unsorted, overlap or leave gaps
+        """
+        ranges = delivery_specs.distance_ranges
+        if not ranges:
+            raise ValueError("Delivery specs have no distance ranges")
+        for current, following in zip(ranges, ranges[1:]):
+            if current.max <= current.min:
+                raise ValueError(
+                    f"Distance range {current.min}-{current.max} is empty or reversed"
+                )
+            if current.max < following.min:
+                raise ValueError(
+                    f"Gap between distance ranges at {current.max}-{following.min}m"
+                )
+            if current.max > following.min:
+                raise ValueError(
+                    f"Distance ranges overlap at {following.min}-{current.max}m"
+                )
+        return cls(
+            order_minimum_no_surcharge=delivery_specs.order_minimum_no_surcharge,
+            base_price=delivery_specs.base_price,
+            mins=tuple(r.min for r in ranges),
+            maxs=tuple(r.max for r in ranges),
+            a=tuple(r.a for r in ranges),
+            b=tuple(r.b for r in ranges),
+        )
+
+    def find_range_index(self, distance: int) -> Optional[int]:
+        """Index of the range with min <= distance < max, or None."""
+        index = bisect_right(self.mins, distance) - 1
+        if index < 0 or distance >= self.maxs[index]:
+            return None
+        return index
+
+    def distance_fee(self, distance: int) -> Optional[int]:
+        """Delivery fee (base price + a + b * distance / 10), or None if no
+        range applies."""
+        index = self.find_range_index(distance)
+        if index is None:
+            return None
+        return (
+            self.base_price
+            + self.a[index]
+            + round(self.b[index] * distance / DISTANCE_FEE_DIVISOR)
+        )
+
+    def distance_fees(self, distances: ArrayLike) -> DistanceFees:
+        """Vectorized `distance_fee`, also applying `max_allowed_distance`."""
+        if self._arrays is None:
+            self._arrays = tuple(
+                np.asarray(values, dtype=np.int64)
+                for values in (self.mins, self.maxs, self.a, self.b)
+            )
+        mins, maxs, a, b = self._arrays
+        distances = np.asarray(distances, dtype=np.int64)
+
+        index = np.searchsorted(mins, distances, side="right") - 1
+        safe_index = np.maximum(index, 0)
+        available = (
+            (index >= 0)
+            & (distances < maxs[safe_index])
+            & (distances < self.max_allowed_distance)
+        )
+        # np.rint rounds half to even, like round()
+        fees = (
+            self.base_price
+            + a[safe_index]
+            + np.rint(b[safe_index] * distances / DISTANCE_FEE_DIVISOR).astype(np.int64)
+        )
+        return DistanceFees(fees=np.where(available, fees, 0), available=available)
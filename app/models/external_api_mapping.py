@@ -1,5 +1,7 @@
+from functools import cached_property
 from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
+from .compiled_specs import CompiledDeliverySpecs
 from .coordinates import GPSCoordinates
 
 """Models mapping Venue API responses.
@@ -31,6 +33,12 @@ class DeliverySpecs(BaseModel):
     @property
     def max_allowed_distance(self) -> int:
         return self.distance_ranges[-1].min
+
+    @cached_property
+    def compiled(self) -> CompiledDeliverySpecs:
+        """Compiled once per instance, so cached venues compile once.
+        Raises ValueError if the distance ranges are invalid."""
+        return CompiledDeliverySpecs.compile(self)
     
 class VenueStatic(BaseModel):
     location: GPSCoordinates
@@ -1,6 +1,16 @@
+from typing import Annotated, List, Literal, Optional
 from .coordinates import GPSCoordinates
-from pydantic import BaseModel, ConfigDict, Field
-from app.utils.constants import MIN_LAT, MIN_LON, MAX_LAT, MAX_LON
+from .external_api_mapping import VenueDynamic, VenueStatic
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from app.utils.constants import (
+    MIN_LAT,
+    MIN_LON,
+    MAX_LAT,
+    MAX_LON,
+    BATCH_MAX_ITEMS,
+    MATRIX_MAX_POINTS,
+    NEARBY_MAX_RESULTS,
+)
 
 
 class DeliveryQueryParams(BaseModel):
@@ -59,3 +69,177 @@ class DeliveryPriceResponse(BaseModel):
             }
         }
     )
+
+
+class BatchDeliveryPriceRequest(BaseModel):
+    """HTTP body for pricing many orders in one call.
+
+    Attributes:
+        items (List[DeliveryQueryParams]): Orders to price, any mix of venues
+    """
+
+    model_config = {"extra": "forbid"}
+
+    items: List[DeliveryQueryParams] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+class BatchDeliveryPriceItem(BaseModel):
+    """Outcome for one batch item: either a price or an error.
+
+    Attributes:
+        status_code (int): HTTP status the single-order endpoint would return
+        result (DeliveryPriceResponse): Price, set when status_code is 200
+        detail (str): Error description, set otherwise
+    """
+    status_code: int = Field(..., description="Per-item HTTP status code")
+    result: Optional[DeliveryPriceResponse] = None
+    detail: Optional[str] = None
+
+
+class BatchDeliveryPriceResponse(BaseModel):
+    """HTTP response for batch price calculation, in request order."""
+    results: List[BatchDeliveryPriceItem]
+
+
+Latitude = Annotated[float, Field(ge=MIN_LAT, le=MAX_LAT)]
+Longitude = Annotated[float, Field(ge=MIN_LON, le=MAX_LON)]
+
+
+class DeliveryFeeMatrixRequest(BaseModel):
+    """HTTP body for fees from one venue to many user points.
+
+    Attributes:
+        user_lats (List[float]): User latitudes
+        user_lons (List[float]): User longitudes, same length as user_lats
+    """
+
+    model_config = {"extra": "forbid"}
+
+    user_lats: List[Latitude] = Field(min_length=1, max_length=MATRIX_MAX_POINTS)
+    user_lons: List[Longitude] = Field(min_length=1, max_length=MATRIX_MAX_POINTS)
+
+    @model_validator(mode="after")
+    def check_same_length(self) -> "DeliveryFeeMatrixRequest":
+        if len(self.user_lats) != len(self.user_lons):
+            raise ValueError("user_lats and user_lons must have the same length")
+        return self
+
+
+class DeliveryFeeMatrixResponse(BaseModel):
+    """HTTP response with parallel arrays, one element per requested point.
+
+    Attributes:
+        venue_slug (str): Venue the fees are calculated for
+        distances (List[int]): Straight line distance in meters
+        fees (List[Optional[int]]): Delivery fee in cents, null if unavailable
+        available (List[bool]): Whether delivery is possible to the point
+    """
+    venue_slug: str
+    distances: List[int]
+    fees: List[Optional[int]]
+    available: List[bool]
+
+
+class NearbyVenuesQueryParams(BaseModel):
+    """HTTP query parameters for venues that deliver to a point.
+
+    Attributes:
+        cart_value (int): Order value in cents, used to price each venue
+        user_lat (float): User latitude (-90 to +90)
+        user_lon (float): User longitude (-180 to +180)
+        sort (str): "fee" (cheapest first) or "distance" (closest first)
+        limit (int): Maximum number of venues returned
+    """
+
+    model_config = {"extra": "forbid"}
+
+    cart_value: int = Field(ge=0)
+    user_lat: float = Field(ge=MIN_LAT, le=MAX_LAT)
+    user_lon: float = Field(ge=MIN_LON, le=MAX_LON)
+    sort: Literal["fee", "distance"] = "fee"
+    limit: int = Field(default=20, ge=1, le=NEARBY_MAX_RESULTS)
+
+
+class NearbyVenue(DeliveryPriceResponse):
+    """Price of the order at one venue that delivers to the point."""
+    venue_slug: str
+
+
+class NearbyVenuesResponse(BaseModel):
+    """Venues that deliver to the point, in the requested order."""
+    venues: List[NearbyVenue]
+
+
+class DeliveryZoneQueryParams(BaseModel):
+    """HTTP query parameters for the fee tier of a user point.
+
+    Attributes:
+        user_lat (float): User latitude (-90 to +90)
+        user_lon (float): User longitude (-180 to +180)
+    """
+
+    model_config = {"extra": "forbid"}
+
+    user_lat: float = Field(ge=MIN_LAT, le=MAX_LAT)
+    user_lon: float = Field(ge=MIN_LON, le=MAX_LON)
+
+
+class FeeTierInfo(BaseModel):
+    """Distance range of a venue and the fees charged within it."""
+    index: int = Field(..., description="Position in the venue's distance ranges")
+    min_distance: int = Field(..., description="Inner radius in meters (inclusive)")
+    max_distance: int = Field(..., description="Outer radius in meters (exclusive)")
+    min_fee: int = Field(..., description="Lowest delivery fee in the tier, in cents")
+    max_fee: int = Field(..., description="Highest delivery fee in the tier, in cents")
+
+
+class DeliveryZoneLookupResponse(BaseModel):
+    """Whether the venue delivers to the point, and in which fee tier.
+
+    Attributes:
+        venue_slug (str): Venue the point was checked against
+        deliverable (bool): Whether delivery to the point is available
+        distance (int): Straight line distance in meters
+        fee (int): Delivery fee in cents, null if not deliverable
+        tier (FeeTierInfo): Fee tier containing the point, null if not deliverable
+    """
+    venue_slug: str
+    deliverable: bool
+    distance: int
+    fee: Optional[int] = None
+    tier: Optional[FeeTierInfo] = None
+
+
+VenueDataKind = Literal["static", "dynamic"]
+
+
+class VenueUpdateNotification(BaseModel):
+    """Venue change pushed by the venue platform.
+
+    Attributes:
+        venue_slug (str): Venue that changed
+        static (VenueStatic): New static data (location), replaces the cache
+        dynamic (VenueDynamic): New delivery specs, replaces the cache
+        invalidate (List[str]): Kinds to drop without a replacement, fetched
+            again on next use
+    """
+
+    model_config = {"extra": "forbid"}
+
+    venue_slug: str = Field(min_length=1)
+    static: Optional[VenueStatic] = None
+    dynamic: Optional[VenueDynamic] = None
+    invalidate: List[VenueDataKind] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "VenueUpdateNotification":
+        if self.static is None and self.dynamic is None and not self.invalidate:
+            raise ValueError("Notification must replace or invalidate something")
+        return self
+
+
+class VenueUpdateResponse(BaseModel):
+    """Outcome of a venue update notification."""
+    venue_slug: str
+    replaced: List[VenueDataKind]
+    invalidated: List[VenueDataKind]
@@ -0,0 +1,34 @@
+from dataclasses import dataclass
+from .http_info import DeliveryFeeInfo, DeliveryPriceResponse
+
+
+@dataclass(slots=True)
+class PriceQuote:
+    """Internal result of pricing one order.
+
+    The request pipeline works with this plain slotted dataclass; the
+    Pydantic DeliveryPriceResponse is only built at the HTTP boundary when a
+    model is actually needed (`to_dict` is enough for a JSON response).
+    """
+    total_price: int
+    small_order_surcharge: int
+    cart_value: int
+    fee: int
+    distance: int
+
+    def to_dict(self) -> dict:
+        """Same shape as DeliveryPriceResponse.model_dump()"""
+        return {
+            "total_price": self.total_price,
+            "small_order_surcharge": self.small_order_surcharge,
+            "cart_value": self.cart_value,
+            "delivery": {"fee": self.fee, "distance": self.distance},
+        }
+
+    def to_response(self) -> DeliveryPriceResponse:
+        return DeliveryPriceResponse(
+            total_price=self.total_price,
+            small_order_surcharge=self.small_order_surcharge,
+            cart_value=self.cart_value,
+            delivery=DeliveryFeeInfo(fee=self.fee, distance=self.distance),
+        )
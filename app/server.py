@@ -0,0 +1,130 @@
+"""Production entry point: `python -m app.server`.
+
+Runs uvicorn with one worker process per usable CPU core (or DOPC_WORKERS),
+uvloop and httptools when installed, graceful shutdown and optional worker
+recycling. Every setting comes from a DOPC_* environment variable, see
+app/utils/constants.py.
+"""
+import importlib.util
+import math
+import os
+from typing import Any, Dict, List, Optional
+
+from .utils.constants import (
+    CACHE_BACKEND_URL,
+    LOG_LEVEL,
+    SERVER_ACCESS_LOG,
+    SERVER_BACKLOG,
+    SERVER_GRACEFUL_SHUTDOWN_TIMEOUT,
+    SERVER_HOST,
+    SERVER_HTTP,
+    SERVER_KEEPALIVE_TIMEOUT,
+    SERVER_LIMIT_MAX_REQUESTS,
+    SERVER_LOOP,
+    SERVER_PORT,
+    SERVER_RELOAD,
+    SERVER_WORKERS,
+    WEBHOOK_SECRET,
+)
+from .utils.logging import logger
+
+APP = "app.main:app"
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+UVICORN_LOG_LEVELS = ("critical", "error", "warning", "info", "debug", "trace")
+
+
+def cgroup_cpu_limit(path: str = CGROUP_CPU_MAX) -> Optional[float]:
+    """CPU quota of the container (cgroup v2), or None if unlimited."""
+    try:
+        with open(path) as f:
+            quota, period = f.read().split()[:2]
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    try:
+        return int(quota) / int(period)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def available_cpus(cgroup_path: str = CGROUP_CPU_MAX) -> int:
+    """Cores this process may run on, capped by the container CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit(cgroup_path)
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+
+def resolve_workers(value: str) -> int:
+    if value.strip().lower() == "auto":
+        return available_cpus()
+    workers = int(value)
+    if workers <= 0:
+        raise ValueError("DOPC_WORKERS must be positive or 'auto'")
+    return workers
+
+
+def _implementation(value: str, preferred: str, fallback: str) -> str:
+    """Pick `preferred` for "auto" when its module is installed."""
+    if value != "auto":
+        return value
+    return preferred if importlib.util.find_spec(preferred) else fallback
+
+
+def server_config() -> Dict[str, Any]:
+    """Keyword arguments for uvicorn.run()."""
+    # Reload watches files in a single process and cannot run workers
+    workers = 1 if SERVER_RELOAD else resolve_workers(SERVER_WORKERS)
+    return {
+        "app": APP,
+        "host": SERVER_HOST,
+        "port": SERVER_PORT,
+        "workers": workers,
+        "reload": SERVER_RELOAD,
+        "loop": _implementation(SERVER_LOOP, "uvloop", "asyncio"),
+        "http": _implementation(SERVER_HTTP, "httptools", "h11"),
+        # In-flight requests get this long after SIGTERM, then lifespan
+        # shutdown drains venue fetches (DOPC_DRAIN_TIMEOUT)
+        "timeout_graceful_shutdown": SERVER_GRACEFUL_SHUTDOWN_TIMEOUT,
+        # A worker exits after this many requests and is replaced by a fresh one
+        "limit_max_requests": SERVER_LIMIT_MAX_REQUESTS or None,
+        "timeout_keep_alive": SERVER_KEEPALIVE_TIMEOUT,
+        "backlog": SERVER_BACKLOG,
+        "access_log": SERVER_ACCESS_LOG,
+        # loguru-only levels such as SUCCESS fall back to info
+        "log_level": (
+            LOG_LEVEL.lower() if LOG_LEVEL.lower() in UVICORN_LOG_LEVELS else "info"
+        ),
+        "proxy_headers": True,
+    }
+
+
+def worker_warnings(workers: int) -> List[str]:
+    """Settings that do not work as expected with `workers` processes."""
+    warnings = []
+    shared_cache = CACHE_BACKEND_URL and not CACHE_BACKEND_URL.startswith("memory:")
+    if workers > 1 and WEBHOOK_SECRET and not shared_cache:
+        warnings.append(
+            "Venue updates are pushed to a single worker and reach the others "
+            "only through a shared cache; set DOPC_CACHE_BACKEND_URL to a file "
+            "or redis backend, or run DOPC_WORKERS=1"
+        )
+    return warnings
+
+
+def main() -> None:
+    import uvicorn
+
+    config = server_config()
+    for warning in worker_warnings(config["workers"]):
+        logger.warning(warning)
+    uvicorn.run(**config)
+
+
+if __name__ == "__main__":
+    main()
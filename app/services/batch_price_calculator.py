@@ -0,0 +1,81 @@
+import asyncio
+from typing import Dict, List, Tuple, Union
+from fastapi import HTTPException
+from app.models import (
+    BatchDeliveryPriceItem,
+    DeliveryQueryParams,
+    VenueDynamic,
+    VenueStatic,
+)
+from app.utils.concurrency import gather_or_cancel
+from app.utils.constants import BATCH_VENUE_CONCURRENCY
+from app.utils.logging import logger
+from .delivery_fee_calculator import DeliveryFeeCalculator
+from .venue_service import VenueService
+
+VenueData = Tuple[VenueStatic, VenueDynamic]
+
+
+class BatchPriceCalculator:
+    """Prices many orders at once.
+
+    Items are grouped by venue so each venue's data is fetched once, with at
+    most `max_concurrency` venues fetched at a time. A failure for one venue
+    or one item is reported for that item only; results keep input order.
+    """
+
+    def __init__(
+        self,
+        items: List[DeliveryQueryParams],
+        venue_service: VenueService,
+        max_concurrency: int = BATCH_VENUE_CONCURRENCY,
+    ):
+        self.items = items
+        self.venue_service = venue_service
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_venue(self, venue_slug: str) -> Union[VenueData, HTTPException]:
+        async with self._semaphore:
+            try:
+                return tuple(
+                    await gather_or_cancel(
+                        self.venue_service.get_venue_static(venue_slug),
+                        self.venue_service.get_venue_dynamic(venue_slug),
+                    )
+                )
+            except HTTPException as e:
+                logger.error(
+                    "HTTP error fetching venue data for {}: {}", venue_slug, e.detail
+                )
+                return e
+
+    async def fetch_venues(self) -> Dict[str, Union[VenueData, HTTPException]]:
+        # Unique venues in first-seen order
+        venue_slugs = list(dict.fromkeys(item.venue_slug for item in self.items))
+        venue_data = await asyncio.gather(
+            *(self.fetch_venue(venue_slug) for venue_slug in venue_slugs)
+        )
+        return dict(zip(venue_slugs, venue_data))
+
+    @staticmethod
+    def _error_item(error: HTTPException) -> BatchDeliveryPriceItem:
+        return BatchDeliveryPriceItem(status_code=error.status_code, detail=error.detail)
+
+    async def calculate_prices(self) -> List[BatchDeliveryPriceItem]:
+        venue_data = await self.fetch_venues()
+        results = []
+        for item in self.items:
+            data = venue_data[item.venue_slug]
+            if isinstance(data, HTTPException):
+                results.append(self._error_item(data))
+                continue
+            calculator = DeliveryFeeCalculator(item, self.venue_service)
+            try:
+                quote = calculator.quote_for_venue(*data)
+            except HTTPException as e:
+                results.append(self._error_item(e))
+                continue
+            results.append(
+                BatchDeliveryPriceItem(status_code=200, result=quote.to_response())
+            )
+        return results
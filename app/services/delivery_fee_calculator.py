@@ -1,19 +1,34 @@
+from time import perf_counter
+from typing import Optional
 from fastapi import HTTPException
 from app.models import (
     DeliveryPriceResponse,
     DeliveryQueryParams,
     GPSCoordinates,
+    PriceQuote,
+    VenueDynamic,
+    VenueStatic,
 )
 from .distance_calculator import DistanceCalculator
-from .total_fee_calculator import total_fee_calculator
+from .total_fee_calculator import calculate_quote
 from .venue_service import VenueService
-from app.utils.logging import logger
+from app.utils.concurrency import gather_or_cancel
+from app.utils.deadline import Deadline
+from app.utils.logging import logger, request_logger
+from app.utils.metrics import STAGE_LATENCY, timed_stage
 
 
 class DeliveryFeeCalculator:
-    def __init__(self, filter_query: DeliveryQueryParams):
+    def __init__(
+        self,
+        filter_query: DeliveryQueryParams,
+        venue_service: Optional[VenueService] = None,
+        deadline: Optional[Deadline] = None,
+    ):
         self.filter_query = filter_query
-        self.venue_service = VenueService()
+        self.venue_service = venue_service or VenueService()
+        # Bounds the venue API calls made for this request
+        self.deadline = deadline
 
     async def read_params(self) -> tuple[DeliveryQueryParams, GPSCoordinates]:
         user_location = self.filter_query.to_gps_coordinates()
@@ -21,15 +36,23 @@ class DeliveryFeeCalculator:
 
     async def fetch_venue_data(self, venue_slug: str):
         try:
-            static_data = await self.venue_service.get_venue_static(venue_slug)
-            dynamic_data = await self.venue_service.get_venue_dynamic(venue_slug)
-            logger.info(
-                f"Fetched venue data: static={static_data}, dynamic={dynamic_data}"
+            static_data, dynamic_data = await gather_or_cancel(
+                timed_stage(
+                    "static_fetch",
+                    self.venue_service.get_venue_static(venue_slug, self.deadline),
+                ),
+                timed_stage(
+                    "dynamic_fetch",
+                    self.venue_service.get_venue_dynamic(venue_slug, self.deadline),
+                ),
+            )
+            request_logger.info(
+                "Fetched venue data: static={}, dynamic={}", static_data, dynamic_data
             )
             return static_data, dynamic_data
 
         except HTTPException as e:
-            logger.error(f"HTTP error fetching venue data: {str(e)}")
+            logger.error("HTTP error fetching venue data: {}", e)
             raise
 
     async def valid_delivery_distance(
@@ -38,15 +61,28 @@ class DeliveryFeeCalculator:
         venue_location: GPSCoordinates,
         max_allowed_distance: int,
     ) -> int:
+        return self.check_delivery_distance(
+            user_location.latitude,
+            user_location.longitude,
+            venue_location,
+            max_allowed_distance,
+        )
 
-        if user_location == venue_location:
-            logger.info("User at venue location, distance: 0m")
+    @staticmethod
+    def check_delivery_distance(
+        user_lat: float,
+        user_lon: float,
+        venue_location: GPSCoordinates,
+        max_allowed_distance: int,
+    ) -> int:
+        """Distance from the venue to the user, raising 400 if it is too long."""
+        venue_lat, venue_lon = venue_location.latitude, venue_location.longitude
+        if user_lat == venue_lat and user_lon == venue_lon:
+            request_logger.info("User at venue location, distance: 0m")
             return 0
 
-        distance = DistanceCalculator.calculate_straight_line(
-            venue_location, user_location
-        )
-        logger.info(f"Calculated delivery distance: {distance}m")
+        distance = DistanceCalculator.haversine(venue_lat, venue_lon, user_lat, user_lon)
+        request_logger.info("Calculated delivery distance: {}m", distance)
 
         if distance >= max_allowed_distance:
             raise HTTPException(
@@ -56,19 +92,45 @@ class DeliveryFeeCalculator:
 
         return distance
 
-    async def calculate_price(self) -> DeliveryPriceResponse:
+    async def calculate_quote(self) -> PriceQuote:
+        """Fetch venue data and price the query (internal, model-free)."""
         try:
-            params, user_location = await self.read_params()
-            static_data, dynamic_data = await self.fetch_venue_data(params.venue_slug)
-            distance = await self.valid_delivery_distance(
-                user_location,
-                static_data.location,
-                dynamic_data.delivery_specs.max_allowed_distance,
+            static_data, dynamic_data = await self.fetch_venue_data(
+                self.filter_query.venue_slug
             )
-            result = await total_fee_calculator(
-                params.cart_value, dynamic_data.delivery_specs, distance
-            )
-            return result
+            return self.quote_for_venue(static_data, dynamic_data)
         except HTTPException as e:
-            logger.error(f"Error calculating delivery price: {str(e)}")
+            logger.error("Error calculating delivery price: {}", e)
             raise
+
+    def quote_for_venue(
+        self, static_data: VenueStatic, dynamic_data: VenueDynamic
+    ) -> PriceQuote:
+        """Price the query against already fetched venue data.
+
+        Reads the user position straight from the query params and the
+        pricing tables from the venue's compiled specs, so no intermediate
+        Pydantic models are created per request.
+        """
+        compiled_specs = dynamic_data.delivery_specs.compiled
+        start = perf_counter()
+        distance = self.check_delivery_distance(
+            self.filter_query.user_lat,
+            self.filter_query.user_lon,
+            static_data.location,
+            compiled_specs.max_allowed_distance,
+        )
+        distance_done = perf_counter()
+        STAGE_LATENCY.observe(distance_done - start, "distance")
+        quote = calculate_quote(self.filter_query.cart_value, compiled_specs, distance)
+        STAGE_LATENCY.observe(perf_counter() - distance_done, "fee")
+        return quote
+
+    async def calculate_price(self) -> DeliveryPriceResponse:
+        quote = await self.calculate_quote()
+        return quote.to_response()
+
+    async def calculate_price_for_venue(
+        self, static_data: VenueStatic, dynamic_data: VenueDynamic
+    ) -> DeliveryPriceResponse:
+        return self.quote_for_venue(static_data, dynamic_data).to_response()
@@ -0,0 +1,196 @@
+import hashlib
+import math
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from app.models import CompiledDeliverySpecs, GPSCoordinates
+from app.utils.constants import DELIVERY_ZONE_RING_POINTS, EARTH_RADIUS
+from app.utils.fast_json import dumps
+from .distance_calculator import DistanceCalculator
+from .venue_follower import VenueFollower, same_venue_data
+
+
+class FeeTier(NamedTuple):
+    """One priced distance range: the ring min_distance <= d < max_distance
+    around the venue, and the lowest and highest fee charged inside it."""
+    index: int
+    min_distance: int
+    max_distance: int
+    min_fee: int
+    max_fee: int
+
+
+class ZoneMatch(NamedTuple):
+    """Where a user point falls; `tier` and `fee` are None when the venue
+    does not deliver there."""
+    distance: int
+    tier: Optional[FeeTier]
+    fee: Optional[int]
+
+
+class VenueZones(NamedTuple):
+    """Fee tiers of one venue, with the GeoJSON rendering built once."""
+    venue_slug: str
+    latitude: float
+    longitude: float
+    specs: CompiledDeliverySpecs
+    tiers: Tuple[FeeTier, ...]
+    body: bytes
+    etag: str
+
+    def lookup(self, latitude: float, longitude: float) -> ZoneMatch:
+        """Tier and fee for a user point, with the same distance and fee as
+        the price endpoint."""
+        distance = DistanceCalculator.haversine(
+            self.latitude, self.longitude, latitude, longitude
+        )
+        index = self.specs.find_range_index(distance)
+        if distance >= self.specs.max_allowed_distance or index is None:
+            return ZoneMatch(distance, None, None)
+        return ZoneMatch(distance, self.tiers[index], self.specs.distance_fee(distance))
+
+
+def fee_tiers(specs: CompiledDeliverySpecs) -> Tuple[FeeTier, ...]:
+    """Tiers for every range below `max_allowed_distance`.
+
+    The fee is linear in the distance within a range, so its extremes are
+    at the first and the last whole meter of the range.
+    """
+    tiers = []
+    for index, (low, high) in enumerate(zip(specs.mins, specs.maxs)):
+        if low >= specs.max_allowed_distance:
+            break
+        edge_fees = (specs.distance_fee(low), specs.distance_fee(high - 1))
+        tiers.append(FeeTier(index, low, high, min(edge_fees), max(edge_fees)))
+    return tuple(tiers)
+
+
+def circle(
+    latitude: float, longitude: float, radius: float, points: int, clockwise: bool
+) -> List[List[float]]:
+    """Closed GeoJSON ring ([lon, lat] pairs) approximating a circle of
+    `radius` meters. Longitudes are not wrapped, so rings crossing the
+    antimeridian stay continuous."""
+    lat1 = math.radians(latitude)
+    angular = radius / EARTH_RADIUS
+    sin_lat1, cos_lat1 = math.sin(lat1), math.cos(lat1)
+    sin_ang, cos_ang = math.sin(angular), math.cos(angular)
+    ring = []
+    for step in range(points):
+        # Bearing from north; counterclockwise on a map means decreasing bearing
+        bearing = 2 * math.pi * step / points
+        if not clockwise:
+            bearing = -bearing
+        sin_lat2 = sin_lat1 * cos_ang + cos_lat1 * sin_ang * math.cos(bearing)
+        lat2 = math.asin(sin_lat2)
+        lon_delta = math.atan2(
+            math.sin(bearing) * sin_ang * cos_lat1, cos_ang - sin_lat1 * sin_lat2
+        )
+        ring.append(
+            [round(longitude + math.degrees(lon_delta), 6), round(math.degrees(lat2), 6)]
+        )
+    ring.append(ring[0])
+    return ring
+
+
+def zones_geojson(
+    venue_slug: str,
+    location: GPSCoordinates,
+    specs: CompiledDeliverySpecs,
+    tiers: Tuple[FeeTier, ...],
+    points: int = DELIVERY_ZONE_RING_POINTS,
+) -> dict:
+    """FeatureCollection with one ring-shaped Polygon per fee tier (a disc
+    for a tier starting at the venue)."""
+    features = []
+    for tier in tiers:
+        rings = [
+            circle(location.latitude, location.longitude, tier.max_distance, points, False)
+        ]
+        if tier.min_distance > 0:
+            rings.append(
+                circle(
+                    location.latitude, location.longitude, tier.min_distance, points, True
+                )
+            )
+        features.append(
+            {
+                "type": "Feature",
+                "geometry": {"type": "Polygon", "coordinates": rings},
+                "properties": tier._asdict(),
+            }
+        )
+    return {
+        "type": "FeatureCollection",
+        "venue_slug": venue_slug,
+        "venue_location": [location.longitude, location.latitude],
+        "specs_version": specs.version,
+        "features": features,
+    }
+
+
+class DeliveryZones(VenueFollower):
+    """Fee tiers (delivery zone rings) of venues, per worker.
+
+    A venue's tiers and their GeoJSON body and ETag are rendered on its
+    first zones request and reused until its location or delivery specs
+    version changes, so serving zones and looking up a point's tier never
+    re-runs the pricing pipeline, and venues nobody asks zones for cost
+    nothing. With `attach()`, the zones follow VenueService's cache (see
+    VenueFollower) only to drop what is outdated: zones are discarded when
+    the venue's data changes, is invalidated or is evicted, so there are
+    never more zones than cached venues.
+    """
+
+    name = "delivery zones"
+
+    def __init__(self, ring_points: int = DELIVERY_ZONE_RING_POINTS):
+        super().__init__()
+        self.ring_points = ring_points
+        self.builds = 0
+        self._zones: Dict[str, VenueZones] = {}
+
+    def __len__(self) -> int:
+        return len(self._zones)
+
+    def __contains__(self, venue_slug: str) -> bool:
+        return venue_slug in self._zones
+
+    def get(self, venue_slug: str) -> Optional[VenueZones]:
+        return self._zones.get(venue_slug)
+
+    def render(
+        self, venue_slug: str, location: GPSCoordinates, specs: CompiledDeliverySpecs
+    ) -> VenueZones:
+        """Zones for the venue, rebuilt only if its location or specs changed."""
+        current = self._zones.get(venue_slug)
+        if same_venue_data(current, location, specs):
+            return current
+
+        tiers = fee_tiers(specs)
+        body = dumps(zones_geojson(venue_slug, location, specs, tiers, self.ring_points))
+        zones = VenueZones(
+            venue_slug=venue_slug,
+            latitude=location.latitude,
+            longitude=location.longitude,
+            specs=specs,
+            tiers=tiers,
+            body=body,
+            etag='"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"',
+        )
+        self._zones[venue_slug] = zones
+        self.builds += 1
+        return zones
+
+    def update(
+        self, venue_slug: str, location: GPSCoordinates, specs: CompiledDeliverySpecs
+    ) -> None:
+        """Drop the venue's zones if they were rendered from other data; the
+        next zones request renders them again."""
+        current = self._zones.get(venue_slug)
+        if current is not None and not same_venue_data(current, location, specs):
+            del self._zones[venue_slug]
+
+    def remove(self, venue_slug: str) -> bool:
+        return self._zones.pop(venue_slug, None) is not None
+
+    def stats(self) -> Dict[str, int]:
+        return {"venues": len(self._zones), "builds": self.builds}
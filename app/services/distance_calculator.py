@@ -1,4 +1,6 @@
-from math import asin, cos, sin, sqrt
+from math import asin, cos, radians, sin, sqrt
+import numpy as np
+from numpy.typing import ArrayLike
 from app.models import GPSCoordinates
 from app.utils.constants import EARTH_RADIUS
 
@@ -15,9 +17,22 @@ class DistanceCalculator:
         - φ is latitude
         - λ is longitude
         """
+        return DistanceCalculator.haversine(
+            location_a.latitude,
+            location_a.longitude,
+            location_b.latitude,
+            location_b.longitude,
+        )
+
+    @staticmethod
+    def haversine(lat_a: float, lon_a: float, lat_b: float, lon_b: float) -> int:
+        """Haversine distance in meters between two points given in degrees.
+        Works on plain floats so the request path does not need to build
+        GPSCoordinates models.
+        """
         # Convert to radians
-        lat1, lon1 = location_a.to_radians()
-        lat2, lon2 = location_b.to_radians()
+        lat1, lon1 = radians(lat_a), radians(lon_a)
+        lat2, lon2 = radians(lat_b), radians(lon_b)
 
         dlat = lat2 - lat1
         dlon = lon2 - lon1
@@ -35,3 +50,29 @@ class DistanceCalculator:
             venue_location, user_location
         )
         return distance
+
+    @staticmethod
+    def calculate_straight_line_bulk(
+        venue_lats: ArrayLike,
+        venue_lons: ArrayLike,
+        user_lats: ArrayLike,
+        user_lons: ArrayLike,
+    ) -> np.ndarray:
+        """Vectorized straight line distances in meters.
+
+        Inputs are degrees and broadcast against each other, so one venue
+        (scalars) can be measured against many users, or pairwise arrays
+        of venues and users. Uses the same operation order as
+        `haversine` and truncates like `int()`, so every element
+        equals the scalar result.
+        """
+        lat1 = np.radians(np.asarray(venue_lats, dtype=np.float64))
+        lon1 = np.radians(np.asarray(venue_lons, dtype=np.float64))
+        lat2 = np.radians(np.asarray(user_lats, dtype=np.float64))
+        lon2 = np.radians(np.asarray(user_lons, dtype=np.float64))
+
+        dlat = lat2 - lat1
+        dlon = lon2 - lon1
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+        c = 2 * np.arcsin(np.sqrt(a))
+        return np.trunc(c * EARTH_RADIUS).astype(np.int64)
@@ -0,0 +1,72 @@
+from typing import Iterator, NamedTuple
+import numpy as np
+from numpy.typing import ArrayLike
+from app.models import DeliverySpecs, GPSCoordinates
+from app.utils.constants import MATRIX_STREAM_CHUNK_SIZE
+from app.utils.fast_json import dumps
+from .distance_calculator import DistanceCalculator
+
+
+class FeeMatrix(NamedTuple):
+    """Delivery fees from one venue to many points, as parallel arrays.
+
+    `fees` is only meaningful where `available` is True.
+    """
+    distances: np.ndarray
+    fees: np.ndarray
+    available: np.ndarray
+
+
+def calculate_fee_matrix(
+    venue_location: GPSCoordinates,
+    delivery_specs: DeliverySpecs,
+    user_lats: ArrayLike,
+    user_lons: ArrayLike,
+) -> FeeMatrix:
+    """Calculate delivery distance, fee and availability for many user points.
+
+    Applies the same rules as the single-order pipeline: a point is
+    available if its distance is below `max_allowed_distance` and falls in
+    one of the distance ranges; its fee is base_price + a + b * distance / 10.
+    """
+    distances = DistanceCalculator.calculate_straight_line_bulk(
+        venue_location.latitude, venue_location.longitude, user_lats, user_lons
+    )
+    fees, available = delivery_specs.compiled.distance_fees(distances)
+    return FeeMatrix(distances=distances, fees=fees, available=available)
+
+
+def fee_matrix_to_dict(matrix: FeeMatrix) -> dict:
+    """JSON-ready form, with `null` fees for unavailable points."""
+    fees = matrix.fees.tolist()
+    available = matrix.available.tolist()
+    return {
+        "distances": matrix.distances.tolist(),
+        "fees": [fee if ok else None for fee, ok in zip(fees, available)],
+        "available": available,
+    }
+
+
+def stream_fee_matrix(
+    venue_location: GPSCoordinates,
+    delivery_specs: DeliverySpecs,
+    user_lats: ArrayLike,
+    user_lons: ArrayLike,
+    chunk_size: int = MATRIX_STREAM_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Yield NDJSON lines, one per point, computed `chunk_size` points at a time."""
+    user_lats = np.asarray(user_lats, dtype=np.float64)
+    user_lons = np.asarray(user_lons, dtype=np.float64)
+
+    for start in range(0, len(user_lats), chunk_size):
+        stop = start + chunk_size
+        matrix = calculate_fee_matrix(
+            venue_location, delivery_specs, user_lats[start:stop], user_lons[start:stop]
+        )
+        chunk = fee_matrix_to_dict(matrix)
+        rows = zip(chunk["distances"], chunk["fees"], chunk["available"])
+        yield b"".join(
+            dumps({"index": index, "distance": distance, "fee": fee, "available": ok})
+            + b"\n"
+            for index, (distance, fee, ok) in enumerate(rows, start)
+        )
@@ -0,0 +1,84 @@
+import hashlib
+from typing import Hashable, NamedTuple, Optional, Tuple
+from app.models import DeliveryQueryParams, GPSCoordinates, PriceQuote
+from app.utils.cache import TTLCache
+from app.utils.fast_json import dumps
+from app.utils.constants import (
+    QUOTE_CACHE_MAX_SIZE,
+    QUOTE_CACHE_PRECISION,
+    QUOTE_CACHE_TTL,
+)
+
+
+class MemoizedQuote(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class QuoteCache:
+    """Bounded LRU/TTL cache of serialized quote responses.
+
+    Clients re-poll the price endpoint with the same parameters while the
+    user sits on the checkout screen. The key is the query with coordinates
+    rounded to `precision` decimals, plus the venue location and the version
+    of its compiled delivery specs. A venue whose specs or location change
+    therefore never matches old entries; those age out of the LRU.
+
+    The first request for a key decides the answer for every request that
+    rounds to the same key, so `precision` bounds how far apart two users
+    may be and still share a quote (6 decimals is about 0.1m).
+    """
+
+    def __init__(
+        self,
+        ttl: float = QUOTE_CACHE_TTL,
+        max_size: int = QUOTE_CACHE_MAX_SIZE,
+        precision: int = QUOTE_CACHE_PRECISION,
+    ):
+        self.precision = precision
+        self._cache: TTLCache[MemoizedQuote] = TTLCache(ttl=ttl, max_size=max_size)
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def key(
+        self,
+        params: DeliveryQueryParams,
+        venue_location: GPSCoordinates,
+        specs_version: str,
+    ) -> Tuple[Hashable, ...]:
+        return (
+            params.venue_slug,
+            params.cart_value,
+            round(params.user_lat, self.precision),
+            round(params.user_lon, self.precision),
+            venue_location.latitude,
+            venue_location.longitude,
+            specs_version,
+        )
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[MemoizedQuote]:
+        return self._cache.get(key)
+
+    def put(self, key: Tuple[Hashable, ...], quote: PriceQuote) -> MemoizedQuote:
+        body = dumps(quote.to_dict())
+        etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        memo = MemoizedQuote(body=body, etag=etag)
+        self._cache.set(key, memo)
+        return memo
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches `etag` (weak comparison)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates
+    )
@@ -1,12 +1,13 @@
 from typing import List, Optional
 from fastapi import HTTPException
-from app.utils.logging import logger
+from app.utils.logging import logger, request_logger
 from app.utils.constants import DISTANCE_FEE_DIVISOR
 from app.models import (
-    DeliveryFeeInfo,
+    CompiledDeliverySpecs,
     DeliveryPriceResponse,
     DistanceRange,
     DeliverySpecs,
+    PriceQuote,
 )
 
 
@@ -42,13 +43,33 @@ def calculate_distance_fee(
     distance_based_fee = round(applicable_range.b * distance / DISTANCE_FEE_DIVISOR)
     total_distance_fee = base_price + constant_fee + distance_based_fee
 
-    logger.info(
-        f"Distance fee calculation: "
-        f"distance={distance}, "
-        f"base_price={base_price}, "
-        f"constant_fee={constant_fee}, "
-        f"distance_based_fee={distance_based_fee}, "
-        f"total_distance_fee={total_distance_fee}"
+    request_logger.info(
+        "Distance fee calculation: distance={}, base_price={}, constant_fee={}, "
+        "distance_based_fee={}, total_distance_fee={}",
+        distance,
+        base_price,
+        constant_fee,
+        distance_based_fee,
+        total_distance_fee,
+    )
+
+    return total_distance_fee
+
+
+def calculate_compiled_distance_fee(
+    distance: int, compiled_specs: CompiledDeliverySpecs
+) -> int:
+    """Same as calculate_distance_fee, but uses the venue's compiled specs
+    so the range lookup is a bisect instead of a linear scan."""
+    total_distance_fee = compiled_specs.distance_fee(distance)
+    if total_distance_fee is None:
+        raise ValueError(f"No applicable distance range found for distance {distance}m")
+
+    request_logger.info(
+        "Distance fee calculation: distance={}, base_price={}, total_distance_fee={}",
+        distance,
+        compiled_specs.base_price,
+        total_distance_fee,
     )
 
     return total_distance_fee
@@ -57,30 +78,33 @@ def calculate_distance_fee(
 def calculate_small_order_surcharge(cart_value: int, minimum_no_surcharge: int) -> int:
     """Calculate surcharge for orders below minimum amount"""
     surcharge = max(0, minimum_no_surcharge - cart_value)
-    logger.info(
-        f"Small order surcharge calculation: "
-        f"minimum={minimum_no_surcharge}, "
-        f"cart_value={cart_value}, "
-        f"surcharge={surcharge}"
+    request_logger.info(
+        "Small order surcharge calculation: minimum={}, cart_value={}, surcharge={}",
+        minimum_no_surcharge,
+        cart_value,
+        surcharge,
     )
     return surcharge
 
 
-async def total_fee_calculator(
+def calculate_quote(
     cart_value: int,
-    delivery_specs: DeliverySpecs,
+    compiled_specs: CompiledDeliverySpecs,
     distance: int,
-) -> DeliveryPriceResponse:
+) -> PriceQuote:
+    """Price one order from compiled specs without building Pydantic models.
+
+    Raises:
+        HTTPException: 400 if no distance range applies
+    """
 
     # Calculate delivery fee
     try:
-        delivery_fee = calculate_distance_fee(
-            distance=distance,
-            base_price=delivery_specs.base_price,
-            distance_ranges=delivery_specs.distance_ranges,
+        delivery_fee = calculate_compiled_distance_fee(
+            distance=distance, compiled_specs=compiled_specs
         )
     except ValueError as e:
-        logger.error("Error calculating delivery fee: %s", str(e))
+        logger.error("Error calculating delivery fee: {}", e)
         raise HTTPException(
             status_code=400, detail=f"Failed to calculate delivery fee: {str(e)}"
         )
@@ -88,23 +112,34 @@ async def total_fee_calculator(
     # Calculate small order surcharge
     small_order_surcharge = calculate_small_order_surcharge(
         cart_value=cart_value,
-        minimum_no_surcharge=delivery_specs.order_minimum_no_surcharge,
+        minimum_no_surcharge=compiled_specs.order_minimum_no_surcharge,
     )
 
     # Calculate total price
     total_price = cart_value + delivery_fee + small_order_surcharge
 
-    logger.info(
-        f"Total price calculation: "
-        f"cart_value={cart_value} + "
-        f"delivery_fee={delivery_fee} + "
-        f"surcharge={small_order_surcharge} = "
-        f"total={total_price}"
+    request_logger.info(
+        "Total price calculation: cart_value={} + delivery_fee={} + surcharge={} = "
+        "total={}",
+        cart_value,
+        delivery_fee,
+        small_order_surcharge,
+        total_price,
     )
 
-    return DeliveryPriceResponse(
+    return PriceQuote(
         total_price=total_price,
         small_order_surcharge=small_order_surcharge,
         cart_value=cart_value,
-        delivery=DeliveryFeeInfo(fee=delivery_fee, distance=distance),
+        fee=delivery_fee,
+        distance=distance,
     )
+
+
+async def total_fee_calculator(
+    cart_value: int,
+    delivery_specs: DeliverySpecs,
+    distance: int,
+) -> DeliveryPriceResponse:
+    quote = calculate_quote(cart_value, delivery_specs.compiled, distance)
+    return quote.to_response()
@@ -0,0 +1,77 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+from app.models import CompiledDeliverySpecs, GPSCoordinates
+from app.utils.logging import logger
+from .venue_service import VenueService
+
+
+def same_venue_data(
+    current: Optional[Any], location: GPSCoordinates, specs: CompiledDeliverySpecs
+) -> bool:
+    """Whether an entry with `latitude`, `longitude` and `specs` fields was
+    built from this location and delivery specs version."""
+    return (
+        current is not None
+        and current.specs.version == specs.version
+        and current.latitude == location.latitude
+        and current.longitude == location.longitude
+    )
+
+
+class VenueFollower(ABC):
+    """Base class for per-venue structures derived from VenueService's cache.
+
+    After `attach()`, `update(venue_slug, location, specs)` is called for a
+    venue whenever its static and dynamic data are both cached and not
+    expired, and `remove(venue_slug)` when either is invalidated or evicted,
+    or its delivery specs do not compile. Subclasses implement both and may
+    call `current()` to skip venues whose data expired since.
+    """
+
+    # Used in log messages
+    name = "venue follower"
+
+    def __init__(self):
+        self._venue_service: Optional[VenueService] = None
+
+    def attach(self, venue_service: VenueService) -> None:
+        """Follow what `venue_service` has cached and its changes."""
+        self._venue_service = venue_service
+        for venue_slug in venue_service.static_cache.keys():
+            self._sync(venue_slug)
+        venue_service.add_listener(self._on_venue_change, fetches=True)
+
+    def _on_venue_change(self, kind: str, venue_slug: str) -> None:
+        self._sync(venue_slug)
+
+    def _sync(self, venue_slug: str) -> None:
+        cached = self._venue_service.cached_venue(venue_slug)
+        if cached is None:
+            self.remove(venue_slug)
+            return
+        static, dynamic = cached
+        try:
+            specs = dynamic.delivery_specs.compiled
+        except ValueError as e:
+            logger.warning("Dropping {} from the {}: {}", venue_slug, self.name, e)
+            self.remove(venue_slug)
+            return
+        self.update(venue_slug, static.location, specs)
+
+    def current(self, venue_slug: str) -> bool:
+        """Whether the venue's cached data has not expired; always true when
+        not attached."""
+        return (
+            self._venue_service is None
+            or self._venue_service.cached_venue(venue_slug) is not None
+        )
+
+    @abstractmethod
+    def update(
+        self, venue_slug: str, location: GPSCoordinates, specs: CompiledDeliverySpecs
+    ) -> None:
+        """Bring the venue's entry in line with its current cached data."""
+
+    @abstractmethod
+    def remove(self, venue_slug: str) -> bool:
+        """Drop the venue's entry; whether there was one."""
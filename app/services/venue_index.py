@@ -0,0 +1,204 @@
+import heapq
+import math
+from typing import Dict, Iterable, List, Literal, NamedTuple, Optional, Set, Tuple
+from app.models import CompiledDeliverySpecs, GPSCoordinates, PriceQuote
+from app.utils.constants import (
+    EARTH_RADIUS,
+    GEO_INDEX_CELL_SIZE,
+    GEO_INDEX_MAX_CELLS_PER_VENUE,
+)
+from .distance_calculator import DistanceCalculator
+from .venue_follower import VenueFollower, same_venue_data
+
+NearbySort = Literal["fee", "distance"]
+Cell = Tuple[int, int]
+
+METERS_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+
+class IndexedVenue(NamedTuple):
+    venue_slug: str
+    latitude: float
+    longitude: float
+    specs: CompiledDeliverySpecs
+    # Bounding box half-sizes in degrees, the cheap prefilter before haversine
+    lat_margin: float
+    lon_margin: float
+    cells: Tuple[Cell, ...]  # empty for venues kept in the wide list
+
+
+class VenueMatch(NamedTuple):
+    venue_slug: str
+    quote: PriceQuote
+
+
+class VenueGeoIndex(VenueFollower):
+    """Grid index of venues by delivery area.
+
+    The world is split into cells of `cell_size` meters of latitude (the
+    same number of degrees in longitude). Each venue is registered in every
+    cell its delivery radius (`max_allowed_distance`) can reach, so a query
+    only looks at the venues registered in the point's cell. Candidates are
+    then checked against their bounding box, then with the exact haversine
+    distance and the venue's distance ranges, exactly as the price endpoint
+    would. Venues whose radius spans more than `max_cells` cells are kept in
+    a short list checked on every query instead.
+
+    With `attach()`, the index follows VenueService's cache (see
+    VenueFollower). Cached data is kept past its TTL as a fallback, so
+    queries also skip (and drop) venues whose data has expired since; they
+    are indexed again when fetched.
+    """
+
+    name = "geo index"
+
+    def __init__(
+        self,
+        cell_size: float = GEO_INDEX_CELL_SIZE,
+        max_cells: int = GEO_INDEX_MAX_CELLS_PER_VENUE,
+    ):
+        super().__init__()
+        self.cell_degrees = cell_size / METERS_PER_DEGREE
+        self.max_cells = max_cells
+        self._lon_cells = math.ceil(360 / self.cell_degrees)
+        self._venues: Dict[str, IndexedVenue] = {}
+        self._cells: Dict[Cell, Set[str]] = {}
+        self._wide: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._venues)
+
+    def __contains__(self, venue_slug: str) -> bool:
+        return venue_slug in self._venues
+
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        return (
+            math.floor(latitude / self.cell_degrees),
+            math.floor((longitude + 180) / self.cell_degrees) % self._lon_cells,
+        )
+
+    def update(
+        self, venue_slug: str, location: GPSCoordinates, specs: CompiledDeliverySpecs
+    ) -> None:
+        """Index a venue, replacing its previous entry. Unchanged venues are
+        left as they are, so re-indexing on every refresh is cheap."""
+        if same_venue_data(self._venues.get(venue_slug), location, specs):
+            return
+        self.remove(venue_slug)
+
+        latitude, longitude = location.latitude, location.longitude
+        lat_margin = specs.max_allowed_distance / METERS_PER_DEGREE
+        # Longitude degrees shrink towards the poles; use the widest latitude
+        widest = min(90.0, abs(latitude) + lat_margin)
+        cos_widest = math.cos(math.radians(widest))
+        lon_margin = 180.0 if cos_widest < 1e-9 else min(180.0, lat_margin / cos_widest)
+
+        cells = self._cells_covering(latitude, longitude, lat_margin, lon_margin)
+        if cells is None:
+            self._wide.add(venue_slug)
+            cells = ()
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(venue_slug)
+        self._venues[venue_slug] = IndexedVenue(
+            venue_slug, latitude, longitude, specs, lat_margin, lon_margin, tuple(cells)
+        )
+
+    def _cells_covering(
+        self, latitude: float, longitude: float, lat_margin: float, lon_margin: float
+    ) -> Optional[List[Cell]]:
+        """Cells overlapping the bounding box, or None if there are more
+        than `max_cells` of them."""
+        row_min, col_min = self._cell(latitude - lat_margin, longitude - lon_margin)
+        row_max, _ = self._cell(latitude + lat_margin, longitude + lon_margin)
+        cols = min(
+            self._lon_cells,
+            math.floor((longitude + lon_margin + 180) / self.cell_degrees)
+            - math.floor((longitude - lon_margin + 180) / self.cell_degrees)
+            + 1,
+        )
+        if (row_max - row_min + 1) * cols > self.max_cells:
+            return None
+        return [
+            (row, (col_min + offset) % self._lon_cells)
+            for row in range(row_min, row_max + 1)
+            for offset in range(cols)
+        ]
+
+    def remove(self, venue_slug: str) -> bool:
+        venue = self._venues.pop(venue_slug, None)
+        if venue is None:
+            return False
+        self._wide.discard(venue_slug)
+        for cell in venue.cells:
+            slugs = self._cells[cell]
+            slugs.discard(venue_slug)
+            if not slugs:
+                del self._cells[cell]
+        return True
+
+    def candidates(self, latitude: float, longitude: float) -> Iterable[str]:
+        """Venues that may deliver to the point (before exact checks)."""
+        cell_venues = self._cells.get(self._cell(latitude, longitude), ())
+        if not self._wide:
+            return cell_venues
+        return [*cell_venues, *self._wide]
+
+    def nearby(
+        self,
+        latitude: float,
+        longitude: float,
+        cart_value: int,
+        sort: NearbySort = "fee",
+        limit: Optional[int] = None,
+    ) -> List[VenueMatch]:
+        """Venues that deliver to the point, priced for `cart_value`,
+        ordered by fee or by distance (ties by the other, then slug)."""
+        results = []
+        expired = []
+        for venue_slug in self.candidates(latitude, longitude):
+            venue = self._venues[venue_slug]
+            if abs(latitude - venue.latitude) > venue.lat_margin:
+                continue
+            lon_delta = abs(longitude - venue.longitude)
+            if min(lon_delta, 360 - lon_delta) > venue.lon_margin:
+                continue
+            specs = venue.specs
+            distance = DistanceCalculator.haversine(
+                venue.latitude, venue.longitude, latitude, longitude
+            )
+            if distance >= specs.max_allowed_distance:
+                continue
+            fee = specs.distance_fee(distance)
+            if fee is None:
+                continue
+            if not self.current(venue_slug):
+                expired.append(venue_slug)
+                continue
+            surcharge = max(0, specs.order_minimum_no_surcharge - cart_value)
+            quote = PriceQuote(
+                total_price=cart_value + fee + surcharge,
+                small_order_surcharge=surcharge,
+                cart_value=cart_value,
+                fee=fee,
+                distance=distance,
+            )
+            if sort == "fee":
+                key = (fee, distance, venue_slug)
+            else:
+                key = (distance, fee, venue_slug)
+            results.append((key, VenueMatch(venue_slug, quote)))
+        for venue_slug in expired:
+            self.remove(venue_slug)
+
+        if limit is not None and limit < len(results):
+            ordered = heapq.nsmallest(limit, results, key=lambda result: result[0])
+        else:
+            ordered = sorted(results, key=lambda result: result[0])
+        return [venue for _, venue in ordered]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "venues": len(self._venues),
+            "cells": len(self._cells),
+            "wide_venues": len(self._wide),
+        }
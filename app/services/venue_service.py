@@ -1,8 +1,33 @@
+import asyncio
+import functools
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, TypeVar
 from fastapi import HTTPException
-from app.utils.logging import logger
-from app.utils.constants import VENUE_ENDPOINT
+from app.utils.cache import CacheState, TTLCache
+from app.utils.cache_backends import CacheBackend, CacheBackendError
+from app.utils.concurrency import SingleFlight
+from app.utils.deadline import Deadline, deadline_exceeded
+from app.utils.logging import logger, request_logger
+from app.utils.constants import (
+    VENUE_ENDPOINT,
+    STATIC_CACHE_TTL,
+    STATIC_CACHE_STALE_TTL,
+    STATIC_CACHE_MAX_SIZE,
+    DYNAMIC_CACHE_TTL,
+    DYNAMIC_CACHE_STALE_TTL,
+    DYNAMIC_CACHE_MAX_SIZE,
+    SHARED_UPDATE_CHECK_INTERVAL,
+)
 from app.utils.http_client import HTTPClient
 from app.models import DeliverySpecs, GPSCoordinates, VenueDynamic, VenueStatic
+from .venue_snapshot import SnapshotRecord, VenueSnapshot
+
+T = TypeVar("T")
+# Update stamp that could not be read; never equal to a stored one
+_UNKNOWN_STAMP = object()
+VenueListener = Callable[[str, str], None]
+VenueFetch = Callable[[str, Optional[Deadline]], Awaitable[T]]
 
 
 class VenueService:
@@ -13,38 +38,156 @@ class VenueService:
     - Only HTTP errors need handling, re-raised with original status codes
     - Static endpoint returns venue location
     - Dynamic endpoint returns delivery specifications
+
+    Static data is cached per venue slug. Stale entries are served while a
+    background task refreshes them. Dynamic data (delivery specs) is cached
+    with a short TTL. Concurrent misses for the same venue share a single
+    upstream call. An optional shared CacheBackend is checked before the
+    upstream, so venue data fetched by one worker serves all of them. When
+    the upstream fails with a 5xx (including an open circuit breaker), the
+    last known value is served instead, however old.
+
+    Entries can be replaced or invalidated when the venue platform pushes an
+    update. Listeners registered with `add_listener` are called with
+    (kind, venue_slug) after each such change (and optionally after every
+    fetch that stores data). A push reaches a single worker; with a shared
+    cache it also writes a new update stamp for the venue there. Every
+    worker compares the stamp with the one it saw when it cached the entry,
+    at most once per `update_check_interval` per entry, and drops its copy
+    when they differ. Without a shared cache only the worker that received
+    the push is updated.
+
+    A request `deadline` bounds how long that request waits for venue data.
+    Upstream calls are shared by the requests that coalesce on them, so they
+    run under the latest of their deadlines, and are cancelled once every
+    request waiting for them has given up. Background refreshes have no
+    deadline.
+
+    With a VenueSnapshot, a venue missing from the cache is first restored
+    from the snapshot with its original age, and `save_snapshot()` writes
+    the cached data back to disk, so a restarted worker starts with the
+    last known data even when the venue API is down.
     """
 
     BASE_URL = VENUE_ENDPOINT
+    SHARED_KEY_PREFIX = "dopc:venue"
+    MODELS = {"static": VenueStatic, "dynamic": VenueDynamic}
+    STATIC_COORDINATES_PATH = ("venue_raw", "location", "coordinates")
+    DYNAMIC_DELIVERY_SPECS_PATH = ("venue_raw", "delivery_specs")
 
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[HTTPClient] = None,
+        static_cache: Optional[TTLCache[VenueStatic]] = None,
+        dynamic_cache: Optional[TTLCache[VenueDynamic]] = None,
+        shared_cache: Optional[CacheBackend] = None,
+        snapshot: Optional[VenueSnapshot] = None,
+        update_check_interval: float = SHARED_UPDATE_CHECK_INTERVAL,
+    ):
+        """
+        Args:
+            client: Shared HTTP client, normally owned by the app lifespan.
+                A private client is created when omitted.
+            static_cache: Cache for venue static data. Defaults to a cache
+                configured from the STATIC_CACHE_* constants.
+            dynamic_cache: Cache for venue dynamic data. Defaults to a cache
+                configured from the DYNAMIC_CACHE_* constants. The service
+                sets `on_evict` on both caches.
+            shared_cache: Optional second-level cache shared between workers.
+            snapshot: Optional on-disk snapshot, already loaded, to restore
+                venue data from and save it to.
+            update_check_interval: Seconds an entry is served before this
+                worker checks the shared cache again for updates pushed to
+                other workers.
+        """
+        if static_cache is None:
+            static_cache = TTLCache(
+                ttl=STATIC_CACHE_TTL,
+                stale_ttl=STATIC_CACHE_STALE_TTL,
+                max_size=STATIC_CACHE_MAX_SIZE,
+            )
+        self.static_cache = static_cache
+        if dynamic_cache is None:
+            dynamic_cache = TTLCache(
+                ttl=DYNAMIC_CACHE_TTL,
+                stale_ttl=DYNAMIC_CACHE_STALE_TTL,
+                max_size=DYNAMIC_CACHE_MAX_SIZE,
+            )
+        self.dynamic_cache = dynamic_cache
+        for kind, cache in (("static", static_cache), ("dynamic", dynamic_cache)):
+            cache.on_evict = functools.partial(self._on_evict, kind)
+        self.shared_cache = shared_cache
+        self.shared_stats = {"hits": 0, "misses": 0, "errors": 0}
+        self.in_flight = SingleFlight()
+        self._refresh_tasks: Dict[Tuple[str, str], asyncio.Task] = {}
+        # Bumped on every pushed update, so fetches started before it are not cached
+        self._generations: Dict[Tuple[str, str], int] = {}
+        # (kind, venue_slug) -> shared update stamp seen when the entry was
+        # cached; fresh while no check is due
+        self._update_stamps: TTLCache[Optional[bytes]] = TTLCache(
+            ttl=update_check_interval,
+            max_size=static_cache.max_size + dynamic_cache.max_size,
+        )
+        self._listeners: List[VenueListener] = []
+        self._fetch_listeners: List[VenueListener] = []
+        self.snapshot = snapshot
+        # Whether the caches changed since the snapshot was last written
+        self._snapshot_dirty = False
+        self._snapshot_lock = asyncio.Lock()
+        if client is not None:
+            self.client = client
+            return
         try:
             self.client = HTTPClient(self.BASE_URL)
         except Exception as e:
-            logger.error(f"Failed to initialize HTTP client: {str(e)}")
+            logger.error("Failed to initialize HTTP client: {}", e)
             raise HTTPException(
                 status_code=503, detail=f"Venue service is not available: {str(e)}"
             )
 
-    async def get_venue_static(self, venue_slug: str) -> VenueStatic:
+    async def get_venue_static(
+        self, venue_slug: str, deadline: Optional[Deadline] = None
+    ) -> VenueStatic:
+        return await self._get_cached(
+            "static", venue_slug, self.static_cache, self._fetch_venue_static, deadline
+        )
+
+    async def _fetch_venue_static(
+        self, venue_slug: str, deadline: Optional[Deadline] = None
+    ) -> VenueStatic:
         try:
-            data = await self.client.get(f"{venue_slug}/static")
-            venue_raw = data["venue_raw"]
-            location_data = venue_raw["location"]
-            coordinates = location_data["coordinates"]  # Returns tuple (lon, lat)
+            # Only the coordinates are read out of the (large) venue payload
+            (coordinates,) = await self.client.get_paths(
+                f"{venue_slug}/static", self.STATIC_COORDINATES_PATH, deadline=deadline
+            )  # Returns tuple (lon, lat)
 
             # Convert tuple to GPSCoordinates
             location = GPSCoordinates.from_coordinates(tuple(coordinates))
             return VenueStatic(location=location)
         except HTTPException as e:
-            logger.error(f"HTTP error fetching venue data: {str(e)}")
+            logger.error("HTTP error fetching venue data: {}", e)
             raise e
 
-    async def get_venue_dynamic(self, venue_slug: str) -> VenueDynamic:
+    async def get_venue_dynamic(
+        self, venue_slug: str, deadline: Optional[Deadline] = None
+    ) -> VenueDynamic:
+        return await self._get_cached(
+            "dynamic",
+            venue_slug,
+            self.dynamic_cache,
+            self._fetch_venue_dynamic,
+            deadline,
+        )
+
+    async def _fetch_venue_dynamic(
+        self, venue_slug: str, deadline: Optional[Deadline] = None
+    ) -> VenueDynamic:
         try:
-            data = await self.client.get(f"{venue_slug}/dynamic")
-            venue_data = data["venue_raw"]
-            delivery_specs_data = venue_data["delivery_specs"]
+            (delivery_specs_data,) = await self.client.get_paths(
+                f"{venue_slug}/dynamic",
+                self.DYNAMIC_DELIVERY_SPECS_PATH,
+                deadline=deadline,
+            )
             delivery_pricing = delivery_specs_data["delivery_pricing"]
 
             delivery_specs = DeliverySpecs(
@@ -55,9 +198,411 @@ class VenueService:
                 distance_ranges=delivery_pricing["distance_ranges"],
             )
 
-            logger.debug(f"Constructed delivery specs: {delivery_specs}")
+            request_logger.debug("Constructed delivery specs: {}", delivery_specs)
+            # Compile now so the cached entry carries the bisect tables
+            delivery_specs.compiled
             return VenueDynamic(delivery_specs=delivery_specs)
 
         except HTTPException as e:
-            logger.error(f"HTTP error fetching venue data: {str(e)}")
+            logger.error("HTTP error fetching venue data: {}", e)
             raise e
+        except ValueError as e:
+            logger.error("Invalid delivery specs for {}: {}", venue_slug, e)
+            raise HTTPException(
+                status_code=502, detail=f"Venue API returned invalid delivery specs: {e}"
+            )
+
+    async def _get_cached(
+        self,
+        kind: str,
+        venue_slug: str,
+        cache: TTLCache[T],
+        fetch: VenueFetch[T],
+        deadline: Optional[Deadline] = None,
+    ) -> T:
+        """Serve from cache, refreshing stale entries in the background and
+        coalescing concurrent misses into one upstream call.
+
+        The coalesced call is shared, so it runs under the latest deadline
+        of the callers waiting for it rather than that of whichever request
+        started it; `deadline` bounds how long this caller waits.
+        """
+        if self.snapshot is not None and venue_slug not in cache:
+            self._restore(kind, venue_slug, cache)
+        value, state = cache.lookup(venue_slug)
+        if (
+            state in (CacheState.FRESH, CacheState.STALE)
+            and self.shared_cache is not None
+            and await self._updated_elsewhere(kind, venue_slug)
+        ):
+            logger.info(
+                "Dropping {} data for {} updated by another worker", kind, venue_slug
+            )
+            cache.invalidate(venue_slug)
+            self._notify(kind, venue_slug)
+            value, state = None, CacheState.MISSING
+        if state is CacheState.FRESH:
+            return value
+        if state is CacheState.STALE:
+            self._schedule_refresh(kind, venue_slug, cache, fetch)
+            return value
+
+        try:
+            return await self.in_flight.do(
+                (kind, venue_slug),
+                lambda shared: self._fetch_and_store(
+                    kind, venue_slug, cache, fetch, shared
+                ),
+                deadline,
+            )
+        except asyncio.TimeoutError:
+            error = deadline_exceeded()
+        except HTTPException as e:
+            error = e
+        if error.status_code < 500 or value is None:
+            raise error
+        cache.error_fallbacks += 1
+        logger.warning(
+            "Serving expired {} data for {} after upstream error: {}",
+            kind,
+            venue_slug,
+            error.detail,
+        )
+        return value
+
+    async def _fetch_and_store(
+        self,
+        kind: str,
+        venue_slug: str,
+        cache: TTLCache[T],
+        fetch: VenueFetch[T],
+        deadline: Optional[Deadline] = None,
+    ) -> T:
+        key = (kind, venue_slug)
+        generation = self._generations.get(key, 0)
+        # Read before the data, so an update landing in between is seen later
+        stamp = await self._read_update_stamp(kind, venue_slug)
+        value = await self._load_shared(kind, venue_slug)
+        if value is None:
+            value = await fetch(venue_slug, deadline)
+            if self._generations.get(key, 0) != generation:
+                # A pushed update arrived meanwhile; it wins over this fetch
+                return value
+            await self._store_shared(kind, venue_slug, value, cache.ttl)
+        if self._generations.get(key, 0) == generation:
+            cache.set(venue_slug, value)
+            self._remember_update_stamp(key, stamp)
+            self._snapshot_dirty = True
+            self._call_listeners(self._fetch_listeners, kind, venue_slug)
+        return value
+
+    def _restore(self, kind: str, venue_slug: str, cache: TTLCache) -> None:
+        restored = self.snapshot.take(kind, venue_slug)
+        if restored is None:
+            return
+        value, age = restored
+        cache.set(venue_slug, value, age=age)
+        self._call_listeners(self._fetch_listeners, kind, venue_slug)
+
+    def _cache(self, kind: str) -> TTLCache:
+        return self.static_cache if kind == "static" else self.dynamic_cache
+
+    def add_listener(self, listener: VenueListener, fetches: bool = False) -> None:
+        """Call `listener(kind, venue_slug)` whenever an entry is replaced
+        or invalidated by a pushed update, and with `fetches` also whenever
+        data fetched from upstream (or the shared cache) is stored or an
+        entry is evicted to make room. The cache already holds the new
+        state when the listener runs."""
+        self._listeners.append(listener)
+        if fetches:
+            self._fetch_listeners.append(listener)
+
+    def _on_evict(self, kind: str, venue_slug: str) -> None:
+        self._update_stamps.invalidate((kind, venue_slug))
+        self._call_listeners(self._fetch_listeners, kind, venue_slug)
+
+    def cached_venue(
+        self, venue_slug: str
+    ) -> Optional[Tuple[VenueStatic, VenueDynamic]]:
+        """The venue's static and dynamic data if both are cached and not
+        expired (fresh or stale), for views derived from the cache. Cache
+        stats and LRU order are left alone, and nothing is fetched."""
+        for cache in (self.static_cache, self.dynamic_cache):
+            if cache.state(venue_slug) in (CacheState.MISSING, CacheState.EXPIRED):
+                return None
+        return self.static_cache.peek(venue_slug), self.dynamic_cache.peek(venue_slug)
+
+    def _notify(self, kind: str, venue_slug: str) -> None:
+        key = (kind, venue_slug)
+        self._generations[key] = self._generations.get(key, 0) + 1
+        if self.snapshot is not None:
+            # The cache now holds the truth; never restore the older record
+            self.snapshot.discard(kind, venue_slug)
+            self._snapshot_dirty = True
+        self._call_listeners(self._listeners, kind, venue_slug)
+
+    @staticmethod
+    def _call_listeners(
+        listeners: List[VenueListener], kind: str, venue_slug: str
+    ) -> None:
+        for listener in listeners:
+            try:
+                listener(kind, venue_slug)
+            except Exception as e:
+                logger.error("Venue listener failed for {}/{}: {}", venue_slug, kind, e)
+
+    async def replace_venue_data(self, kind: str, venue_slug: str, value) -> None:
+        """Store pushed venue data in place of whatever is cached.
+
+        Raises:
+            ValueError: if pushed delivery specs do not compile
+        """
+        if kind == "dynamic":
+            value.delivery_specs.compiled
+        cache = self._cache(kind)
+        cache.set(venue_slug, value)
+        self._notify(kind, venue_slug)
+        await self._store_shared(kind, venue_slug, value, cache.ttl)
+        await self._write_update_stamp(kind, venue_slug, cache)
+
+    async def invalidate_venue_data(self, kind: str, venue_slug: str) -> bool:
+        """Drop cached venue data so the next request fetches it again.
+        Returns whether this worker had it cached."""
+        cache = self._cache(kind)
+        removed = cache.invalidate(venue_slug)
+        self._notify(kind, venue_slug)
+        await self._delete_shared(kind, venue_slug)
+        await self._write_update_stamp(kind, venue_slug, cache)
+        return removed
+
+    def _shared_key(self, kind: str, venue_slug: str) -> str:
+        return f"{self.SHARED_KEY_PREFIX}:{kind}:{venue_slug}"
+
+    async def _load_shared(self, kind: str, venue_slug: str):
+        """Read venue data from the shared cache. Any backend or decoding
+        problem counts as a miss, so the request falls through to upstream."""
+        if self.shared_cache is None:
+            return None
+        try:
+            raw = await self.shared_cache.get(self._shared_key(kind, venue_slug))
+            if raw is None:
+                self.shared_stats["misses"] += 1
+                return None
+            value = self.MODELS[kind].model_validate_json(raw)
+            if kind == "dynamic":
+                value.delivery_specs.compiled
+        except (CacheBackendError, ValueError) as e:
+            self.shared_stats["errors"] += 1
+            logger.warning("Shared cache read failed for {}/{}: {}", venue_slug, kind, e)
+            return None
+        self.shared_stats["hits"] += 1
+        return value
+
+    async def _store_shared(self, kind: str, venue_slug: str, value, ttl: float) -> None:
+        if self.shared_cache is None:
+            return
+        try:
+            await self.shared_cache.set(
+                self._shared_key(kind, venue_slug), value.model_dump_json().encode(), ttl
+            )
+        except CacheBackendError as e:
+            self.shared_stats["errors"] += 1
+            logger.warning("Shared cache write failed for {}/{}: {}", venue_slug, kind, e)
+
+    async def _delete_shared(self, kind: str, venue_slug: str) -> None:
+        if self.shared_cache is None:
+            return
+        try:
+            await self.shared_cache.delete(self._shared_key(kind, venue_slug))
+        except CacheBackendError as e:
+            self.shared_stats["errors"] += 1
+            logger.warning("Shared cache delete failed for {}/{}: {}", venue_slug, kind, e)
+
+    def _update_stamp_key(self, kind: str, venue_slug: str) -> str:
+        return f"{self.SHARED_KEY_PREFIX}:updated:{kind}:{venue_slug}"
+
+    async def _read_update_stamp(self, kind: str, venue_slug: str):
+        """The venue's shared update stamp, None if it was never pushed, or
+        _UNKNOWN_STAMP without a shared cache or when it cannot be read."""
+        if self.shared_cache is None:
+            return _UNKNOWN_STAMP
+        try:
+            return await self.shared_cache.get(self._update_stamp_key(kind, venue_slug))
+        except CacheBackendError as e:
+            self.shared_stats["errors"] += 1
+            logger.warning("Update stamp read failed for {}/{}: {}", venue_slug, kind, e)
+            return _UNKNOWN_STAMP
+
+    def _remember_update_stamp(self, key: Tuple[str, str], stamp) -> None:
+        if stamp is _UNKNOWN_STAMP:
+            self._update_stamps.invalidate(key)
+        else:
+            self._update_stamps.set(key, stamp)
+
+    async def _write_update_stamp(
+        self, kind: str, venue_slug: str, cache: TTLCache
+    ) -> None:
+        """Record a pushed change in the shared cache for the other workers.
+        The stamp outlives any entry they may still be serving."""
+        if self.shared_cache is None:
+            return
+        stamp = uuid.uuid4().hex.encode()
+        try:
+            await self.shared_cache.set(
+                self._update_stamp_key(kind, venue_slug),
+                stamp,
+                cache.ttl + cache.stale_ttl + self._update_stamps.ttl,
+            )
+        except CacheBackendError as e:
+            self.shared_stats["errors"] += 1
+            logger.warning("Update stamp write failed for {}/{}: {}", venue_slug, kind, e)
+            return
+        self._update_stamps.set((kind, venue_slug), stamp)
+
+    async def _updated_elsewhere(self, kind: str, venue_slug: str) -> bool:
+        """Whether another worker pushed a change to the venue since this
+        worker cached it. Checks the shared cache at most once per
+        `update_check_interval`; a failed check trusts the cached entry."""
+        key = (kind, venue_slug)
+        seen, state = self._update_stamps.lookup(key)
+        if state is CacheState.FRESH:
+            return False
+        stamp = await self._read_update_stamp(kind, venue_slug)
+        if stamp is _UNKNOWN_STAMP:
+            return False
+        self._update_stamps.set(key, stamp)
+        if state is CacheState.MISSING:
+            # Cached without a stamp (restored from the snapshot, or the read
+            # failed): only trust the entry if nothing was ever pushed
+            return stamp is not None
+        return stamp != seen
+
+    def _schedule_refresh(
+        self,
+        kind: str,
+        venue_slug: str,
+        cache: TTLCache,
+        fetch: VenueFetch,
+    ) -> None:
+        """Refresh a stale cache entry in the background, once per key."""
+        key = (kind, venue_slug)
+        if key in self._refresh_tasks:
+            return
+
+        async def refresh():
+            try:
+                await self.in_flight.do(
+                    key,
+                    lambda shared: self._fetch_and_store(
+                        kind, venue_slug, cache, fetch, shared
+                    ),
+                )
+                cache.refreshes += 1
+            except Exception as e:
+                # Keep serving the stale value, the next lookup retries
+                cache.refresh_failures += 1
+                logger.warning(
+                    "Background refresh of {} data for {} failed: {}", kind, venue_slug, e
+                )
+            finally:
+                self._refresh_tasks.pop(key, None)
+
+        self._refresh_tasks[key] = asyncio.create_task(refresh())
+
+    async def save_snapshot(self) -> bool:
+        """Merge cached venue data into the snapshot file if anything
+        changed. Serialization and I/O run in a thread. Returns whether a
+        snapshot was written.
+
+        Saves run one at a time: a save cancelled while its thread is
+        writing keeps the lock until the write is done, so a later save
+        (e.g. the final one on shutdown) is never overwritten by it.
+        """
+        snapshot = self.snapshot
+        if snapshot is None or not self._snapshot_dirty:
+            return False
+        await self._snapshot_lock.acquire()
+        if not self._snapshot_dirty:  # saved by the save we waited for
+            self._snapshot_lock.release()
+            return False
+        try:
+            self._snapshot_dirty = False
+            now = time.time()
+            cached = [
+                (kind, venue_slug, now - age, value)
+                for kind in ("static", "dynamic")
+                for venue_slug, value, age in self._cache(kind).items()
+            ]
+
+            def records():
+                for kind, venue_slug, stored_at, value in cached:
+                    payload = value.model_dump_json().encode()
+                    yield SnapshotRecord(kind, venue_slug, stored_at, payload)
+
+            # A worker never restores more venues than its caches hold
+            max_records = {
+                kind: self._cache(kind).max_size for kind in ("static", "dynamic")
+            }
+            write = asyncio.ensure_future(
+                asyncio.to_thread(snapshot.write, records(), max_records)
+            )
+        except BaseException:
+            self._snapshot_lock.release()
+            raise
+        write.add_done_callback(self._snapshot_written)
+        try:
+            count = await asyncio.shield(write)
+        except OSError as e:
+            self._snapshot_dirty = True
+            snapshot.write_failures += 1
+            logger.warning("Writing venue snapshot {} failed: {}", snapshot.path, e)
+            return False
+        logger.debug("Wrote venue snapshot {} with {} records", snapshot.path, count)
+        return True
+
+    def _snapshot_written(self, write: asyncio.Future) -> None:
+        self._snapshot_lock.release()
+        # Retrieved here in case the saving task was cancelled meanwhile
+        if not write.cancelled():
+            write.exception()
+
+    async def run_snapshots(self, interval: float) -> None:
+        """Save the snapshot every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            await self.save_snapshot()
+
+    def cache_stats(self) -> Dict[str, Dict]:
+        shared_lookups = self.shared_stats["hits"] + self.shared_stats["misses"]
+        return {
+            "static": self.static_cache.stats(),
+            "dynamic": self.dynamic_cache.stats(),
+            "shared": {
+                **self.shared_stats,
+                "hit_ratio": (
+                    self.shared_stats["hits"] / shared_lookups if shared_lookups else 0.0
+                ),
+            },
+            "in_flight": {
+                "calls": self.in_flight.calls,
+                "coalesced": self.in_flight.coalesced,
+                "abandoned": self.in_flight.abandoned,
+            },
+            **({"snapshot": self.snapshot.stats()} if self.snapshot is not None else {}),
+        }
+
+    async def aclose(self, drain_timeout: float = 0.0) -> None:
+        """Cancel pending background refreshes and upstream calls.
+
+        With `drain_timeout`, first give them that many seconds to finish so
+        callers still waiting on a fetch get their answer.
+        """
+        tasks: Set[asyncio.Task] = set(self._refresh_tasks.values())
+        tasks.update(self.in_flight.pending())
+        if tasks and drain_timeout > 0:
+            await asyncio.wait(tasks, timeout=drain_timeout)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refresh_tasks.clear()
+        await self.in_flight.aclose()
@@ -0,0 +1,313 @@
+import contextlib
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from pydantic import ValidationError
+from app.models import VenueDynamic, VenueStatic
+from app.utils.logging import logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+KINDS = ("static", "dynamic")
+MODELS = {"static": VenueStatic, "dynamic": VenueDynamic}
+
+
+class SnapshotRecord(NamedTuple):
+    kind: str
+    venue_slug: str
+    stored_at: float  # wall clock time the data was fetched
+    payload: bytes  # model JSON
+
+
+# (kind, venue_slug) -> (payload offset, payload length, stored at, CRC32)
+SnapshotIndex = Dict[Tuple[str, str], Tuple[int, int, float, int]]
+
+
+class SnapshotFormatError(Exception):
+    """Raised when a snapshot file is truncated, corrupt or of another version."""
+
+
+class VenueSnapshot:
+    """Last known venue data in a local file, for warm restarts.
+
+    The file is a header followed by records, each a fixed-size record
+    header, the venue slug and the model JSON:
+
+        header: magic, format version, written at, record count
+        record: kind, slug length, payload length, stored at, CRC32 of the
+                kind, stored at, slug and payload; slug; payload
+
+    `load()` memory-maps the file and only reads the record headers to
+    build an index, so startup cost does not depend on the payload sizes.
+    A record is checked and decoded when its venue is first requested
+    (`take()`); the caller stores it with its original age, so cache TTLs
+    decide whether it is served as is, refreshed in the background or only
+    used when the venue API fails.
+
+    Workers share the file. `write()` merges the given records into what is
+    on disk, keeping the newest record per venue, and replaces the file
+    atomically (temporary file, fsync, rename), all under an exclusive lock
+    on `<path>.lock`. A reader, or a worker starting meanwhile, sees either
+    the old or the new snapshot, and no worker drops venues only another
+    one has cached. With `max_records`, only the newest records of each
+    kind are kept, so the file does not grow with every venue any worker
+    ever cached.
+    """
+
+    MAGIC = b"DOPCSNAP"
+    FORMAT_VERSION = 2
+    _HEADER = struct.Struct("!8sHdI")
+    _RECORD = struct.Struct("!BHIdI")
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time):
+        self.path = path
+        self._clock = clock
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._index: SnapshotIndex = {}
+        # (kind, venue_slug) -> when it was discarded; older records on disk
+        # are not merged back
+        self._discarded: Dict[Tuple[str, str], float] = {}
+        self.written_at: Optional[float] = None
+        self.restored = 0
+        self.writes = 0
+        self.write_failures = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._index
+
+    def load(self) -> int:
+        """Map the snapshot file and index its records. A missing or
+        invalid file leaves the snapshot empty. Returns the record count."""
+        self.close()
+        try:
+            self._file = open(self.path, "rb")
+        except FileNotFoundError:
+            logger.info("No venue snapshot at {}", self.path)
+            return 0
+        except OSError as e:
+            logger.warning("Cannot open venue snapshot {}: {}", self.path, e)
+            return 0
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._index, self.written_at = self._read_index(self._mmap)
+        except (OSError, ValueError, IndexError, struct.error, SnapshotFormatError) as e:
+            logger.warning("Ignoring venue snapshot {}: {}", self.path, e)
+            self.close()
+            return 0
+        logger.info(
+            "Loaded venue snapshot {} with {} records, {:.0f}s old",
+            self.path,
+            len(self._index),
+            self._clock() - self.written_at,
+        )
+        return len(self._index)
+
+    @classmethod
+    def _read_index(cls, data) -> Tuple[SnapshotIndex, float]:
+        if len(data) < cls._HEADER.size:
+            raise SnapshotFormatError("file is too short")
+        magic, version, written_at, count = cls._HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise SnapshotFormatError("not a venue snapshot")
+        if version != cls.FORMAT_VERSION:
+            raise SnapshotFormatError(f"unsupported format version {version}")
+
+        index = {}
+        offset = cls._HEADER.size
+        for _ in range(count):
+            kind, slug_length, payload_length, stored_at, checksum = (
+                cls._RECORD.unpack_from(data, offset)
+            )
+            offset += cls._RECORD.size
+            venue_slug = data[offset:offset + slug_length].decode()
+            offset += slug_length
+            index[(KINDS[kind], venue_slug)] = (
+                offset, payload_length, stored_at, checksum
+            )
+            offset += payload_length
+        if offset != len(data):
+            raise SnapshotFormatError("record sizes do not match the file size")
+        return index, written_at
+
+    @staticmethod
+    def _checksum(kind: str, venue_slug: str, stored_at: float, payload) -> int:
+        checksum = zlib.crc32(struct.pack("!Bd", KINDS.index(kind), stored_at))
+        checksum = zlib.crc32(venue_slug.encode(), checksum)
+        return zlib.crc32(payload, checksum)
+
+    @classmethod
+    def _records(cls, data, index: SnapshotIndex) -> Iterator[SnapshotRecord]:
+        """Records of an indexed file whose checksum matches."""
+        for (kind, venue_slug), (offset, length, stored_at, checksum) in index.items():
+            payload = data[offset:offset + length]
+            if cls._checksum(kind, venue_slug, stored_at, payload) == checksum:
+                yield SnapshotRecord(kind, venue_slug, stored_at, payload)
+
+    def take(self, kind: str, venue_slug: str) -> Optional[Tuple[object, float]]:
+        """Decode a venue's data and remove it from the index.
+
+        Returns (model, age in seconds), or None if the snapshot has no
+        usable record for it.
+        """
+        entry = self._index.pop((kind, venue_slug), None)
+        if entry is None:
+            return None
+        offset, length, stored_at, checksum = entry
+        payload = self._mmap[offset:offset + length]
+        if self._checksum(kind, venue_slug, stored_at, payload) != checksum:
+            logger.warning("Corrupt snapshot record for {}/{}", venue_slug, kind)
+            return None
+        try:
+            value = MODELS[kind].model_validate_json(payload)
+            if kind == "dynamic":
+                value.delivery_specs.compiled
+        except (ValidationError, ValueError) as e:
+            logger.warning("Bad snapshot record for {}/{}: {}", venue_slug, kind, e)
+            return None
+        self.restored += 1
+        return value, max(0.0, self._clock() - stored_at)
+
+    def discard(self, kind: str, venue_slug: str) -> None:
+        """Forget a record, e.g. because the venue data was invalidated.
+        Records for it stored before now are not merged back from disk."""
+        self._index.pop((kind, venue_slug), None)
+        self._discarded[(kind, venue_slug)] = self._clock()
+
+    def write(
+        self,
+        records: Iterable[SnapshotRecord],
+        max_records: Optional[Dict[str, int]] = None,
+    ) -> int:
+        """Merge `records` into the snapshot file and replace it atomically.
+
+        Records on disk are kept unless `records` has a newer one for the
+        venue or it was discarded after they were stored. `max_records`
+        caps the records kept per kind, dropping the oldest. Blocking; run
+        it in a thread. Returns the number of records written.
+        """
+        merged = {(record.kind, record.venue_slug): record for record in records}
+        # discard() may run on the event loop meanwhile
+        discarded = dict(self._discarded)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._locked():
+            for record in self._read_file():
+                key = (record.kind, record.venue_slug)
+                current = merged.get(key)
+                if current is not None:
+                    if current.stored_at < record.stored_at:
+                        merged[key] = record
+                elif discarded.get(key, float("-inf")) < record.stored_at:
+                    merged[key] = record
+            if max_records is not None:
+                merged = self._newest(merged, max_records)
+            self._replace(directory, merged.values())
+        # The file no longer has those records
+        for key, discarded_at in discarded.items():
+            if self._discarded.get(key) == discarded_at:
+                del self._discarded[key]
+        self.writes += 1
+        return len(merged)
+
+    @staticmethod
+    def _newest(
+        records: Dict[Tuple[str, str], SnapshotRecord], max_records: Dict[str, int]
+    ) -> Dict[Tuple[str, str], SnapshotRecord]:
+        kept = {}
+        for kind in KINDS:
+            of_kind = [record for record in records.values() if record.kind == kind]
+            limit = max_records.get(kind)
+            if limit is not None and len(of_kind) > limit:
+                of_kind = heapq.nlargest(limit, of_kind, key=lambda r: r.stored_at)
+            kept.update(((r.kind, r.venue_slug), r) for r in of_kind)
+        return kept
+
+    @contextlib.contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold an exclusive lock on `<path>.lock`, shared with every worker
+        writing the same snapshot."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_file(self) -> List[SnapshotRecord]:
+        """Valid records of the file on disk; none if it is missing or invalid."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+            index, _ = self._read_index(data)
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, IndexError, struct.error, SnapshotFormatError) as e:
+            logger.warning("Not merging venue snapshot {}: {}", self.path, e)
+            return []
+        return list(self._records(data, index))
+
+    def _replace(self, directory: str, records: Iterable[SnapshotRecord]) -> None:
+        parts = []
+        count = 0
+        for record in records:
+            slug = record.venue_slug.encode()
+            parts.append(
+                self._RECORD.pack(
+                    KINDS.index(record.kind),
+                    len(slug),
+                    len(record.payload),
+                    record.stored_at,
+                    self._checksum(
+                        record.kind, record.venue_slug, record.stored_at, record.payload
+                    ),
+                )
+            )
+            parts.append(slug)
+            parts.append(record.payload)
+            count += 1
+        header = self._HEADER.pack(self.MAGIC, self.FORMAT_VERSION, self._clock(), count)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(b"".join(parts))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "size": len(self._index),
+            "restored": self.restored,
+            "writes": self.writes,
+            "write_failures": self.write_failures,
+        }
+
+    def close(self) -> None:
+        """Unmap the file. Records not taken yet are dropped."""
+        self._index = {}
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
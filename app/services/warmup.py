@@ -0,0 +1,89 @@
+import asyncio
+from time import monotonic
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException
+from app.utils.concurrency import gather_or_cancel
+from app.utils.constants import WARMUP_CONCURRENCY, WARMUP_TIMEOUT
+from app.utils.logging import logger
+from .venue_service import VenueService
+
+
+class VenueWarmup:
+    """Prefetches hot venues into the VenueService caches at startup.
+
+    Static and dynamic data for each venue are fetched together, with at
+    most `max_concurrency` venues in flight. A venue that fails is logged
+    and skipped; warm-up still finishes. If the whole run takes longer than
+    `timeout` it is abandoned so a slow upstream cannot keep the worker
+    from becoming ready.
+    """
+
+    def __init__(
+        self,
+        venue_service: VenueService,
+        venue_slugs: List[str],
+        max_concurrency: int = WARMUP_CONCURRENCY,
+        timeout: float = WARMUP_TIMEOUT,
+    ):
+        self.venue_service = venue_service
+        # Duplicates would only be fetched from the cache again
+        self.venue_slugs = list(dict.fromkeys(venue_slugs))
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.warmed: List[str] = []
+        self.failed: Dict[str, int] = {}
+        self.timed_out = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    async def warm_venue(self, venue_slug: str) -> None:
+        async with self._semaphore:
+            try:
+                await gather_or_cancel(
+                    self.venue_service.get_venue_static(venue_slug),
+                    self.venue_service.get_venue_dynamic(venue_slug),
+                )
+            except HTTPException as e:
+                logger.warning("Warm-up of venue {} failed: {}", venue_slug, e.detail)
+                self.failed[venue_slug] = e.status_code
+                return
+            self.warmed.append(venue_slug)
+
+    async def run(self) -> None:
+        self.started_at = monotonic()
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(self.warm_venue(slug) for slug in self.venue_slugs)),
+                self.timeout,
+            )
+        except asyncio.TimeoutError:
+            self.timed_out = True
+            logger.warning(
+                "Warm-up timed out after {}s with {}/{} venues done",
+                self.timeout,
+                len(self.warmed) + len(self.failed),
+                len(self.venue_slugs),
+            )
+        finally:
+            self.finished_at = monotonic()
+        logger.info(
+            "Warm-up finished: {} venues cached, {} failed in {:.2f}s",
+            len(self.warmed),
+            len(self.failed),
+            self.finished_at - self.started_at,
+        )
+
+    def progress(self) -> Dict[str, Any]:
+        end = self.finished_at if self.done else monotonic()
+        return {
+            "ready": self.done,
+            "total": len(self.venue_slugs),
+            "warmed": len(self.warmed),
+            "failed": len(self.failed),
+            "timed_out": self.timed_out,
+            "elapsed": round(end - self.started_at, 3) if self.started_at else 0.0,
+        }
@@ -0,0 +1,192 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+from fastapi import HTTPException
+from .metrics import ADMISSION_SHED
+
+"""Admission control for the request path.
+
+At most `max_concurrency` requests run at once per worker; the rest wait in
+a bounded queue for up to `queue_timeout` seconds. Requests are shed with a
+fast 503 (or 429 when one venue exceeds its share) carrying Retry-After when:
+
+- the queue is full,
+- the wait expected from the current queue and recent service times would
+  exceed the request's remaining time, so it would time out anyway,
+- it waited `queue_timeout` without getting a slot.
+
+Fairness: one venue may hold at most `max_venue_concurrency` slots and
+`max_venue_queue` queue places, and freed slots go to queued venues in
+round-robin order, so a hot venue cannot starve the others.
+"""
+
+SHED_REASONS = ("queue_full", "venue_limit", "deadline", "timeout")
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        max_venue_concurrency: Optional[int] = None,
+        max_venue_queue: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_venue_concurrency = max_venue_concurrency or max_concurrency
+        self.max_venue_queue = max_venue_queue or max_queue
+        self._clock = clock
+        self.active = 0
+        self.queued = 0
+        self._active_by_venue: Dict[str, int] = {}
+        # Venue -> waiters; iteration order is the round-robin order
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._service_time: Optional[float] = None  # EWMA, seconds
+        self.admitted = 0
+        self.shed: Dict[str, int] = dict.fromkeys(SHED_REASONS, 0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_concurrency > 0
+
+    @property
+    def service_time(self) -> Optional[float]:
+        return self._service_time
+
+    def expected_wait(self, position: Optional[int] = None) -> float:
+        """Seconds until a request at queue `position` (default: the back of
+        the queue) can be expected to get a slot."""
+        if self._service_time is None:
+            return 0.0
+        if position is None:
+            position = self.queued + 1
+        return math.ceil(position / self.max_concurrency) * self._service_time
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait before retrying, at least 1."""
+        return max(1, math.ceil(self.expected_wait()))
+
+    @asynccontextmanager
+    async def admit(
+        self, venue_slug: str, timeout: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        """Hold a slot for `venue_slug` while the block runs.
+
+        `timeout` is the time the caller has left; the queue wait is capped
+        by it as well as by `queue_timeout`.
+        """
+        if not self.enabled:
+            yield
+            return
+        await self.acquire(venue_slug, timeout)
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self.release(venue_slug, self._clock() - started)
+
+    async def acquire(self, venue_slug: str, timeout: Optional[float] = None) -> None:
+        wait_limit = (
+            self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        )
+        if (
+            self.active < self.max_concurrency
+            and self._active_by_venue.get(venue_slug, 0) < self.max_venue_concurrency
+            and venue_slug not in self._queues
+        ):
+            self._start(venue_slug)
+            return
+
+        venue_queue = self._queues.get(venue_slug)
+        if venue_queue is not None and len(venue_queue) >= self.max_venue_queue:
+            self._reject("venue_limit", 429, "Too many pending requests for this venue")
+        if self.queued >= self.max_queue:
+            self._reject("queue_full", 503, "Server is overloaded")
+        if self.expected_wait() > wait_limit:
+            self._reject("deadline", 503, "Server is overloaded")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(venue_slug, deque()).append(waiter)
+        self.queued += 1
+        try:
+            await asyncio.wait((waiter,), timeout=max(wait_limit, 0.0))
+        except asyncio.CancelledError:
+            # Client went away while queued; hand back a slot granted meanwhile
+            if not self._dequeue(venue_slug, waiter):
+                self.release(venue_slug)
+            raise
+        if not waiter.done():
+            self._dequeue(venue_slug, waiter)
+            self._reject("timeout", 503, "Timed out waiting for capacity")
+
+    def release(self, venue_slug: str, service_time: Optional[float] = None) -> None:
+        self.active -= 1
+        remaining = self._active_by_venue[venue_slug] - 1
+        if remaining:
+            self._active_by_venue[venue_slug] = remaining
+        else:
+            del self._active_by_venue[venue_slug]
+        if service_time is not None:
+            self._service_time = (
+                service_time
+                if self._service_time is None
+                else 0.8 * self._service_time + 0.2 * service_time
+            )
+        self._dispatch()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "service_time": self._service_time,
+        }
+
+    def _start(self, venue_slug: str) -> None:
+        self.active += 1
+        self.admitted += 1
+        self._active_by_venue[venue_slug] = self._active_by_venue.get(venue_slug, 0) + 1
+
+    def _dispatch(self) -> None:
+        """Hand free slots to queued venues in round-robin order."""
+        while self.active < self.max_concurrency and self._queues:
+            for venue_slug, venue_queue in self._queues.items():
+                if self._active_by_venue.get(venue_slug, 0) < self.max_venue_concurrency:
+                    break
+            else:
+                return  # every queued venue is at its own limit
+            waiter = venue_queue.popleft()
+            self.queued -= 1
+            if venue_queue:
+                self._queues.move_to_end(venue_slug)
+            else:
+                del self._queues[venue_slug]
+            self._start(venue_slug)
+            waiter.set_result(None)
+
+    def _dequeue(self, venue_slug: str, waiter: asyncio.Future) -> bool:
+        """Remove a waiter that has not been granted a slot yet."""
+        venue_queue = self._queues.get(venue_slug)
+        if venue_queue is None or waiter not in venue_queue:
+            return False
+        venue_queue.remove(waiter)
+        self.queued -= 1
+        if not venue_queue:
+            del self._queues[venue_slug]
+        return True
+
+    def _reject(self, reason: str, status_code: int, detail: str) -> None:
+        self.shed[reason] += 1
+        ADMISSION_SHED.inc(reason)
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after())},
+        )
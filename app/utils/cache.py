@@ -0,0 +1,155 @@
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+V = TypeVar("V")
+
+
+class CacheState(str, Enum):
+    FRESH = "fresh"  # within ttl
+    STALE = "stale"  # past ttl, inside the stale-while-revalidate window
+    EXPIRED = "expired"  # past both windows (still kept until evicted)
+    MISSING = "missing"
+
+
+class TTLCache(Generic[V]):
+    """In-process LRU cache with per-entry TTL and a stale window.
+
+    Entries are not dropped when they expire, only when the cache is full, so
+    callers can still fall back to the last known value. Lookups classify an
+    entry as fresh, stale (serve and refresh in the background) or expired
+    (treat as a miss). `on_evict(key)` is called for every entry dropped to
+    make room.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        stale_ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        on_evict: Optional[Callable[[Hashable], None]] = None,
+    ):
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_size = max_size
+        self._clock = clock
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Maintained by owners that refresh entries in the background
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.error_fallbacks = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def lookup(self, key: Hashable) -> Tuple[Optional[V], CacheState]:
+        """Return (value, state) and update hit/miss counters.
+
+        The value is returned for every state except MISSING, so callers can
+        decide whether an expired entry is still good enough.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, CacheState.MISSING
+        stored_at, value = entry
+        self._entries.move_to_end(key)
+        state = self._classify(stored_at)
+        if state is CacheState.FRESH:
+            self.hits += 1
+        elif state is CacheState.STALE:
+            self.stale_hits += 1
+        else:
+            self.misses += 1
+        return value, state
+
+    def state(self, key: Hashable) -> CacheState:
+        """Classify an entry like `lookup()`, without touching stats or the
+        LRU order."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return CacheState.MISSING
+        return self._classify(entry[0])
+
+    def _classify(self, stored_at: float) -> CacheState:
+        age = self._clock() - stored_at
+        if age < self.ttl:
+            return CacheState.FRESH
+        if age < self.ttl + self.stale_ttl:
+            return CacheState.STALE
+        return CacheState.EXPIRED
+
+    def keys(self) -> List[Hashable]:
+        """Stored keys, least recently used first (any age)."""
+        return list(self._entries)
+
+    def items(self) -> List[Tuple[Hashable, V, float]]:
+        """(key, value, age in seconds) of every entry, least recently used first."""
+        now = self._clock()
+        return [
+            (key, value, now - stored_at)
+            for key, (stored_at, value) in self._entries.items()
+        ]
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return the value only if it is fresh."""
+        value, state = self.lookup(key)
+        return value if state is CacheState.FRESH else None
+
+    def peek(self, key: Hashable) -> Optional[V]:
+        """Return any stored value regardless of age, without touching stats."""
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: Hashable, value: V, age: float = 0.0) -> None:
+        """Store a value; `age` backdates it, e.g. for data restored from disk."""
+        self._entries[key] = (self._clock() - age, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            evicted, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict is not None:
+                self.on_evict(evicted)
+
+    def invalidate(self, key: Hashable) -> bool:
+        return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "error_fallbacks": self.error_fallbacks,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,278 @@
+import asyncio
+import hashlib
+import os
+import struct
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+from urllib.parse import unquote, urlparse
+from app.utils.cache import TTLCache
+
+"""Shared cache backends for venue data.
+
+VenueService keeps its own in-process TTLCache per worker. A CacheBackend
+sits behind it so data fetched by one worker (or pod) can be reused by the
+others before anyone goes to the venue API. Values are opaque bytes with a
+TTL in seconds.
+
+Backends are selected with a URL (see `create_cache_backend`):
+- memory://              in-process, mostly for tests and single workers
+- file:///var/cache/dopc one file per key, shared by workers on one host
+- redis://host:6379/0    any server speaking the Redis protocol (RESP)
+"""
+
+
+class CacheBackendError(Exception):
+    """Raised when a shared cache backend cannot be reached or fails."""
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the stored value, or None if missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store a value for `ttl` seconds."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a value. Missing keys are ignored."""
+
+    async def aclose(self) -> None:
+        """Release connections or handles."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process backend. Only shared within one worker."""
+
+    def __init__(self, max_size: int = 10000):
+        self._cache: TTLCache[tuple] = TTLCache(ttl=float("inf"), max_size=max_size)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._cache.peek(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.time() >= expires_at:
+            self._cache.invalidate(key)
+            return None
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._cache.set(key, (time.time() + ttl, value))
+
+    async def delete(self, key: str) -> None:
+        self._cache.invalidate(key)
+
+
+class FileCacheBackend(CacheBackend):
+    """One file per key in a directory, shared by processes on one host.
+
+    Each file holds an 8-byte expiry timestamp followed by the value.
+    Writes go to a temporary file that is renamed into place, so readers
+    never see a partial value. File I/O runs in a thread; filesystem errors
+    are raised as CacheBackendError.
+    """
+
+    _HEADER = struct.Struct("!d")
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.directory, digest)
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < self._HEADER.size:
+            return None
+        (expires_at,) = self._HEADER.unpack_from(data)
+        if time.time() >= expires_at:
+            return None
+        return data[self._HEADER.size:]
+
+    def _write(self, key: str, value: bytes, ttl: float) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self._HEADER.pack(time.time() + ttl))
+                f.write(value)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    async def _run(func, *args: Any) -> Any:
+        try:
+            return await asyncio.to_thread(func, *args)
+        except OSError as e:
+            raise CacheBackendError(f"File cache error: {e!r}") from e
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._run(self._read, key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._run(self._write, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._delete, key)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Minimal Redis protocol (RESP2) client for GET/SET PX/DEL.
+
+    Uses one connection, with commands serialized by a lock. That is enough
+    for a second-level cache that is only consulted on in-process misses. The
+    connection is re-opened after any error.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        timeout: float = 0.5,
+    ):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _encode(*args: Any) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def _read_reply(self) -> Any:
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionResetError("Connection closed by cache server")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            raise CacheBackendError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise CacheBackendError(f"Unexpected reply from cache server: {line!r}")
+
+    async def _send(self, *args: Any) -> Any:
+        self._writer.write(self._encode(*args))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._send("AUTH", self.password)
+        if self.db:
+            await self._send("SELECT", self.db)
+
+    def _abort_connection(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+
+    async def _close_connection(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _command(self, *args: Any) -> Any:
+        if self._writer is None:
+            try:
+                await self._connect()
+            except CacheBackendError:
+                await self._close_connection()
+                raise
+        return await self._send(*args)
+
+    async def command(self, *args: Any) -> Any:
+        """Send one command and return the decoded reply."""
+        async with self._lock:
+            try:
+                return await asyncio.wait_for(self._command(*args), self.timeout)
+            except CacheBackendError:
+                # Error reply, read in full; the connection is still in sync
+                raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                # The connection may hold a partial reply; start over next time
+                await self._close_connection()
+                raise CacheBackendError(f"Cache server error: {e!r}") from e
+            except BaseException:
+                # Cancelled mid-command: the reply would be read by the next
+                # command, so drop the connection without awaiting anything
+                self._abort_connection()
+                raise
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.command("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.command("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self.command("DEL", key)
+
+    async def aclose(self) -> None:
+        async with self._lock:
+            await self._close_connection()
+
+
+def create_cache_backend(url: str) -> Optional[CacheBackend]:
+    """Build a backend from a URL; an empty URL means no shared cache."""
+    if not url:
+        return None
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return MemoryCacheBackend()
+    if parsed.scheme == "file":
+        return FileCacheBackend(unquote(parsed.path))
+    if parsed.scheme == "redis":
+        db = parsed.path.lstrip("/")
+        return RedisCacheBackend(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=unquote(parsed.password) if parsed.password else None,
+        )
+    raise ValueError(f"Unsupported cache backend URL: {url}")
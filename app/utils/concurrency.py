@@ -0,0 +1,117 @@
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, TypeVar
+from app.utils.deadline import Deadline
+
+T = TypeVar("T")
+
+
+async def gather_or_cancel(*aws: Awaitable[Any]) -> List[Any]:
+    """Run awaitables concurrently and return their results in order.
+
+    Unlike asyncio.gather, the first failure cancels the remaining siblings
+    and is re-raised unchanged, so an HTTPException from one upstream call
+    keeps its status code and no orphaned request is left running.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in done:
+            if task.exception() is not None:
+                raise task.exception()
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class _Call:
+    __slots__ = ("task", "deadline", "waiters")
+
+    def __init__(self, deadline: Optional[Deadline]):
+        self.task: Optional[asyncio.Task] = None
+        self.deadline = deadline
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one in-flight call.
+
+    The first caller for a key starts the work in its own task; callers that
+    arrive while it is running await the same result. Each caller is shielded,
+    so one caller giving up, or running out of its deadline, does not cancel
+    the call for everybody else. The call is cancelled once the last caller
+    has left, so nobody pays for work that no one waits for any more.
+
+    `fn(deadline)` gets the latest deadline among the callers, which later
+    callers extend, or None while one of them waits without a deadline.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[Optional[Deadline]], Awaitable[T]],
+        deadline: Optional[Deadline] = None,
+    ) -> T:
+        """Result of the call for `key`, started with `fn(deadline)` if none
+        is in flight.
+
+        Raises:
+            asyncio.TimeoutError: if `deadline` passed while this caller
+                waited; the call keeps running if others still wait for it
+        """
+        call = self._calls.get(key)
+        if call is None:
+            self.calls += 1
+            call = _Call(copy.copy(deadline))
+            call.task = asyncio.ensure_future(fn(call.deadline))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.coalesced += 1
+            if call.deadline is not None:
+                call.deadline.extend(deadline)
+        call.waiters += 1
+        try:
+            return await asyncio.wait_for(
+                asyncio.shield(call.task),
+                deadline.remaining() if deadline is not None else None,
+            )
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                self.abandoned += 1
+                call.task.cancel()
+                # A caller arriving before the cancellation lands starts afresh
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+
+    def pending(self) -> List[asyncio.Task]:
+        """Calls currently in flight."""
+        return [call.task for call in self._calls.values()]
+
+    async def aclose(self) -> None:
+        """Cancel calls still in flight, e.g. on shutdown."""
+        tasks = self.pending()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        call = self._calls.get(key)
+        if call is not None and call.task is task:
+            del self._calls[key]
+        # Mark the error as retrieved even if every caller already gave up
+        if not task.cancelled():
+            task.exception()
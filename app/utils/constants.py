@@ -1,6 +1,115 @@
+import os
+
 # API URLs
 API_BASE_URL = "https://consumer-api.development.dev.woltapi.com"
-VENUE_ENDPOINT = f"{API_BASE_URL}/home-assignment-api/v1/venues/"
+VENUE_ENDPOINT = os.getenv(
+    "DOPC_VENUE_ENDPOINT", f"{API_BASE_URL}/home-assignment-api/v1/venues/"
+)
+
+# Venue API HTTP client (overridable from the environment)
+HTTP_TIMEOUT = float(os.getenv("DOPC_HTTP_TIMEOUT", "10"))  # seconds
+HTTP_HTTP2 = os.getenv("DOPC_HTTP_HTTP2", "true").lower() in ("1", "true", "yes")
+HTTP_MAX_CONNECTIONS = int(os.getenv("DOPC_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("DOPC_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("DOPC_HTTP_KEEPALIVE_EXPIRY", "30"))  # seconds
+
+# Venue API resilience: circuit breaker per endpoint, budgeted retries, hedging
+HTTP_BREAKER_FAILURE_THRESHOLD = int(os.getenv("DOPC_HTTP_BREAKER_FAILURES", "5"))
+HTTP_BREAKER_RECOVERY_TIMEOUT = float(os.getenv("DOPC_HTTP_BREAKER_RECOVERY", "30"))  # seconds
+HTTP_MAX_RETRIES = int(os.getenv("DOPC_HTTP_MAX_RETRIES", "2"))
+HTTP_RETRY_BACKOFF_BASE = float(os.getenv("DOPC_HTTP_RETRY_BACKOFF_BASE", "0.05"))  # seconds
+HTTP_RETRY_BACKOFF_CAP = float(os.getenv("DOPC_HTTP_RETRY_BACKOFF_CAP", "1.0"))  # seconds
+HTTP_RETRY_BUDGET_RATIO = float(os.getenv("DOPC_HTTP_RETRY_BUDGET_RATIO", "0.2"))
+HTTP_HEDGE = os.getenv("DOPC_HTTP_HEDGE", "false").lower() in ("1", "true", "yes")
+HTTP_HEDGE_PERCENTILE = float(os.getenv("DOPC_HTTP_HEDGE_PERCENTILE", "0.95"))
+HTTP_HEDGE_MIN_DELAY = float(os.getenv("DOPC_HTTP_HEDGE_MIN_DELAY", "0.01"))  # seconds
+
+# Venue static data cache
+STATIC_CACHE_TTL = float(os.getenv("DOPC_STATIC_CACHE_TTL", "3600"))  # seconds
+STATIC_CACHE_STALE_TTL = float(os.getenv("DOPC_STATIC_CACHE_STALE_TTL", "86400"))  # seconds
+STATIC_CACHE_MAX_SIZE = int(os.getenv("DOPC_STATIC_CACHE_MAX_SIZE", "5000"))
+
+# Venue dynamic data (delivery specs) cache
+DYNAMIC_CACHE_TTL = float(os.getenv("DOPC_DYNAMIC_CACHE_TTL", "30"))  # seconds
+DYNAMIC_CACHE_STALE_TTL = float(os.getenv("DOPC_DYNAMIC_CACHE_STALE_TTL", "0"))  # seconds
+DYNAMIC_CACHE_MAX_SIZE = int(os.getenv("DOPC_DYNAMIC_CACHE_MAX_SIZE", "5000"))
+
+# On-disk snapshot of venue data for warm restarts (empty path disables)
+SNAPSHOT_PATH = os.getenv("DOPC_SNAPSHOT_PATH", "")
+SNAPSHOT_INTERVAL = float(os.getenv("DOPC_SNAPSHOT_INTERVAL", "60"))  # seconds
+
+# Shared second-level venue cache: memory://, file:///path or redis://host:port/db
+CACHE_BACKEND_URL = os.getenv("DOPC_CACHE_BACKEND_URL", "")
+# How often a worker checks the shared cache for updates pushed to another worker
+SHARED_UPDATE_CHECK_INTERVAL = float(
+    os.getenv("DOPC_SHARED_UPDATE_CHECK_INTERVAL", "1")
+)  # seconds
+
+# Venue update webhook: HMAC-SHA256 secret (empty disables the endpoint)
+WEBHOOK_SECRET = os.getenv("DOPC_WEBHOOK_SECRET", "")
+WEBHOOK_MAX_CLOCK_SKEW = float(os.getenv("DOPC_WEBHOOK_MAX_CLOCK_SKEW", "300"))  # seconds
+
+# Startup warm-up: comma-separated venue slugs prefetched before reporting ready
+WARMUP_VENUES = [
+    slug.strip() for slug in os.getenv("DOPC_WARMUP_VENUES", "").split(",") if slug.strip()
+]
+WARMUP_CONCURRENCY = int(os.getenv("DOPC_WARMUP_CONCURRENCY", "8"))
+WARMUP_TIMEOUT = float(os.getenv("DOPC_WARMUP_TIMEOUT", "30"))  # seconds
+
+# Memoized quote responses for identical (quantized) requests
+QUOTE_CACHE_TTL = float(os.getenv("DOPC_QUOTE_CACHE_TTL", "30"))  # seconds
+QUOTE_CACHE_MAX_SIZE = int(os.getenv("DOPC_QUOTE_CACHE_MAX_SIZE", "100000"))
+QUOTE_CACHE_PRECISION = int(os.getenv("DOPC_QUOTE_CACHE_PRECISION", "6"))  # decimals, 6 ~ 0.1m
+QUOTE_HTTP_MAX_AGE = int(os.getenv("DOPC_QUOTE_HTTP_MAX_AGE", "5"))  # Cache-Control, seconds
+
+# Request deadlines: clients may send their remaining budget in milliseconds
+REQUEST_DEADLINE_HEADER = "X-DOPC-Deadline-Ms"
+REQUEST_TIMEOUT = float(os.getenv("DOPC_REQUEST_TIMEOUT", "10"))  # seconds, without header
+REQUEST_TIMEOUT_MAX = float(os.getenv("DOPC_REQUEST_TIMEOUT_MAX", "30"))  # seconds
+
+# Geo index of cached venues for nearby-venue queries
+GEO_INDEX_CELL_SIZE = float(os.getenv("DOPC_GEO_INDEX_CELL_SIZE", "2000"))  # meters
+GEO_INDEX_MAX_CELLS_PER_VENUE = int(os.getenv("DOPC_GEO_INDEX_MAX_CELLS", "1024"))
+NEARBY_MAX_RESULTS = int(os.getenv("DOPC_NEARBY_MAX_RESULTS", "100"))
+
+# Delivery zones: fee tier rings per venue, served as GeoJSON
+DELIVERY_ZONE_RING_POINTS = int(os.getenv("DOPC_DELIVERY_ZONE_RING_POINTS", "64"))  # vertices per circle
+DELIVERY_ZONE_HTTP_MAX_AGE = int(os.getenv("DOPC_DELIVERY_ZONE_HTTP_MAX_AGE", "30"))  # Cache-Control, seconds
+
+# Admission control on the price endpoint (per worker; 0 concurrency disables)
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("DOPC_ADMISSION_MAX_CONCURRENCY", "256"))
+ADMISSION_MAX_QUEUE = int(os.getenv("DOPC_ADMISSION_MAX_QUEUE", "1024"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("DOPC_ADMISSION_QUEUE_TIMEOUT", "1.0"))  # seconds
+ADMISSION_VENUE_SHARE = float(os.getenv("DOPC_ADMISSION_VENUE_SHARE", "0.5"))  # of slots and queue
+
+# Batch pricing
+BATCH_MAX_ITEMS = int(os.getenv("DOPC_BATCH_MAX_ITEMS", "1000"))
+BATCH_VENUE_CONCURRENCY = int(os.getenv("DOPC_BATCH_VENUE_CONCURRENCY", "16"))
+
+# Venue-to-many-points fee matrix
+MATRIX_MAX_POINTS = int(os.getenv("DOPC_MATRIX_MAX_POINTS", "100000"))
+MATRIX_STREAM_CHUNK_SIZE = int(os.getenv("DOPC_MATRIX_STREAM_CHUNK_SIZE", "1000"))
+
+# Production server (python -m app.server)
+SERVER_HOST = os.getenv("DOPC_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("DOPC_PORT", "8080"))
+SERVER_WORKERS = os.getenv("DOPC_WORKERS", "auto")  # "auto" = usable CPU cores
+SERVER_LOOP = os.getenv("DOPC_LOOP", "auto")  # auto picks uvloop when installed
+SERVER_HTTP = os.getenv("DOPC_HTTP", "auto")  # auto picks httptools when installed
+SERVER_RELOAD = os.getenv("DOPC_RELOAD", "false").lower() in ("1", "true", "yes")
+SERVER_GRACEFUL_SHUTDOWN_TIMEOUT = float(os.getenv("DOPC_GRACEFUL_SHUTDOWN_TIMEOUT", "30"))  # seconds
+SERVER_DRAIN_TIMEOUT = float(os.getenv("DOPC_DRAIN_TIMEOUT", "5"))  # seconds, venue fetches on shutdown
+SERVER_LIMIT_MAX_REQUESTS = int(os.getenv("DOPC_LIMIT_MAX_REQUESTS", "0"))  # 0 = never recycle workers
+SERVER_KEEPALIVE_TIMEOUT = int(os.getenv("DOPC_KEEPALIVE_TIMEOUT", "5"))  # seconds
+SERVER_BACKLOG = int(os.getenv("DOPC_BACKLOG", "2048"))
+SERVER_ACCESS_LOG = os.getenv("DOPC_ACCESS_LOG", "false").lower() in ("1", "true", "yes")
+
+# Logging
+LOG_LEVEL = os.getenv("DOPC_LOG_LEVEL", "INFO")
+LOG_FILE = os.getenv("DOPC_LOG_FILE", "logs/app.log")  # empty disables the file sink
+LOG_JSON = os.getenv("DOPC_LOG_JSON", "false").lower() in ("1", "true", "yes")
+LOG_FILE_JSON = os.getenv("DOPC_LOG_FILE_JSON", "true").lower() in ("1", "true", "yes")
+LOG_SAMPLE_RATE = float(os.getenv("DOPC_LOG_SAMPLE_RATE", "1.0"))  # per-request INFO lines
 
 # Query param ranges Constants
 MIN_LAT = -90
@@ -0,0 +1,145 @@
+import asyncio
+import math
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+from fastapi import HTTPException
+
+"""Per-request deadlines.
+
+A Deadline is created once per request (from the client's header or the
+default) and passed down to every upstream call, which then waits only for
+the time that is left instead of the full HTTP client timeout.
+"""
+
+T = TypeVar("T")
+
+# nginx's "client closed request"; only ever seen in metrics and logs
+CLIENT_CLOSED_REQUEST = 499
+
+
+class Deadline:
+    __slots__ = ("expires_at", "_clock")
+
+    def __init__(self, timeout: float, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.expires_at = clock() + timeout
+
+    @classmethod
+    def from_header(
+        cls, value: Optional[str], default: float, maximum: float
+    ) -> "Deadline":
+        """Deadline from a millisecond budget header, capped at `maximum`
+        seconds, or `default` seconds when the header is absent.
+
+        Raises:
+            HTTPException: 400 if the header is not a positive number
+        """
+        if value is None:
+            return cls(default)
+        try:
+            timeout = float(value) / 1000
+        except ValueError:
+            timeout = float("nan")
+        if not timeout > 0:
+            raise HTTPException(status_code=400, detail=f"Invalid deadline: {value!r}")
+        return cls(min(timeout, maximum))
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self._clock() >= self.expires_at
+
+    def timeout(self, cap: float) -> float:
+        """Time an operation may take: what is left, but at most `cap`."""
+        return min(cap, self.remaining())
+
+    def extend(self, other: Optional["Deadline"]) -> None:
+        """Move this deadline out to `other`, or lift it for None; never
+        earlier."""
+        if other is None:
+            self.expires_at = math.inf
+        else:
+            self.expires_at = max(self.expires_at, other.expires_at)
+
+    def check(self) -> None:
+        """Raise 504 if the deadline has passed."""
+        if self.expired:
+            raise deadline_exceeded()
+
+
+def deadline_exceeded() -> HTTPException:
+    return HTTPException(status_code=504, detail="Deadline exceeded")
+
+
+async def wait_for_deadline(aw: Awaitable[T], deadline: Deadline) -> T:
+    """Like asyncio.wait_for with what is left of `deadline`, but following
+    the deadline if it is extended while waiting.
+
+    Raises:
+        asyncio.TimeoutError: if the deadline passed first; `aw` is cancelled
+    """
+    task = asyncio.ensure_future(aw)
+    try:
+        while not task.done():
+            remaining = deadline.remaining()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            await asyncio.wait(
+                {task}, timeout=None if remaining == math.inf else remaining
+            )
+        return task.result()
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def run_with_deadline(
+    aw: Awaitable[T],
+    deadline: Deadline,
+    disconnected: Optional[Callable[[], Awaitable[object]]] = None,
+) -> T:
+    """Await `aw`, cancelling it when the deadline passes (504) or when
+    `disconnected()` completes because the client went away (499).
+
+    `aw` runs in the calling task, which is cancelled from a timer, so the
+    common case costs no extra task beyond the disconnect watcher.
+    """
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    expired_with: Optional[int] = None  # status code, once we cancelled the task
+
+    def expire(status_code: int) -> None:
+        nonlocal expired_with
+        if expired_with is None:
+            expired_with = status_code
+            task.cancel()
+
+    def on_disconnect(done: asyncio.Future) -> None:
+        if not done.cancelled() and done.exception() is None:
+            expire(CLIENT_CLOSED_REQUEST)
+
+    timer = loop.call_later(deadline.remaining(), expire, 504)
+    watcher = None
+    if disconnected is not None:
+        watcher = asyncio.ensure_future(disconnected())
+        watcher.add_done_callback(on_disconnect)
+    try:
+        return await aw
+    except asyncio.CancelledError:
+        if expired_with is None:
+            raise
+        # The cancellation was ours and ends here; without this a later
+        # asyncio.timeout() in this task would see it as still cancelled
+        if hasattr(task, "uncancel"):  # Python 3.11+
+            task.uncancel()
+        if expired_with == CLIENT_CLOSED_REQUEST:
+            raise HTTPException(
+                status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request"
+            ) from None
+        raise deadline_exceeded() from None
+    finally:
+        timer.cancel()
+        if watcher is not None:
+            watcher.cancel()
@@ -0,0 +1,60 @@
+import json
+from typing import Any, List, Sequence, Tuple
+from fastapi.responses import JSONResponse
+
+"""JSON encoding and decoding for the request path.
+
+orjson is used when installed and the standard library otherwise; both
+produce the same compact output as Starlette's JSONResponse.
+
+`extract_paths` reads a few nested values out of an upstream body with a
+single decode. A text scan that decodes only the values at the paths was
+tried, but locating keys reliably (at the right depth, not inside
+strings) in pure Python costs several times more than orjson decoding the
+whole body in C.
+"""
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+KeyPath = Tuple[str, ...]
+
+
+def dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(
+        obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+def loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _walk(data: Any, path: KeyPath) -> Any:
+    for key in path:
+        data = data[key]
+    return data
+
+
+def extract_paths(body: bytes, paths: Sequence[KeyPath]) -> List[Any]:
+    """Values at each key path of a JSON object body.
+
+    Raises:
+        KeyError: if a path is missing from the body
+        ValueError: if the body is not valid JSON
+    """
+    data = loads(body)
+    return [_walk(data, path) for path in paths]
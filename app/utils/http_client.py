@@ -1,32 +1,305 @@
-from typing import Any, Dict
+import asyncio
+from time import perf_counter
+from typing import Any, Dict, List, Optional
 import httpx
 from fastapi import HTTPException
-from app.utils.logging import logger
+from app.utils.deadline import Deadline, deadline_exceeded, wait_for_deadline
+from app.utils.fast_json import KeyPath, extract_paths, loads
+from app.utils.logging import logger, request_logger
+from app.utils.metrics import UPSTREAM_RESPONSES, UPSTREAM_RETRIES
+from app.utils.resilience import (
+    BreakerState,
+    CircuitBreaker,
+    LatencyTracker,
+    RetryBudget,
+    backoff_delay,
+)
+from app.utils.constants import (
+    HTTP_TIMEOUT,
+    HTTP_HTTP2,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_BREAKER_FAILURE_THRESHOLD,
+    HTTP_BREAKER_RECOVERY_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_RETRY_BACKOFF_BASE,
+    HTTP_RETRY_BACKOFF_CAP,
+    HTTP_RETRY_BUDGET_RATIO,
+    HTTP_HEDGE,
+    HTTP_HEDGE_PERCENTILE,
+    HTTP_HEDGE_MIN_DELAY,
+)
+
+# Gateway errors and timeouts are worth another try; other statuses are not
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
 
 
 class HTTPClient:
-    def __init__(self, base_url: str, timeout: int = 10):
+    """Pooled HTTP client for the external venue API.
+
+    A single httpx.AsyncClient is kept for the lifetime of the HTTPClient so
+    TCP/TLS connections are reused between requests. The owner (normally the
+    FastAPI lifespan) is responsible for calling `aclose()` on shutdown.
+
+    Each endpoint kind ("static", "dynamic") has its own circuit breaker:
+    5xx responses and timeouts count as failures, and while the breaker is
+    open calls fail fast with 503. Gateway errors and timeouts are retried
+    with jittered backoff as long as the shared retry budget allows. With
+    `hedge` enabled, a second request is sent when the first one is slower
+    than the endpoint's recent p95 latency, and the first answer wins.
+
+    With a request `deadline`, each attempt may only take the time that is
+    left (following the deadline if it is extended meanwhile), no retry is
+    started that could not finish in time, and running out of time raises
+    504 without counting against the breaker.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = HTTP_TIMEOUT,
+        http2: bool = HTTP_HTTP2,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_retries: int = HTTP_MAX_RETRIES,
+        retry_budget: Optional[RetryBudget] = None,
+        breaker_failure_threshold: int = HTTP_BREAKER_FAILURE_THRESHOLD,
+        breaker_recovery_timeout: float = HTTP_BREAKER_RECOVERY_TIMEOUT,
+        hedge: bool = HTTP_HEDGE,
+    ):
         self.base_url = base_url
         self.timeout = timeout
+        self.http2 = http2 and self._http2_available()
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self.max_retries = max_retries
+        if retry_budget is None:
+            retry_budget = RetryBudget(HTTP_RETRY_BUDGET_RATIO)
+        self.retry_budget = retry_budget
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_recovery_timeout = breaker_recovery_timeout
+        self.hedge = hedge
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyTracker] = {}
+
+    @staticmethod
+    def _http2_available() -> bool:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP/2 requested but 'h2' is not installed, using HTTP/1.1")
+            return False
+        return True
+
+    def breaker(self, kind: str) -> CircuitBreaker:
+        breaker = self.breakers.get(kind)
+        if breaker is None:
+            breaker = self.breakers[kind] = CircuitBreaker(
+                self.breaker_failure_threshold, self.breaker_recovery_timeout
+            )
+        return breaker
+
+    def latency(self, kind: str) -> LatencyTracker:
+        tracker = self.latencies.get(kind)
+        if tracker is None:
+            tracker = self.latencies[kind] = LatencyTracker()
+        return tracker
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared AsyncClient, created on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close pooled connections. Safe to call more than once."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def __aenter__(self) -> "HTTPClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def get(
+        self, endpoint: str, deadline: Optional[Deadline] = None
+    ) -> Dict[str, Any]:
+        """GET `endpoint` and return the decoded JSON body."""
+        body = await self.get_bytes(endpoint, deadline)
+        try:
+            return loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=500, detail=f"External API error: {str(e)}")
+
+    async def get_paths(
+        self, endpoint: str, *paths: KeyPath, deadline: Optional[Deadline] = None
+    ) -> List[Any]:
+        """GET `endpoint` and return only the values at the given key paths.
+
+        Raises:
+            KeyError: if the body lacks one of the paths
+        """
+        body = await self.get_bytes(endpoint, deadline)
+        try:
+            return extract_paths(body, paths)
+        except ValueError as e:
+            raise HTTPException(status_code=500, detail=f"External API error: {str(e)}")
+
+    async def get_bytes(
+        self, endpoint: str, deadline: Optional[Deadline] = None
+    ) -> bytes:
+        """GET `endpoint` through the circuit breaker, retries and hedging,
+        returning the raw 200 response body."""
+        # Label by endpoint kind ("static"/"dynamic"), not by venue slug
+        kind = endpoint.rstrip("/").rsplit("/", 1)[-1]
+        if deadline is not None and deadline.expired:
+            UPSTREAM_RESPONSES.inc(kind, "deadline")
+            raise deadline_exceeded()
+        breaker = self.breaker(kind)
+        if not breaker.allow():
+            UPSTREAM_RESPONSES.inc(kind, "circuit_open")
+            raise HTTPException(
+                status_code=503, detail=f"Venue API circuit open for {kind} data"
+            )
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            try:
+                body = await self._get_hedged(kind, endpoint, deadline)
+            except asyncio.CancelledError:
+                breaker.record_abandoned()
+                raise
+            except HTTPException as e:
+                if e.status_code == 504 and deadline is not None and deadline.expired:
+                    # Our own time ran out; that says nothing about the upstream
+                    breaker.record_abandoned()
+                    UPSTREAM_RESPONSES.inc(kind, "deadline")
+                    raise deadline_exceeded()
+                if e.status_code < 500:
+                    # The upstream answered; a 404 says nothing about its health
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                delay = backoff_delay(
+                    attempt + 1, HTTP_RETRY_BACKOFF_BASE, HTTP_RETRY_BACKOFF_CAP
+                )
+                if not (
+                    self._is_retryable(e)
+                    and attempt < self.max_retries
+                    and breaker.state is BreakerState.CLOSED
+                    # No retry that could not even start before the deadline
+                    and (deadline is None or deadline.remaining() > delay)
+                    and self.retry_budget.withdraw()
+                ):
+                    raise
+                attempt += 1
+                UPSTREAM_RETRIES.inc(kind, "retry")
+                await asyncio.sleep(delay)
+                continue
+            breaker.record_success()
+            return body
+
+    @staticmethod
+    def _is_retryable(error: BaseException) -> bool:
+        return (
+            isinstance(error, HTTPException)
+            and error.status_code in RETRYABLE_STATUS_CODES
+        )
+
+    def _hedge_delay(self, kind: str) -> Optional[float]:
+        if not self.hedge:
+            return None
+        p95 = self.latency(kind).percentile(HTTP_HEDGE_PERCENTILE)
+        return None if p95 is None else max(p95, HTTP_HEDGE_MIN_DELAY)
+
+    async def _get_hedged(
+        self, kind: str, endpoint: str, deadline: Optional[Deadline] = None
+    ) -> bytes:
+        """Send the request, and a second copy if the first one is slower
+        than the hedging delay. The first successful answer is returned and
+        the other request is cancelled."""
+        delay = self._hedge_delay(kind)
+        if delay is None:
+            return await self._get_once(kind, endpoint, deadline)
+
+        tasks = [asyncio.ensure_future(self._get_once(kind, endpoint, deadline))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and self.retry_budget.withdraw():
+                UPSTREAM_RETRIES.inc(kind, "hedge")
+                tasks.append(
+                    asyncio.ensure_future(self._get_once(kind, endpoint, deadline))
+                )
+            error: Optional[BaseException] = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    if not self._is_retryable(task.exception()):
+                        raise task.exception()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-    async def get(self, endpoint: str) -> Dict[str, Any]:
+    async def _get_once(
+        self, kind: str, endpoint: str, deadline: Optional[Deadline] = None
+    ) -> bytes:
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(f"{self.base_url}{endpoint}")
-                logger.info(f"GET {self.base_url}{endpoint} - {response.status_code}")
-                # Check specific status code
-                if response.status_code != 200:
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"External API returned {response.status_code}: {response.text}",
-                    )
-                return response.json()
+            start = perf_counter()
+            url = f"{self.base_url}{endpoint}"
+            if deadline is None:
+                response = await self.client.get(url)
+            else:
+                # httpx timeouts apply per phase; the deadline bounds the whole
+                # call, and may be extended meanwhile by a coalesced caller
+                response = await wait_for_deadline(self.client.get(url), deadline)
+            UPSTREAM_RESPONSES.inc(kind, str(response.status_code))
+            request_logger.info(
+                "GET {}{} - {}", self.base_url, endpoint, response.status_code
+            )
+            # Check specific status code
+            if response.status_code != 200:
+                raise HTTPException(
+                    status_code=response.status_code,
+                    detail=f"External API returned {response.status_code}: {response.text}",
+                )
+            self.latency(kind).record(perf_counter() - start)
+            return response.content
         except HTTPException:
             # Re-raise HTTPExceptions to avoid being caught by the generic block
             raise
-        except httpx.TimeoutException:
+        except (httpx.TimeoutException, asyncio.TimeoutError):
+            UPSTREAM_RESPONSES.inc(kind, "timeout")
             raise HTTPException(status_code=504, detail="Request timeout")
         except httpx.HTTPStatusError as e:
             raise HTTPException(status_code=e.response.status_code, detail=str(e))
+        except httpx.TransportError as e:
+            UPSTREAM_RESPONSES.inc(kind, "error")
+            raise HTTPException(status_code=502, detail=f"External API unreachable: {str(e)}")
         except Exception as e:
+            UPSTREAM_RESPONSES.inc(kind, "error")
             raise HTTPException(status_code=500, detail=f"External API error: {str(e)}")
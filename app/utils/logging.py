@@ -1,6 +1,54 @@
+import random
+import sys
 from loguru import logger
-
-# Configure logger
-logger.add(
-    "logs/app.log", rotation="500 MB", level="INFO", format="{time} {level} {message}"
+from app.utils.constants import (
+    LOG_LEVEL,
+    LOG_FILE,
+    LOG_JSON,
+    LOG_FILE_JSON,
+    LOG_SAMPLE_RATE,
 )
+
+# Configure logger.
+# enqueue=True moves the sink writes (stderr, file) to a background thread.
+# Formatting the message, pickling the record and writing it to the queue's
+# pipe still happen on the calling (event loop) thread.
+logger.remove()
+logger.add(sys.stderr, level=LOG_LEVEL, serialize=LOG_JSON, enqueue=True)
+if LOG_FILE:
+    logger.add(
+        LOG_FILE,
+        rotation="500 MB",
+        level=LOG_LEVEL,
+        format="{time} {level} {message}",
+        serialize=LOG_FILE_JSON,
+        enqueue=True,
+    )
+
+
+class SampledLogger:
+    """Logger for per-request INFO lines.
+
+    Only a `rate` fraction of calls is logged. The sampling decision is
+    made before the message is formatted, so skipped lines cost one
+    random() call. Use "{}" placeholders instead of f-strings:
+
+        request_logger.info("Calculated delivery distance: {}m", distance)
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+
+    def _sampled(self) -> bool:
+        return self.rate >= 1 or (self.rate > 0 and random.random() < self.rate)
+
+    def info(self, message: str, *args, **kwargs) -> None:
+        if self._sampled():
+            logger.opt(depth=1).info(message, *args, **kwargs)
+
+    def debug(self, message: str, *args, **kwargs) -> None:
+        if self._sampled():
+            logger.opt(depth=1).debug(message, *args, **kwargs)
+
+
+request_logger = SampledLogger(LOG_SAMPLE_RATE)
@@ -0,0 +1,295 @@
+from bisect import bisect_left
+from time import perf_counter
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+"""Minimal in-process metrics with Prometheus text exposition.
+
+Recording is a dict lookup plus an integer/float update, cheap enough for
+the request path. Label values are passed positionally in `labelnames`
+order. Values are per worker process; each worker exposes its own /metrics.
+"""
+
+LabelValues = Tuple[str, ...]
+T = TypeVar("T")
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames: Tuple[str, ...], labelvalues: Iterable[str]) -> str:
+    pairs = [
+        f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)
+    ]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """(suffix, labels, value) per line, without the metric name."""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def samples(self):
+        return [
+            ("_total", _format_labels(self.labelnames, labels), value)
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        self._values[labelvalues] = value
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def dec(self, *labelvalues: str, amount: float = 1) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def samples(self):
+        return [
+            ("", _format_labels(self.labelnames, labels), value)
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class CallbackGauge(Metric):
+    """Gauge whose values are read from a callback at scrape time.
+
+    The callback returns {label values tuple: value}.
+    """
+    type_name = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...],
+        callback: Callable[[], Dict[LabelValues, float]],
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self):
+        return [
+            ("", _format_labels(self.labelnames, labels), value)
+            for labels, value in sorted(self.callback().items())
+        ]
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        state = self._values.get(labelvalues)
+        if state is None:
+            state = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def time(self, *labelvalues: str) -> "_Timer":
+        """Context manager observing the elapsed wall time in seconds."""
+        return _Timer(self, labelvalues)
+
+    def count(self, *labelvalues: str) -> int:
+        state = self._values.get(labelvalues)
+        return state[2] if state else 0
+
+    def samples(self):
+        samples = []
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append(
+                    (
+                        "_bucket",
+                        _format_labels(
+                            self.labelnames + ("le",), labels + (_format_value(bound),)
+                        ),
+                        cumulative,
+                    )
+                )
+            samples.append(("_sum", _format_labels(self.labelnames, labels), total))
+            samples.append(("_count", _format_labels(self.labelnames, labels), count))
+        return samples
+
+
+class _Timer:
+    __slots__ = ("histogram", "labelvalues", "start")
+
+    def __init__(self, histogram: Histogram, labelvalues: LabelValues):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self) -> "_Timer":
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.histogram.observe(perf_counter() - self.start, *self.labelvalues)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric; a metric with the same name is replaced."""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_LATENCY = REGISTRY.register(
+    Histogram(
+        "dopc_stage_duration_seconds",
+        "Time spent in each stage of the price pipeline",
+        ("stage",),
+    )
+)
+REQUEST_LATENCY = REGISTRY.register(
+    Histogram(
+        "dopc_request_duration_seconds",
+        "End-to-end HTTP request duration",
+        ("path", "status"),
+    )
+)
+IN_FLIGHT_REQUESTS = REGISTRY.register(
+    Gauge("dopc_in_flight_requests", "HTTP requests currently being handled")
+)
+UPSTREAM_RESPONSES = REGISTRY.register(
+    Counter(
+        "dopc_upstream_responses",
+        "Venue API responses by endpoint and status code",
+        ("endpoint", "status"),
+    )
+)
+
+UPSTREAM_RETRIES = REGISTRY.register(
+    Counter(
+        "dopc_upstream_retries",
+        "Venue API retries and hedged requests by endpoint",
+        ("endpoint", "reason"),
+    )
+)
+
+ADMISSION_SHED = REGISTRY.register(
+    Counter(
+        "dopc_admission_shed",
+        "Requests rejected by admission control by reason",
+        ("reason",),
+    )
+)
+
+
+async def timed_stage(stage: str, aw: Awaitable[T]) -> T:
+    """Await `aw` and record its duration as a price pipeline stage."""
+    with STAGE_LATENCY.time(stage):
+        return await aw
+
+
+class MetricsMiddleware:
+    """ASGI middleware tracking in-flight requests and request duration.
+
+    The start time is stored in the request state as `start_time` so
+    handlers can measure how long parameter parsing took.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        scope.setdefault("state", {})["start_time"] = start
+        status = "500"
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        IN_FLIGHT_REQUESTS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT_REQUESTS.dec()
+            route = scope.get("route")
+            # Route templates keep the label set small; unmatched paths share one
+            path = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.observe(perf_counter() - start, path, status)
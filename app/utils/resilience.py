@@ -0,0 +1,146 @@
+import random
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Deque, Optional
+
+"""Building blocks for calling the venue API defensively.
+
+- CircuitBreaker: stop calling an endpoint that keeps failing, probe it
+  again after a cool-down.
+- RetryBudget: retries (and hedged requests) may only add a fixed fraction
+  on top of normal traffic, so retrying never multiplies load on an
+  upstream that is already struggling.
+- LatencyTracker: rolling latency window used to pick the hedging delay.
+- backoff_delay: exponential backoff with full jitter.
+"""
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"  # calls go through
+    OPEN = "open"  # calls fail fast
+    HALF_OPEN = "half_open"  # one probe call is allowed through
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Opens after `failure_threshold` failures in a row. After
+    `recovery_timeout` seconds one probe call is let through: success closes
+    the breaker, failure opens it again for another `recovery_timeout`.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        recovery_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold must be positive")
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.opened = 0
+
+    @property
+    def state(self) -> BreakerState:
+        if (
+            self._state is BreakerState.OPEN
+            and self._clock() - self._opened_at >= self.recovery_timeout
+        ):
+            self._state = BreakerState.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be made now. In half-open state only the first
+        caller gets through, until its result is recorded."""
+        state = self.state
+        if state is BreakerState.CLOSED:
+            return True
+        if state is BreakerState.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_abandoned(self) -> None:
+        """The call ended without telling us anything about the upstream
+        (cancelled, or the caller ran out of time): let another probe in."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if (
+            self._state is BreakerState.HALF_OPEN
+            or self._failures >= self.failure_threshold
+        ):
+            if self._state is not BreakerState.OPEN:
+                self.opened += 1
+            self._state = BreakerState.OPEN
+            self._opened_at = self._clock()
+            self._probe_in_flight = False
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of requests.
+
+    Every request deposits `ratio` tokens, every retry withdraws one. The
+    bucket starts with `min_tokens` so low-traffic workers can still retry.
+    """
+
+    def __init__(self, ratio: float, min_tokens: float = 10, max_tokens: float = 100):
+        self.ratio = ratio
+        self.max_tokens = max(max_tokens, min_tokens)
+        self._tokens = float(min_tokens)
+        self.exhausted = 0
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def deposit(self) -> None:
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        self.exhausted += 1
+        return False
+
+
+class LatencyTracker:
+    """Latencies (seconds) of the last `window` successful calls."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        self._samples.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency at quantile `q` (0-1), or None until `min_samples` calls
+        have been seen."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for retry `attempt` (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
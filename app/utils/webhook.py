@@ -0,0 +1,47 @@
+import hashlib
+import hmac
+import time
+from typing import Optional
+from fastapi import HTTPException
+
+"""HMAC signatures for internal webhooks.
+
+The sender signs "<timestamp>.<raw body>" with the shared secret and sends
+
+    X-DOPC-Timestamp: <unix seconds>
+    X-DOPC-Signature: sha256=<hex digest>
+
+Including the timestamp lets the receiver reject replayed requests.
+"""
+
+SIGNATURE_PREFIX = "sha256="
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    digest = hmac.new(
+        secret.encode(), timestamp.encode() + b"." + body, hashlib.sha256
+    ).hexdigest()
+    return SIGNATURE_PREFIX + digest
+
+
+def verify_signature(
+    secret: str,
+    body: bytes,
+    timestamp: Optional[str],
+    signature: Optional[str],
+    max_clock_skew: float,
+    now: Optional[float] = None,
+) -> None:
+    """Raises:
+        HTTPException: 401 if the signature is missing, wrong or too old
+    """
+    if not timestamp or not signature:
+        raise HTTPException(status_code=401, detail="Missing webhook signature")
+    try:
+        sent_at = float(timestamp)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid webhook timestamp")
+    if abs((time.time() if now is None else now) - sent_at) > max_clock_skew:
+        raise HTTPException(status_code=401, detail="Webhook timestamp out of range")
+    if not hmac.compare_digest(sign(secret, timestamp, body), signature):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
@@ -0,0 +1,213 @@
+"""End-to-end throughput and latency of the price endpoint.
+
+Sends `--requests` price requests with `--concurrency` in flight, spread
+over `--venues` venues (hot venues get more traffic) and random user
+locations around each venue, against the offline mock venue API.
+
+Modes:
+    server  Start the mock venue API and DOPC under uvicorn as separate
+            processes and load them over HTTP (closest to production).
+    asgi    Run DOPC in-process through httpx.ASGITransport with the mock
+            as an httpx.MockTransport: no sockets and no server, which
+            isolates the application's own cost.
+
+Usage:
+    python -m benchmarks.bench_e2e --mode asgi --requests 5000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List
+
+import httpx
+
+from app.utils.logging import logger
+
+from .common import percentiles, write_results
+from .mock_venue_api import MockVenueAPI, venue_location
+
+PRICE_PATH = "/api/v1/delivery-order-price"
+
+
+def make_workload(
+    requests: int, venues: int, seed: int = 0
+) -> List[Dict[str, object]]:
+    """Query params for `requests` price requests. Venue popularity follows
+    1/rank, users are up to ~2km from the venue, so some are out of range."""
+    rng = random.Random(seed)
+    slugs = [f"venue-{i}" for i in range(venues)]
+    weights = [1 / (rank + 1) for rank in range(venues)]
+    workload = []
+    for venue_slug in rng.choices(slugs, weights, k=requests):
+        latitude, longitude = venue_location(venue_slug)
+        workload.append(
+            {
+                "venue_slug": venue_slug,
+                "cart_value": rng.randrange(0, 3000),
+                "user_lat": round(latitude + rng.uniform(-0.012, 0.012), 6),
+                "user_lon": round(longitude + rng.uniform(-0.024, 0.024), 6),
+            }
+        )
+    return workload
+
+
+async def run_load(
+    client: httpx.AsyncClient, workload: List[Dict[str, object]], concurrency: int
+) -> dict:
+    """Closed-loop load: `concurrency` workers send requests back to back."""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    queue = iter(workload)
+
+    async def worker():
+        for params in queue:
+            start = time.perf_counter()
+            try:
+                response = await client.get(PRICE_PATH, params=params)
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": len(workload),
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(workload) / elapsed,
+        "latency_ms": percentiles(latencies),
+        "statuses": dict(statuses),
+    }
+
+
+@asynccontextmanager
+async def asgi_target(mock: MockVenueAPI) -> AsyncIterator[httpx.AsyncClient]:
+    from app.main import app
+    from app.services.quote_cache import QuoteCache
+    from app.services.venue_service import VenueService
+    from app.utils.http_client import HTTPClient
+
+    venue_client = HTTPClient("http://venue-api/", transport=httpx.MockTransport(mock))
+    venue_service = VenueService(venue_client)
+    app.state.venue_service = venue_service
+    app.state.quote_cache = QuoteCache()
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://dopc"
+        ) as client:
+            yield client
+    finally:
+        await venue_service.aclose()
+        await venue_client.aclose()
+
+
+async def wait_until_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{url} not ready after {timeout}s")
+            await asyncio.sleep(0.2)
+
+
+@asynccontextmanager
+async def server_target(args: argparse.Namespace) -> AsyncIterator[httpx.AsyncClient]:
+    mock = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.mock_venue_api",
+            "--port", str(args.mock_port),
+            "--latency-ms", str(args.latency_ms),
+            "--jitter-ms", str(args.jitter_ms),
+            "--error-rate", str(args.error_rate),
+            "--padding", str(args.padding),
+        ]
+    )
+    env = {
+        **os.environ,
+        "DOPC_VENUE_ENDPOINT": f"http://127.0.0.1:{args.mock_port}/",
+        "DOPC_LOG_FILE": "",
+        "DOPC_LOG_LEVEL": "WARNING",
+        # Same server profile as production (python -m app.server)
+        "DOPC_HOST": "127.0.0.1",
+        "DOPC_PORT": str(args.port),
+        "DOPC_WORKERS": str(args.workers),
+        "DOPC_ACCESS_LOG": "false",
+        "DOPC_RELOAD": "false",
+    }
+    dopc = subprocess.Popen([sys.executable, "-m", "app.server"], env=env)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        await wait_until_ready(f"{base_url}/health/ready")
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+            yield client
+    finally:
+        for process in (dopc, mock):
+            process.terminate()
+            process.wait(timeout=10)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    workload = make_workload(args.requests, args.venues, args.seed)
+    mock = MockVenueAPI(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        padding=args.padding,
+        seed=args.seed,
+    )
+    target = asgi_target(mock) if args.mode == "asgi" else server_target(args)
+    async with target as client:
+        # Warm-up pass over the first venues, not measured
+        await run_load(client, workload[: args.concurrency * 4], args.concurrency)
+        results = await run_load(client, workload, args.concurrency)
+    results["config"] = {
+        key: getattr(args, key)
+        for key in (
+            "mode", "venues", "latency_ms", "jitter_ms", "error_rate", "padding", "workers"
+        )
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("asgi", "server"), default="asgi")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--venues", type=int, default=200)
+    parser.add_argument(
+        "--latency-ms", type=float, default=20.0, help="mock venue API latency"
+    )
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--padding", type=int, default=50, help="extra fields per payload")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="uvicorn workers (server mode)"
+    )
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--mock-port", type=int, default=8091)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="result file, '-' for stdout")
+    args = parser.parse_args()
+
+    logger.disable("app")
+    results = asyncio.run(run(args))
+    write_results(f"e2e-{args.mode}", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Micro-benchmarks for the pricing building blocks.
+
+Covers distance calculation (model, float and bulk paths), distance fee
+lookup (linear scan and compiled specs), Pydantic model construction,
+upstream payload parsing, the end-to-end per-request pipeline, nearby
+venue queries against the geo index and loading the venue snapshot index.
+Timings are best-of-5 microseconds per call.
+
+Usage:
+    python -m benchmarks.bench_micro [--number N] [--output FILE|-]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app.models import (
+    DeliveryFeeInfo,
+    DeliveryPriceResponse,
+    DeliverySpecs,
+    GPSCoordinates,
+    PriceQuote,
+    VenueDynamic,
+    VenueStatic,
+)
+from app.services.distance_calculator import DistanceCalculator
+from app.services.total_fee_calculator import (
+    calculate_compiled_distance_fee,
+    calculate_distance_fee,
+)
+from app.services.venue_index import VenueGeoIndex
+from app.services.venue_snapshot import SnapshotRecord, VenueSnapshot
+from app.utils.fast_json import dumps, extract_paths, loads
+from app.utils.logging import logger
+
+from . import bench_request_pipeline
+from .common import time_per_call, write_results
+from .mock_venue_api import DISTANCE_RANGES, MockVenueAPI
+
+VENUE = GPSCoordinates(latitude=60.17012143, longitude=24.92813512)
+USER = GPSCoordinates(latitude=60.17094, longitude=24.93087)
+BULK_POINTS = 10_000
+# Distance in the last priced range, the worst case for a linear scan
+FEE_DISTANCE = 1700
+GEO_INDEX_VENUES = 20_000
+SNAPSHOT_VENUES = 20_000
+
+
+def distance_benchmarks(number: int) -> dict:
+    rng = np.random.default_rng(0)
+    user_lats = VENUE.latitude + rng.uniform(-0.02, 0.02, BULK_POINTS)
+    user_lons = VENUE.longitude + rng.uniform(-0.04, 0.04, BULK_POINTS)
+    bulk_us = time_per_call(
+        lambda: DistanceCalculator.calculate_straight_line_bulk(
+            VENUE.latitude, VENUE.longitude, user_lats, user_lons
+        ),
+        max(1, number // 1000),
+    )
+    return {
+        "calculate_straight_line_us": time_per_call(
+            lambda: DistanceCalculator.calculate_straight_line(VENUE, USER), number
+        ),
+        "haversine_us": time_per_call(
+            lambda: DistanceCalculator.haversine(
+                VENUE.latitude, VENUE.longitude, USER.latitude, USER.longitude
+            ),
+            number,
+        ),
+        "bulk_us_per_point": bulk_us / BULK_POINTS,
+    }
+
+
+def fee_benchmarks(number: int) -> dict:
+    specs = DeliverySpecs(
+        order_minimum_no_surcharge=1000, base_price=190, distance_ranges=DISTANCE_RANGES
+    )
+    compiled = specs.compiled
+    return {
+        "calculate_distance_fee_us": time_per_call(
+            lambda: calculate_distance_fee(
+                FEE_DISTANCE, specs.base_price, specs.distance_ranges
+            ),
+            number,
+        ),
+        "calculate_compiled_distance_fee_us": time_per_call(
+            lambda: calculate_compiled_distance_fee(FEE_DISTANCE, compiled), number
+        ),
+    }
+
+
+def model_benchmarks(number: int) -> dict:
+    specs_data = {
+        "order_minimum_no_surcharge": 1000,
+        "base_price": 190,
+        "distance_ranges": DISTANCE_RANGES,
+    }
+    specs = DeliverySpecs(**specs_data)
+    quote = PriceQuote(
+        total_price=1190, small_order_surcharge=0, cart_value=1000, fee=190, distance=176
+    )
+    return {
+        "gps_coordinates_us": time_per_call(
+            lambda: GPSCoordinates.from_coordinates((24.92813512, 60.17012143)), number
+        ),
+        "venue_static_us": time_per_call(lambda: VenueStatic(location=VENUE), number),
+        "delivery_specs_us": time_per_call(lambda: DeliverySpecs(**specs_data), number),
+        "venue_dynamic_us": time_per_call(
+            lambda: VenueDynamic(delivery_specs=specs), number
+        ),
+        "delivery_specs_compile_us": time_per_call(
+            lambda: DeliverySpecs(**specs_data).compiled, number
+        ),
+        "delivery_price_response_us": time_per_call(
+            lambda: DeliveryPriceResponse(
+                total_price=1190,
+                small_order_surcharge=0,
+                cart_value=1000,
+                delivery=DeliveryFeeInfo(fee=190, distance=176),
+            ).model_dump(),
+            number,
+        ),
+        "price_quote_dumps_us": time_per_call(lambda: dumps(quote.to_dict()), number),
+    }
+
+
+def parsing_benchmarks(number: int, padding: int) -> dict:
+    api = MockVenueAPI(padding=padding)
+    _, body = api.respond("/venue/dynamic")
+    path = [("venue_raw", "delivery_specs")]
+    return {
+        "payload_bytes": len(body),
+        "full_parse_us": time_per_call(lambda: loads(body), max(1, number // 10)),
+        "extract_paths_us": time_per_call(
+            lambda: extract_paths(body, path), max(1, number // 10)
+        ),
+    }
+
+
+def geo_index_benchmarks(number: int) -> dict:
+    rng = np.random.default_rng(0)
+    specs = DeliverySpecs(
+        order_minimum_no_surcharge=1000, base_price=190, distance_ranges=DISTANCE_RANGES
+    ).compiled
+    index = VenueGeoIndex()
+    for i, (lat, lon) in enumerate(
+        zip(
+            VENUE.latitude + rng.uniform(-0.2, 0.2, GEO_INDEX_VENUES),
+            VENUE.longitude + rng.uniform(-0.4, 0.4, GEO_INDEX_VENUES),
+        )
+    ):
+        index.update(f"venue-{i}", GPSCoordinates(latitude=lat, longitude=lon), specs)
+    number = max(1, number // 100)
+    return {
+        "venues": GEO_INDEX_VENUES,
+        "candidates": len(list(index.candidates(USER.latitude, USER.longitude))),
+        "nearby_us": time_per_call(
+            lambda: index.nearby(USER.latitude, USER.longitude, 1000, limit=20), number
+        ),
+    }
+
+
+def snapshot_benchmarks(number: int) -> dict:
+    payload = VenueStatic(location=VENUE).model_dump_json().encode()
+    now = time.time()
+    with tempfile.TemporaryDirectory() as directory:
+        snapshot = VenueSnapshot(os.path.join(directory, "venues.snapshot"))
+        snapshot.write(
+            SnapshotRecord("static", f"venue-{i}", now, payload)
+            for i in range(SNAPSHOT_VENUES)
+        )
+        try:
+            return {
+                "records": SNAPSHOT_VENUES,
+                "load_us": time_per_call(snapshot.load, max(1, number // 2000)),
+            }
+        finally:
+            snapshot.close()
+
+
+def run(number: int, padding: int) -> dict:
+    # Logging has its own cost; keep it out of the CPU numbers
+    logger.disable("app")
+    try:
+        return {
+            "distance": distance_benchmarks(number),
+            "distance_fee": fee_benchmarks(number),
+            "models": model_benchmarks(number),
+            "upstream_parsing": parsing_benchmarks(number, padding),
+            "request_pipeline": bench_request_pipeline.run(number),
+            "geo_index": geo_index_benchmarks(number),
+            "snapshot": snapshot_benchmarks(number),
+        }
+    finally:
+        logger.enable("app")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="calls per timing")
+    parser.add_argument(
+        "--padding", type=int, default=300, help="extra fields in parsed payloads"
+    )
+    parser.add_argument("--output", help="result file, '-' for stdout")
+    args = parser.parse_args()
+    write_results("micro", run(args.number, args.padding), args.output)
+
+
+if __name__ == "__main__":
+    main()
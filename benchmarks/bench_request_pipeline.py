@@ -0,0 +1,162 @@
+"""Micro-benchmark: per-request CPU and allocations of the pricing pipeline.
+
+Compares the original all-Pydantic request path (models for the user
+location, venue data, fee info and response, then model_dump) with the
+fast path used by the service: cached venue data, plain floats, compiled
+specs and a slotted PriceQuote serialized with to_dict().
+
+Usage:
+    python -m benchmarks.bench_request_pipeline [--iterations N]
+"""
+import argparse
+import json
+import timeit
+import tracemalloc
+
+from app.models import (
+    DeliveryFeeInfo,
+    DeliveryPriceResponse,
+    DeliveryQueryParams,
+    DeliverySpecs,
+    GPSCoordinates,
+    VenueDynamic,
+    VenueStatic,
+)
+from app.services.delivery_fee_calculator import DeliveryFeeCalculator
+from app.services.distance_calculator import DistanceCalculator
+from app.services.total_fee_calculator import (
+    calculate_distance_fee,
+    calculate_small_order_surcharge,
+)
+from app.utils.constants import (
+    EXPECTED_BASE_PRICE,
+    EXPECTED_CART_VALUE,
+    EXPECTED_MIN_ORDER_NO_SURCHARGE,
+    EXPECTED_USER_LATITUDE,
+    EXPECTED_USER_LONGITUDE,
+    EXPECTED_VENUE_LATITUDE,
+    EXPECTED_VENUE_LONGITUDE,
+    EXPECTED_VENUE_SLUG,
+)
+from app.utils.logging import logger
+
+DISTANCE_RANGES = [
+    {"min": 0, "max": 500, "a": 0, "b": 0},
+    {"min": 500, "max": 1000, "a": 100, "b": 1},
+    {"min": 1000, "max": 1500, "a": 200, "b": 1},
+    {"min": 1500, "max": 2000, "a": 200, "b": 1},
+    {"min": 2000, "max": 0, "a": 0, "b": 0},
+]
+
+QUERY = DeliveryQueryParams(
+    venue_slug=EXPECTED_VENUE_SLUG,
+    cart_value=EXPECTED_CART_VALUE,
+    user_lat=EXPECTED_USER_LATITUDE,
+    user_lon=EXPECTED_USER_LONGITUDE,
+)
+
+
+def pydantic_pipeline() -> dict:
+    """Per-request work of the original implementation."""
+    user_location = QUERY.to_gps_coordinates()
+    venue_static = VenueStatic(
+        location=GPSCoordinates.from_coordinates(
+            (EXPECTED_VENUE_LONGITUDE, EXPECTED_VENUE_LATITUDE)
+        )
+    )
+    delivery_specs = DeliverySpecs(
+        order_minimum_no_surcharge=EXPECTED_MIN_ORDER_NO_SURCHARGE,
+        base_price=EXPECTED_BASE_PRICE,
+        distance_ranges=DISTANCE_RANGES,
+    )
+    venue_dynamic = VenueDynamic(delivery_specs=delivery_specs)
+    distance = DistanceCalculator.calculate_straight_line(
+        venue_static.location, user_location
+    )
+    fee = calculate_distance_fee(
+        distance,
+        venue_dynamic.delivery_specs.base_price,
+        venue_dynamic.delivery_specs.distance_ranges,
+    )
+    surcharge = calculate_small_order_surcharge(
+        QUERY.cart_value, venue_dynamic.delivery_specs.order_minimum_no_surcharge
+    )
+    response = DeliveryPriceResponse(
+        total_price=QUERY.cart_value + fee + surcharge,
+        small_order_surcharge=surcharge,
+        cart_value=QUERY.cart_value,
+        delivery=DeliveryFeeInfo(fee=fee, distance=distance),
+    )
+    return response.model_dump()
+
+
+def make_fast_pipeline():
+    """Per-request work of the current implementation, with venue data
+    already cached by VenueService."""
+    venue_static = VenueStatic(
+        location=GPSCoordinates(
+            latitude=EXPECTED_VENUE_LATITUDE, longitude=EXPECTED_VENUE_LONGITUDE
+        )
+    )
+    venue_dynamic = VenueDynamic(
+        delivery_specs=DeliverySpecs(
+            order_minimum_no_surcharge=EXPECTED_MIN_ORDER_NO_SURCHARGE,
+            base_price=EXPECTED_BASE_PRICE,
+            distance_ranges=DISTANCE_RANGES,
+        )
+    )
+    calculator = DeliveryFeeCalculator(QUERY, venue_service=object())
+
+    def fast_pipeline() -> dict:
+        return calculator.quote_for_venue(venue_static, venue_dynamic).to_dict()
+
+    return fast_pipeline
+
+
+def measure(fn, iterations: int) -> dict:
+    fn()  # warm up caches (compiled specs, pydantic validators)
+    seconds = min(timeit.repeat(fn, number=iterations, repeat=5))
+
+    return {
+        "us_per_request": seconds / iterations * 1e6,
+        "peak_bytes_per_request": _peak_bytes(fn),
+    }
+
+
+def _peak_bytes(fn) -> int:
+    """Peak traced memory while handling one request, i.e. the size of the
+    temporaries it allocates."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run(iterations: int) -> dict:
+    # Logging is benchmarked separately; keep it out of the CPU numbers
+    logger.disable("app")
+    fast_pipeline = make_fast_pipeline()
+    assert pydantic_pipeline() == fast_pipeline()
+    results = {
+        "pydantic_pipeline": measure(pydantic_pipeline, iterations),
+        "fast_pipeline": measure(fast_pipeline, iterations),
+    }
+    results["speedup"] = (
+        results["pydantic_pipeline"]["us_per_request"]
+        / results["fast_pipeline"]["us_per_request"]
+    )
+    logger.enable("app")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
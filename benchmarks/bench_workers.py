@@ -0,0 +1,94 @@
+"""Throughput scaling of the production server profile with worker count.
+
+Runs the server mode of bench_e2e (mock venue API + `python -m app.server`)
+once per worker count and reports throughput, latency and scaling
+efficiency relative to one worker. The load generator is a single Python
+process; on small machines it can saturate before the server does, so
+compare runs on the same host and keep `--concurrency` high.
+
+Usage:
+    python -m benchmarks.bench_workers --workers 1,2,4 --requests 20000
+"""
+import argparse
+import asyncio
+from typing import List
+
+from app.server import available_cpus
+from app.utils.logging import logger
+
+from .bench_e2e import run as run_e2e
+from .common import write_results
+
+
+def default_worker_counts(cpus: int) -> List[int]:
+    """1, 2, 4, ... up to and including `cpus`."""
+    counts = []
+    workers = 1
+    while workers < cpus:
+        counts.append(workers)
+        workers *= 2
+    counts.append(cpus)
+    return counts
+
+
+def scaling(runs: List[dict]) -> List[dict]:
+    """Per-run summary with speedup and efficiency against the first run."""
+    base = runs[0]
+    summary = []
+    for result in runs:
+        workers = result["config"]["workers"]
+        speedup = result["throughput_rps"] / base["throughput_rps"]
+        summary.append(
+            {
+                "workers": workers,
+                "throughput_rps": result["throughput_rps"],
+                "p99_ms": result["latency_ms"]["p99"],
+                "speedup": speedup,
+                "efficiency": speedup * base["config"]["workers"] / workers,
+            }
+        )
+    return summary
+
+
+async def run(args: argparse.Namespace) -> dict:
+    runs = []
+    for workers in args.worker_counts:
+        args.workers = workers
+        result = await run_e2e(args)
+        print(f"{workers} worker(s): {result['throughput_rps']:.0f} req/s")
+        runs.append(result)
+    return {"cpus": available_cpus(), "scaling": scaling(runs), "runs": runs}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--workers",
+        help="comma-separated worker counts (default: 1, 2, 4, ... up to CPU count)",
+    )
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--venues", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--padding", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--mock-port", type=int, default=8091)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="result file, '-' for stdout")
+    args = parser.parse_args()
+    args.mode = "server"
+    args.worker_counts = (
+        [int(count) for count in args.workers.split(",")]
+        if args.workers
+        else default_worker_counts(available_cpus())
+    )
+
+    logger.disable("app")
+    results = asyncio.run(run(args))
+    write_results("workers", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
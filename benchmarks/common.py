@@ -0,0 +1,76 @@
+"""Helpers shared by the benchmark scripts: timing, percentiles and result
+files tagged with the commit they were measured on."""
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata() -> Dict[str, object]:
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def time_per_call(fn: Callable[[], object], number: int, repeat: int = 5) -> float:
+    """Best-of-`repeat` microseconds per call."""
+    fn()  # warm up lazily built state (compiled specs, validators)
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number * 1e6
+
+
+def percentiles(
+    samples: Sequence[float], points: Sequence[float] = (50, 90, 99)
+) -> Dict[str, float]:
+    """Nearest-rank percentiles plus max, keyed "p50", "p90", ..., "max"."""
+    if not samples:
+        return {}
+    ordered: List[float] = sorted(samples)
+    result = {
+        f"p{point:g}": ordered[min(len(ordered) - 1, int(len(ordered) * point / 100))]
+        for point in points
+    }
+    result["max"] = ordered[-1]
+    return result
+
+
+def write_results(name: str, results: dict, output: Optional[str] = None) -> str:
+    """Write `results` with run metadata as JSON.
+
+    `output` may be a file path or "-" for stdout; by default results go to
+    benchmarks/results/<name>-<commit>.json. Returns where they were written.
+    """
+    document = {"benchmark": name, "metadata": metadata(), "results": results}
+    text = json.dumps(document, indent=2, sort_keys=True)
+    if output == "-":
+        print(text)
+        return "-"
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        commit = document["metadata"]["commit"] or "unknown"
+        output = os.path.join(RESULTS_DIR, f"{name}-{commit}.json")
+    with open(output, "w") as f:
+        f.write(text + "\n")
+    print(f"Results written to {output}", file=sys.stderr)
+    return output
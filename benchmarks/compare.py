@@ -0,0 +1,80 @@
+"""Compare two benchmark result files, e.g. from two commits.
+
+Every numeric result present in both files is listed with its relative
+change. Timings, latencies and allocations (keys ending in _us, _ms, _s,
+us_per_*, bytes_per_request, or under latency_ms) are better when lower; throughput and speedups when higher.
+Exits with status 1 if anything regressed by more than --threshold percent.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/micro-abc123.json \\
+        benchmarks/results/micro-def456.json --threshold 10
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Optional, Tuple
+
+HIGHER_IS_BETTER = ("rps", "speedup")
+LOWER_IS_BETTER = ("_us", "_ms", "_s", "us_per_request", "bytes_per_request", "us_per_point")
+# Inputs and counts, listed but never treated as a regression
+NEUTRAL_KEYS = ("config", "statuses", "requests", "concurrency", "payload_bytes")
+
+
+def flatten(results: dict, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    for key, value in results.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, float(value)
+
+
+def direction(path: str) -> Optional[int]:
+    """+1 if higher is better, -1 if lower is better, None if neutral."""
+    parts = path.split(".")
+    if any(part in NEUTRAL_KEYS for part in parts):
+        return None
+    if "latency_ms" in parts or parts[-1].endswith(LOWER_IS_BETTER):
+        return -1
+    if parts[-1].endswith(HIGHER_IS_BETTER):
+        return 1
+    return None
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> Tuple[str, bool]:
+    before: Dict[str, float] = dict(flatten(baseline["results"]))
+    after: Dict[str, float] = dict(flatten(candidate["results"]))
+    lines = [
+        f"{baseline['metadata'].get('commit')} -> {candidate['metadata'].get('commit')}",
+        f"{'metric':<60} {'before':>12} {'after':>12} {'change':>9}",
+    ]
+    regressed = False
+    for path in sorted(before.keys() & after.keys()):
+        old, new = before[path], after[path]
+        change = (new - old) / old * 100 if old else 0.0
+        better = direction(path)
+        marker = ""
+        if better is not None and -better * change > threshold:
+            marker = "  REGRESSION"
+            regressed = True
+        lines.append(f"{path:<60} {old:>12.4g} {new:>12.4g} {change:>8.1f}%{marker}")
+    return "\n".join(lines), regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent")
+    args = parser.parse_args()
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    report, regressed = compare(baseline, candidate, args.threshold)
+    print(report)
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Offline stand-in for the venue API, for benchmarks.
+
+Serves GET /{venue_slug}/static and GET /{venue_slug}/dynamic with payloads
+shaped like the real venue API. Every slug is a valid venue, with a location
+in Helsinki derived from the slug, except slugs starting with "missing",
+which return 404. Latency, jitter and error injection are configurable, and
+`padding` adds unrelated fields so payloads approach real-world sizes.
+
+The same object works as a standalone HTTP/1.1 server (no dependencies) and
+as an httpx.MockTransport handler for in-process runs.
+
+Usage:
+    python -m benchmarks.mock_venue_api --port 8081 --latency-ms 20 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.utils.fast_json import dumps
+
+CENTER_LATITUDE = 60.17
+CENTER_LONGITUDE = 24.94
+
+DISTANCE_RANGES = [
+    {"min": 0, "max": 500, "a": 0, "b": 0},
+    {"min": 500, "max": 1000, "a": 100, "b": 1},
+    {"min": 1000, "max": 1500, "a": 200, "b": 1},
+    {"min": 1500, "max": 2000, "a": 200, "b": 1},
+    {"min": 2000, "max": 0, "a": 0, "b": 0},
+]
+
+REASONS = {
+    200: "OK",
+    404: "Not Found",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
+}
+
+
+def venue_location(venue_slug: str) -> Tuple[float, float]:
+    """Deterministic (latitude, longitude) within ~5km of central Helsinki."""
+    digest = hashlib.sha1(venue_slug.encode()).digest()
+    lat_offset = int.from_bytes(digest[:4], "big") / 2**32 - 0.5
+    lon_offset = int.from_bytes(digest[4:8], "big") / 2**32 - 0.5
+    return CENTER_LATITUDE + lat_offset * 0.09, CENTER_LONGITUDE + lon_offset * 0.18
+
+
+class MockVenueAPI:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        padding: int = 0,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.padding = padding
+        self.calls: Counter = Counter()
+        self._random = random.Random(seed)
+        self._bodies: Dict[Tuple[str, str], bytes] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def payload(self, venue_slug: str, kind: str) -> dict:
+        filler = {
+            f"field_{i}": {"name": f"{venue_slug}-{i}", "values": list(range(10))}
+            for i in range(self.padding)
+        }
+        if kind == "static":
+            latitude, longitude = venue_location(venue_slug)
+            venue_raw = {"location": {"coordinates": [longitude, latitude]}}
+        else:
+            venue_raw = {
+                "delivery_specs": {
+                    "order_minimum_no_surcharge": 1000,
+                    "delivery_pricing": {
+                        "base_price": 190,
+                        "distance_ranges": DISTANCE_RANGES,
+                    },
+                }
+            }
+        return {"venue_raw": {**filler, **venue_raw}}
+
+    def respond(self, path: str) -> Tuple[int, bytes]:
+        """Status and body for a request path (without latency)."""
+        parts = path.strip("/").split("/")
+        if len(parts) < 2 or parts[-1] not in ("static", "dynamic"):
+            return 404, b'{"detail": "Not Found"}'
+        venue_slug, kind = parts[-2], parts[-1]
+        self.calls[kind] += 1
+        if venue_slug.startswith("missing"):
+            return 404, b'{"detail": "Venue not found"}'
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.calls["errors"] += 1
+            return self.error_status, b'{"detail": "Injected error"}'
+        body = self._bodies.get((venue_slug, kind))
+        if body is None:
+            body = self._bodies[(venue_slug, kind)] = dumps(self.payload(venue_slug, kind))
+        return 200, body
+
+    def delay(self) -> float:
+        if not self.jitter:
+            return self.latency
+        return max(0.0, self._random.gauss(self.latency, self.jitter))
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        """httpx.MockTransport handler."""
+        delay = self.delay()
+        if delay:
+            await asyncio.sleep(delay)
+        status, body = self.respond(request.url.path)
+        return httpx.Response(
+            status, content=body, headers={"Content-Type": "application/json"}
+        )
+
+    async def _handle_connection(self, reader, writer) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                keep_alive = True
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    header = header.lower()
+                    if header.startswith(b"connection:") and b"close" in header:
+                        keep_alive = False
+                path = request_line.split(b" ")[1].decode()
+                delay = self.delay()
+                if delay:
+                    await asyncio.sleep(delay)
+                status, body = self.respond(path)
+                writer.write(
+                    b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: %d\r\n\r\n%s"
+                    % (status, REASONS.get(status, "Error").encode(), len(body), body)
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start serving; returns the bound port."""
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+async def serve(args: argparse.Namespace) -> None:
+    api = MockVenueAPI(
+        latency=args.latency_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        padding=args.padding,
+    )
+    port = await api.start(args.host, args.port)
+    print(f"Mock venue API listening on http://{args.host}:{port}/", flush=True)
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline mock of the venue API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--padding", type=int, default=0, help="extra fields per payload")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
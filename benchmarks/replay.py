@@ -0,0 +1,223 @@
+"""Replay recorded price requests with open-loop arrivals.
+
+Reads a JSONL trace, one request per line:
+
+    {"timestamp": 1718000000.25, "venue_slug": "...", "cart_value": 1000,
+     "user_lat": 60.17, "user_lon": 24.93}
+
+`timestamp` is Unix seconds or an ISO 8601 string; "slug", "lat" and "lon"
+are accepted as short field names. Requests are sent at their recorded
+offsets divided by `--speed`, whether or not earlier ones have finished
+(open loop). Latency is measured from the scheduled send time, so a slow
+service shows up as latency instead of silently lowering the send rate
+(coordinated omission). Percentiles are reported overall and per venue.
+
+Usage:
+    python -m benchmarks.replay trace.jsonl --url http://127.0.0.1:8080 --speed 2
+    python -m benchmarks.replay trace.jsonl --mode asgi
+    python -m benchmarks.replay trace.jsonl --generate 10000 --rate 500
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+import httpx
+
+from app.utils.logging import logger
+
+from .bench_e2e import PRICE_PATH, asgi_target, make_workload
+from .common import percentiles, write_results
+from .mock_venue_api import MockVenueAPI
+
+
+class TraceRecord(NamedTuple):
+    offset: float  # seconds since the first request
+    params: Dict[str, Union[str, int, float]]
+
+
+def _timestamp(value: Union[int, float, str]) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _field(entry: dict, *names: str):
+    for name in names:
+        if name in entry:
+            return entry[name]
+    raise KeyError(names[0])
+
+
+def parse_trace(lines: Iterable[str]) -> List[TraceRecord]:
+    """Trace records sorted by time, offsets relative to the first one."""
+    entries = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            entries.append(
+                (
+                    _timestamp(entry["timestamp"]),
+                    {
+                        "venue_slug": _field(entry, "venue_slug", "slug"),
+                        "cart_value": int(entry["cart_value"]),
+                        "user_lat": float(_field(entry, "user_lat", "lat")),
+                        "user_lon": float(_field(entry, "user_lon", "lon")),
+                    },
+                )
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid trace line {number}: {e!r}") from e
+    entries.sort(key=lambda entry: entry[0])
+    if not entries:
+        return []
+    start = entries[0][0]
+    return [TraceRecord(timestamp - start, params) for timestamp, params in entries]
+
+
+def load_trace(path: str) -> List[TraceRecord]:
+    with open(path) as f:
+        return parse_trace(f)
+
+
+def generate_trace(
+    path: str, requests: int, rate: float, venues: int, seed: int = 0
+) -> None:
+    """Write a synthetic trace: Poisson arrivals at `rate` per second over
+    venues with 1/rank popularity (see bench_e2e.make_workload)."""
+    rng = random.Random(seed)
+    timestamp = time.time()
+    with open(path, "w") as f:
+        for params in make_workload(requests, venues, seed):
+            timestamp += rng.expovariate(rate)
+            f.write(json.dumps({"timestamp": round(timestamp, 6), **params}) + "\n")
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    records: List[TraceRecord],
+    speed: float = 1.0,
+    max_in_flight: Optional[int] = None,
+) -> dict:
+    """Send every record at its scheduled time and collect latencies.
+
+    With `max_in_flight`, requests due while that many are outstanding are
+    counted as dropped instead of being sent late.
+    """
+    latencies: List[float] = []
+    by_venue: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+    send_lag: List[float] = []
+    in_flight = 0
+    tasks = set()
+
+    async def send(record: TraceRecord, scheduled: float) -> None:
+        nonlocal in_flight
+        venue_slug = record.params["venue_slug"]
+        try:
+            response = await client.get(PRICE_PATH, params=record.params)
+            status = str(response.status_code)
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        finally:
+            in_flight -= 1
+        latency = (time.perf_counter() - scheduled) * 1000
+        latencies.append(latency)
+        by_venue[venue_slug].append(latency)
+        statuses[venue_slug][status] += 1
+
+    start = time.perf_counter()
+    for record in records:
+        scheduled = start + record.offset / speed
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        send_lag.append(max(0.0, time.perf_counter() - scheduled) * 1000)
+        if max_in_flight is not None and in_flight >= max_in_flight:
+            statuses[record.params["venue_slug"]]["dropped"] += 1
+            continue
+        in_flight += 1
+        task = asyncio.create_task(send(record, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    total_statuses: Counter = Counter()
+    for venue_statuses in statuses.values():
+        total_statuses.update(venue_statuses)
+    venues = {
+        venue_slug: {
+            "requests": sum(statuses[venue_slug].values()),
+            "latency_ms": percentiles(by_venue[venue_slug]),
+            "statuses": dict(statuses[venue_slug]),
+        }
+        for venue_slug in sorted(
+            statuses, key=lambda slug: sum(statuses[slug].values()), reverse=True
+        )
+    }
+    return {
+        "requests": len(records),
+        "speed": speed,
+        "trace_duration_s": records[-1].offset if records else 0.0,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": percentiles(latencies),
+        "send_lag_ms": percentiles(send_lag),
+        "statuses": dict(total_statuses),
+        "venues": venues,
+    }
+
+
+async def run(args: argparse.Namespace, records: List[TraceRecord]) -> dict:
+    if args.mode == "asgi":
+        mock = MockVenueAPI(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000)
+        target = asgi_target(mock)
+    else:
+        target = httpx.AsyncClient(
+            base_url=args.url, limits=httpx.Limits(max_connections=None)
+        )
+    async with target as client:
+        results = await replay(client, records, args.speed, args.max_in_flight)
+    # Keep the per-venue table readable on long-tailed traces
+    results["venues"] = dict(list(results["venues"].items())[: args.top_venues])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", help="JSONL trace file")
+    parser.add_argument("--mode", choices=("url", "asgi"), default="url")
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--speed", type=float, default=1.0, help="time scale factor")
+    parser.add_argument("--max-in-flight", type=int)
+    parser.add_argument("--top-venues", type=int, default=50, help="venues to report")
+    parser.add_argument(
+        "--latency-ms", type=float, default=20.0, help="mock latency (asgi)"
+    )
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument(
+        "--generate", type=int, metavar="N", help="write a synthetic trace and exit"
+    )
+    parser.add_argument("--rate", type=float, default=200.0, help="generated requests/s")
+    parser.add_argument("--venues", type=int, default=200, help="generated venues")
+    parser.add_argument("--output", help="result file, '-' for stdout")
+    args = parser.parse_args()
+
+    if args.generate:
+        generate_trace(args.trace, args.generate, args.rate, args.venues)
+        print(f"Wrote {args.generate} requests to {args.trace}")
+        return
+    logger.disable("app")
+    results = asyncio.run(run(args, load_trace(args.trace)))
+    write_results("replay", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
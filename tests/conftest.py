@@ -1,8 +1,21 @@
+import asyncio
+import os
+import time
+from collections import Counter
+import httpx
 import pytest
+import pytest_asyncio
+
+# Keep the test run from writing a log file into the repository
+os.environ.setdefault("DOPC_LOG_FILE", "")
+
 from app.models import (
     DeliveryQueryParams, GPSCoordinates, DeliverySpecs, DistanceRange,
     VenueStatic, VenueDynamic
 )
+from app.services.venue_service import VenueService
+from app.utils.cache_backends import RedisCacheBackend
+from app.utils.http_client import HTTPClient
 from app.utils.constants import (
     EXPECTED_CART_VALUE,
     EXPECTED_USER_LATITUDE,
@@ -106,6 +119,36 @@ def test_delivery_specs():
     )
 
 
+@pytest.fixture
+def make_specs():
+    """Factory for DeliverySpecs.
+    Returns:
+        callable: make_specs(ranges=None, base_price=190, minimum=1000,
+            max_distance=1000, b=1). Without `ranges` the specs have three
+            ranges:
+                - 0-500m: No additional fee
+                - 500m-`max_distance`: 100 cents + `b` cents/m
+                - >`max_distance`: No delivery
+    Usage:
+        def test_something(make_specs):
+            compiled = make_specs(base_price=250).compiled
+    """
+    def make(ranges=None, base_price=190, minimum=1000, max_distance=1000, b=1):
+        if ranges is None:
+            ranges = [
+                {"min": 0, "max": 500, "a": 0, "b": 0},
+                {"min": 500, "max": max_distance, "a": 100, "b": b},
+                {"min": max_distance, "max": 0, "a": 0, "b": 0},
+            ]
+        return DeliverySpecs(
+            order_minimum_no_surcharge=minimum,
+            base_price=base_price,
+            distance_ranges=ranges,
+        )
+
+    return make
+
+
 @pytest.fixture
 def test_venue_data(test_delivery_specs):
     """Provides mock venue data for testing.
@@ -125,4 +168,197 @@ def test_venue_data(test_delivery_specs):
         "dynamic": VenueDynamic(
             delivery_specs=test_delivery_specs
         ),
-    }
\ No newline at end of file
+    }
+
+
+class FakeRedisServer:
+    """Local stand-in for a Redis server, speaking just enough RESP for
+    RedisCacheBackend (GET, SET with PX, DEL, PING, SELECT, AUTH)."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = Counter()
+        self.latency = 0.0
+        self.handlers = set()
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        for handler in self.handlers:
+            handler.cancel()
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def _read_command(self, reader):
+        header = await reader.readline()
+        if not header:
+            return None
+        args = []
+        for _ in range(int(header[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    def _execute(self, args):
+        name = args[0].decode().upper()
+        self.commands[name] += 1
+        if name == "GET":
+            value, expires_at = self.data.get(args[1], (None, None))
+            if value is None or (expires_at and time.time() >= expires_at):
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if name == "SET":
+            expires_at = None
+            if len(args) == 5 and args[3].upper() == b"PX":
+                expires_at = time.time() + int(args[4]) / 1000
+            self.data[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if name == "DEL":
+            return b":%d\r\n" % int(self.data.pop(args[1], None) is not None)
+        if name in ("PING", "SELECT", "AUTH"):
+            return b"+OK\r\n"
+        return b"-ERR unknown command\r\n"
+
+    async def _handle(self, reader, writer):
+        self.handlers.add(asyncio.current_task())
+        try:
+            while (args := await self._read_command(reader)) is not None:
+                reply = self._execute(args)
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                writer.write(reply)
+                await writer.drain()
+        finally:
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+
+class FakeVenueAPI:
+    """In-process stand-in for the venue API, served through httpx.MockTransport.
+
+    Every slug returns the same payloads unless overridden with `fail()`.
+    Calls are counted per path so tests can assert on upstream traffic, and
+    so are calls cancelled before they were answered.
+    """
+
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.calls = Counter()
+        self.cancelled = Counter()
+        self.failures = {}
+        self.latency = 0.0
+
+    def fail(self, venue_slug, status_code):
+        self.failures[venue_slug] = status_code
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        venue_slug, kind = request.url.path.rstrip("/").split("/")[-2:]
+        self.calls[f"{venue_slug}/{kind}"] += 1
+        if self.latency:
+            try:
+                await asyncio.sleep(self.latency)
+            except asyncio.CancelledError:
+                self.cancelled[f"{venue_slug}/{kind}"] += 1
+                raise
+        if venue_slug in self.failures:
+            return httpx.Response(self.failures[venue_slug], text="error")
+        return httpx.Response(200, json=self.payloads[kind])
+
+
+@pytest.fixture
+def venue_api_payloads():
+    """Raw venue API responses matching the test venue data.
+    Returns:
+        dict: "static" and "dynamic" response bodies as sent by the venue API
+    """
+    return {
+        "static": {
+            "venue_raw": {
+                "location": {
+                    "coordinates": [EXPECTED_VENUE_LONGITUDE, EXPECTED_VENUE_LATITUDE]
+                }
+            }
+        },
+        "dynamic": {
+            "venue_raw": {
+                "delivery_specs": {
+                    "order_minimum_no_surcharge": EXPECTED_MIN_ORDER_NO_SURCHARGE,
+                    "delivery_pricing": {
+                        "base_price": EXPECTED_BASE_PRICE,
+                        "distance_ranges": [
+                            {"min": 0, "max": 500, "a": 0, "b": 0},
+                            {"min": 500, "max": 1000, "a": 100, "b": 0},
+                            {"min": 1000, "max": 0, "a": 0, "b": 0},
+                        ],
+                    },
+                }
+            }
+        },
+    }
+
+
+@pytest.fixture
+def venue_api(venue_api_payloads):
+    """Fake venue API upstream.
+    Usage:
+        def test_something(venue_api, venue_service):
+            venue_api.fail("missing-venue", 404)
+    """
+    return FakeVenueAPI(venue_api_payloads)
+
+
+@pytest.fixture
+def make_http_client():
+    """Factory for HTTPClients whose requests are answered by an
+    httpx.MockTransport handler instead of the network.
+    Usage:
+        client = make_http_client(handler, max_retries=0)
+    """
+    def make(handler, **kwargs):
+        return HTTPClient(
+            "http://venue-api/", transport=httpx.MockTransport(handler), **kwargs
+        )
+
+    return make
+
+
+@pytest.fixture
+def make_venue_service(make_http_client):
+    """Factory for VenueServices whose HTTP client is answered by a
+    MockTransport handler, e.g. `venue_api`; keyword arguments go to
+    VenueService.
+    Usage:
+        worker = make_venue_service(venue_api, shared_cache=backend)
+    """
+    def make(handler, **kwargs):
+        return VenueService(make_http_client(handler), **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def venue_service(venue_api, make_venue_service):
+    """VenueService wired to the fake venue API instead of the network."""
+    return make_venue_service(venue_api)
+
+
+@pytest_asyncio.fixture
+async def redis_server():
+    """Fake Redis server listening on a free local port."""
+    server = FakeRedisServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest_asyncio.fixture
+async def redis_backend(redis_server):
+    """RedisCacheBackend connected to the fake Redis server."""
+    backend = RedisCacheBackend(host="127.0.0.1", port=redis_server.port)
+    yield backend
+    await backend.aclose()
@@ -0,0 +1,187 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.dependencies import get_admission_controller, get_venue_service
+from app.main import app
+from app.utils.admission import AdmissionController
+
+URL = "/api/v1/delivery-order-price"
+
+
+def make_controller(**overrides):
+    options = {"max_concurrency": 2, "max_queue": 4, "queue_timeout": 1.0}
+    return AdmissionController(**{**options, **overrides})
+
+
+async def hold(admission, venue_slug, release, started=None):
+    async with admission.admit(venue_slug):
+        if started is not None:
+            started.append(venue_slug)
+        await release.wait()
+
+
+@pytest.mark.asyncio
+async def test_admits_up_to_limit_then_queues():
+    admission = make_controller()
+    release = asyncio.Event()
+    tasks = [asyncio.create_task(hold(admission, f"v{i}", release)) for i in range(3)]
+    await asyncio.sleep(0)
+
+    assert (admission.active, admission.queued) == (2, 1)
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert (admission.active, admission.queued) == (0, 0)
+    assert admission.admitted == 3
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_shed_with_retry_after():
+    admission = make_controller(max_concurrency=1, max_queue=1)
+    release = asyncio.Event()
+    tasks = [asyncio.create_task(hold(admission, f"v{i}", release)) for i in range(2)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await admission.acquire("v2")
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+    assert admission.shed["queue_full"] == 1
+    release.set()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_times_out():
+    admission = make_controller(max_concurrency=1, queue_timeout=0.01)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(admission, "v0", release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await admission.acquire("v1")
+
+    assert exc_info.value.status_code == 503
+    assert admission.shed["timeout"] == 1
+    assert admission.queued == 0
+    release.set()
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_expected_wait_exceeds_deadline():
+    admission = make_controller(max_concurrency=1)
+    admission._service_time = 2.0
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(admission, "v0", release))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await admission.acquire("v1", timeout=0.5)
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "2"
+    assert admission.shed["deadline"] == 1
+    release.set()
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_hot_venue_cannot_starve_others():
+    admission = make_controller(
+        max_concurrency=2, max_queue=10, max_venue_concurrency=1, max_venue_queue=2
+    )
+    release = asyncio.Event()
+    started = []
+    tasks = [
+        asyncio.create_task(hold(admission, venue_slug, release, started))
+        for venue_slug in ("hot", "hot", "hot", "cold")
+    ]
+    await asyncio.sleep(0)
+
+    # The hot venue holds its one slot, the cold venue still gets the other
+    assert started == ["hot", "cold"]
+    assert admission.queued == 2
+    with pytest.raises(HTTPException) as exc_info:
+        await admission.acquire("hot")
+    assert exc_info.value.status_code == 429
+    assert admission.shed["venue_limit"] == 1
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert started == ["hot", "cold", "hot", "hot"]
+
+
+@pytest.mark.asyncio
+async def test_freed_slots_are_shared_round_robin():
+    admission = make_controller(max_concurrency=1, max_queue=10)
+    gates = {}
+    order = []
+
+    async def request(venue_slug, index):
+        gate = gates.setdefault((venue_slug, index), asyncio.Event())
+        async with admission.admit(venue_slug):
+            order.append(venue_slug)
+            await gate.wait()
+
+    tasks = [asyncio.create_task(request("first", 0))]
+    await asyncio.sleep(0)
+    tasks += [asyncio.create_task(request("a", i)) for i in range(3)]
+    tasks += [asyncio.create_task(request("b", i)) for i in range(3)]
+    await asyncio.sleep(0)
+    for gate in gates.values():
+        gate.set()
+    await asyncio.gather(*tasks)
+
+    assert order == ["first", "a", "b", "a", "b", "a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_queue():
+    admission = make_controller(max_concurrency=1)
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(admission, "v0", release))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(admission.acquire("v1"))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+    assert admission.queued == 0
+    release.set()
+    await holder
+    assert admission.active == 0
+
+
+@pytest.mark.asyncio
+async def test_disabled_controller_admits_everything():
+    admission = AdmissionController(max_concurrency=0, max_queue=0, queue_timeout=0)
+
+    async with admission.admit("venue"):
+        assert admission.active == 0
+
+
+def test_price_endpoint_sheds_when_overloaded(venue_service):
+    admission = make_controller(max_concurrency=1, max_queue=0)
+    admission.active = 1  # every slot taken
+    app.dependency_overrides[get_venue_service] = lambda: venue_service
+    app.dependency_overrides[get_admission_controller] = lambda: admission
+    try:
+        response = TestClient(app).get(
+            URL,
+            params={
+                "venue_slug": "venue",
+                "cart_value": 1000,
+                "user_lat": 60.17094,
+                "user_lon": 24.93087,
+            },
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert admission.shed["queue_full"] == 1
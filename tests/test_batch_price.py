@@ -0,0 +1,63 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.dependencies import get_venue_service
+from app.models import DeliveryQueryParams
+from app.services.batch_price_calculator import BatchPriceCalculator
+
+
+@pytest.fixture
+def batch_items(valid_query_params):
+    return [
+        DeliveryQueryParams(**valid_query_params),
+        DeliveryQueryParams(**{**valid_query_params, "venue_slug": "missing"}),
+        DeliveryQueryParams(**{**valid_query_params, "user_lon": 24.94615}),  # 1000m
+        DeliveryQueryParams(**{**valid_query_params, "cart_value": 800}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_fetches_each_venue_once(venue_api, venue_service, batch_items):
+    venue_api.fail("missing", 404)
+
+    results = await BatchPriceCalculator(batch_items, venue_service).calculate_prices()
+
+    assert venue_api.calls["home-assignment-venue-helsinki/static"] == 1
+    assert venue_api.calls["home-assignment-venue-helsinki/dynamic"] == 1
+    assert [r.status_code for r in results] == [200, 404, 400, 200]
+
+
+@pytest.mark.asyncio
+async def test_batch_results_keep_input_order(venue_api, venue_service, batch_items):
+    venue_api.fail("missing", 404)
+
+    results = await BatchPriceCalculator(batch_items, venue_service).calculate_prices()
+
+    assert results[0].result.total_price == 1190
+    assert results[1].result is None
+    assert results[1].detail
+    assert results[3].result.small_order_surcharge == 200
+    assert results[3].result.total_price == 1190
+
+
+def test_batch_endpoint(venue_service, valid_query_params):
+    app.dependency_overrides[get_venue_service] = lambda: venue_service
+    try:
+        response = TestClient(app).post(
+            "/api/v1/delivery-order-price/batch",
+            json={"items": [valid_query_params, valid_query_params]},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 2
+    assert results[0]["result"]["delivery"] == {"fee": 190, "distance": 176}
+
+
+def test_batch_endpoint_rejects_empty_batch():
+    response = TestClient(app).post("/api/v1/delivery-order-price/batch", json={"items": []})
+
+    assert response.status_code == 422
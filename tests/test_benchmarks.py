@@ -0,0 +1,138 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import HTTPException
+from benchmarks.bench_e2e import make_workload
+from benchmarks.bench_workers import default_worker_counts, scaling
+from benchmarks.compare import compare
+from benchmarks.mock_venue_api import MockVenueAPI, venue_location
+from benchmarks.replay import TraceRecord, parse_trace, replay
+from app.services.venue_service import VenueService
+
+
+@pytest.mark.asyncio
+async def test_mock_venue_api_serves_venue_service(make_http_client):
+    mock = MockVenueAPI(padding=20)
+    venue_service = VenueService(make_http_client(mock, max_retries=0))
+
+    static = await venue_service.get_venue_static("venue-1")
+    dynamic = await venue_service.get_venue_dynamic("venue-1")
+
+    assert (static.location.latitude, static.location.longitude) == venue_location("venue-1")
+    assert dynamic.delivery_specs.compiled.base_price == 190
+
+
+@pytest.mark.asyncio
+async def test_mock_venue_api_injects_errors(make_http_client):
+    mock = MockVenueAPI(error_rate=1.0, error_status=503)
+    venue_service = VenueService(make_http_client(mock, max_retries=0))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await venue_service.get_venue_static("venue-1")
+    assert exc_info.value.status_code == 503
+
+    assert mock.respond("/missing-venue/static")[0] == 404
+
+
+def test_workload_is_reproducible():
+    assert make_workload(100, 10, seed=1) == make_workload(100, 10, seed=1)
+    assert {params["venue_slug"] for params in make_workload(500, 10)} <= {
+        f"venue-{i}" for i in range(10)
+    }
+
+
+def test_compare_flags_regressions():
+    baseline = {
+        "metadata": {"commit": "a"},
+        "results": {"haversine_us": 1.0, "throughput_rps": 1000, "statuses": {"200": 5}},
+    }
+    faster = {
+        "metadata": {"commit": "b"},
+        "results": {"haversine_us": 0.5, "throughput_rps": 1500, "statuses": {"200": 50}},
+    }
+    slower = {
+        "metadata": {"commit": "c"},
+        "results": {"haversine_us": 1.0, "throughput_rps": 500, "statuses": {"200": 5}},
+    }
+
+    assert not compare(baseline, faster, threshold=10)[1]
+    assert compare(baseline, slower, threshold=10)[1]
+
+
+def test_parse_trace_sorts_and_accepts_short_names():
+    records = parse_trace(
+        [
+            '{"timestamp": "2024-06-10T12:00:01.5Z", "slug": "b", "cart_value": 5,'
+            ' "lat": 60.1, "lon": 24.9}\n',
+            "\n",
+            '{"timestamp": 1718020800, "venue_slug": "a", "cart_value": "7",'
+            ' "user_lat": 60.2, "user_lon": 24.8}\n',
+        ]
+    )
+
+    assert [record.offset for record in records] == [0.0, 1.5]
+    assert records[0].params == {
+        "venue_slug": "a", "cart_value": 7, "user_lat": 60.2, "user_lon": 24.8
+    }
+    with pytest.raises(ValueError):
+        parse_trace(['{"timestamp": 1, "venue_slug": "a"}'])
+
+
+def make_records(*venue_slugs, interval=0.01):
+    return [
+        TraceRecord(
+            i * interval,
+            {"venue_slug": slug, "cart_value": 1000, "user_lat": 60.1, "user_lon": 24.9},
+        )
+        for i, slug in enumerate(venue_slugs)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_replay_is_open_loop_and_reports_per_venue():
+    async def slow_service(request):
+        await asyncio.sleep(0.1)
+        status = 404 if request.url.params["venue_slug"] == "missing" else 200
+        return httpx.Response(status, json={})
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(slow_service), base_url="http://dopc"
+    ) as client:
+        results = await replay(client, make_records("a", "a", "b", "missing"))
+
+    # Requests overlap instead of waiting for each other
+    assert results["elapsed_s"] < 0.3
+    assert results["latency_ms"]["p50"] >= 100
+    assert results["statuses"] == {"200": 3, "404": 1}
+    assert list(results["venues"]) == ["a", "b", "missing"]
+    assert results["venues"]["a"]["requests"] == 2
+
+
+@pytest.mark.asyncio
+async def test_replay_drops_requests_over_in_flight_limit():
+    async def slow_service(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={})
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(slow_service), base_url="http://dopc"
+    ) as client:
+        results = await replay(
+            client, make_records("a", "a", "a", interval=0), max_in_flight=1
+        )
+
+    assert results["statuses"] == {"200": 1, "dropped": 2}
+
+
+def test_worker_scaling_summary():
+    assert default_worker_counts(1) == [1]
+    assert default_worker_counts(6) == [1, 2, 4, 6]
+
+    runs = [
+        {"config": {"workers": workers}, "throughput_rps": rps, "latency_ms": {"p99": 10}}
+        for workers, rps in ((1, 1000), (2, 1800), (4, 3000))
+    ]
+    summary = scaling(runs)
+
+    assert [row["speedup"] for row in summary] == [1.0, 1.8, 3.0]
+    assert [row["efficiency"] for row in summary] == [1.0, 0.9, 0.75]
@@ -0,0 +1,76 @@
+import pytest
+from app.utils.cache import CacheState, TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_lookup_classifies_fresh_stale_and_expired(clock):
+    cache = TTLCache(ttl=10, stale_ttl=5, max_size=10, clock=clock)
+    cache.set("venue", "value")
+
+    assert cache.lookup("venue") == ("value", CacheState.FRESH)
+    clock.now = 12
+    assert cache.lookup("venue") == ("value", CacheState.STALE)
+    clock.now = 20
+    assert cache.lookup("venue") == ("value", CacheState.EXPIRED)
+    assert cache.lookup("other") == (None, CacheState.MISSING)
+    assert cache.state("venue") is CacheState.EXPIRED
+    assert cache.state("other") is CacheState.MISSING
+
+
+def test_get_returns_only_fresh_values(clock):
+    cache = TTLCache(ttl=10, max_size=10, clock=clock)
+    cache.set("venue", "value")
+    clock.now = 11
+
+    assert cache.get("venue") is None
+    assert cache.peek("venue") == "value"
+
+
+def test_lru_eviction_keeps_recently_used(clock):
+    evicted = []
+    cache = TTLCache(ttl=10, max_size=2, clock=clock, on_evict=evicted.append)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.lookup("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.evictions == 1
+    assert evicted == ["b"]
+
+
+def test_stats_counts_hits_and_misses(clock):
+    cache = TTLCache(ttl=10, stale_ttl=10, max_size=10, clock=clock)
+    cache.set("a", 1)
+    cache.lookup("a")
+    cache.lookup("missing")
+    clock.now = 15
+    cache.lookup("a")
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["stale_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == pytest.approx(2 / 3)
+
+
+def test_invalidate_removes_entry(clock):
+    cache = TTLCache(ttl=10, max_size=10, clock=clock)
+    cache.set("a", 1)
+
+    assert cache.invalidate("a") is True
+    assert cache.invalidate("a") is False
+    assert len(cache) == 0
@@ -0,0 +1,179 @@
+import asyncio
+import pytest
+from app.utils.cache_backends import (
+    CacheBackendError,
+    FileCacheBackend,
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    create_cache_backend,
+)
+from app.utils.constants import EXPECTED_BASE_PRICE, EXPECTED_VENUE_LATITUDE
+
+
+@pytest.fixture(params=["memory", "file", "redis"])
+def backend_name(request):
+    return request.param
+
+
+@pytest.fixture
+def backend(backend_name, tmp_path, request):
+    if backend_name == "memory":
+        return MemoryCacheBackend()
+    if backend_name == "file":
+        return FileCacheBackend(str(tmp_path / "cache"))
+    return request.getfixturevalue("redis_backend")
+
+
+@pytest.mark.asyncio
+async def test_backend_set_get_delete(backend):
+    assert await backend.get("key") is None
+
+    await backend.set("key", b"value", ttl=60)
+    assert await backend.get("key") == b"value"
+
+    await backend.delete("key")
+    await backend.delete("key")
+    assert await backend.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_backend_entries_expire(backend):
+    await backend.set("key", b"value", ttl=0.01)
+    await asyncio.sleep(0.05)
+
+    assert await backend.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_reconnects_after_connection_loss(redis_server, redis_backend):
+    await redis_backend.set("key", b"value", ttl=60)
+    redis_backend._writer.close()
+
+    with pytest.raises(CacheBackendError):
+        await redis_backend.get("key")
+    assert await redis_backend.get("key") == b"value"
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_unreachable_raises_backend_error(redis_server):
+    backend = RedisCacheBackend(host="127.0.0.1", port=redis_server.port)
+    await redis_server.stop()
+
+    with pytest.raises(CacheBackendError):
+        await backend.get("key")
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_drops_connection_when_cancelled(redis_server):
+    backend = RedisCacheBackend(host="127.0.0.1", port=redis_server.port, timeout=5)
+    await backend.set("first", b"1", ttl=60)
+    await backend.set("second", b"2", ttl=60)
+    redis_server.latency = 0.2
+
+    pending = asyncio.ensure_future(backend.get("first"))
+    await asyncio.sleep(0.05)
+    pending.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await pending
+    redis_server.latency = 0.0
+
+    # A reused connection would return the cancelled command's reply
+    assert await backend.get("second") == b"2"
+    await backend.aclose()
+
+
+@pytest.mark.asyncio
+async def test_file_backend_errors_raise_backend_error(tmp_path):
+    backend = FileCacheBackend(str(tmp_path / "cache"))
+    (tmp_path / "cache").rmdir()
+
+    with pytest.raises(CacheBackendError):
+        await backend.set("key", b"value", ttl=60)
+
+
+@pytest.mark.asyncio
+async def test_file_backend_failure_falls_through_to_upstream(
+    venue_api, tmp_path, make_venue_service
+):
+    backend = FileCacheBackend(str(tmp_path / "cache"))
+    service = make_venue_service(venue_api, shared_cache=backend)
+    (tmp_path / "cache").rmdir()
+    (tmp_path / "cache").write_text("not a directory")
+
+    static = await service.get_venue_static("venue")
+
+    assert static.location.latitude == EXPECTED_VENUE_LATITUDE
+    assert service.cache_stats()["shared"]["errors"] >= 1
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("", None),
+        ("memory://", MemoryCacheBackend),
+        ("redis://cache:6380/2", RedisCacheBackend),
+    ],
+)
+def test_create_cache_backend(url, expected):
+    backend = create_cache_backend(url)
+
+    if expected is None:
+        assert backend is None
+    else:
+        assert isinstance(backend, expected)
+
+
+def test_create_cache_backend_parses_urls(tmp_path):
+    redis = create_cache_backend("redis://:s3cret@cache:6380/2")
+    file = create_cache_backend(f"file://{tmp_path}/venues")
+
+    assert (redis.host, redis.port, redis.db, redis.password) == (
+        "cache", 6380, 2, "s3cret"
+    )
+    assert file.directory == f"{tmp_path}/venues"
+    with pytest.raises(ValueError):
+        create_cache_backend("memcached://cache:11211")
+
+
+@pytest.mark.asyncio
+async def test_workers_share_venue_data(venue_api, backend, make_venue_service):
+    first_worker = make_venue_service(venue_api, shared_cache=backend)
+    second_worker = make_venue_service(venue_api, shared_cache=backend)
+
+    await first_worker.get_venue_static("venue")
+    await first_worker.get_venue_dynamic("venue")
+    static = await second_worker.get_venue_static("venue")
+    dynamic = await second_worker.get_venue_dynamic("venue")
+
+    assert venue_api.calls["venue/static"] == 1
+    assert venue_api.calls["venue/dynamic"] == 1
+    assert static.location.latitude == EXPECTED_VENUE_LATITUDE
+    assert dynamic.delivery_specs.compiled.base_price == EXPECTED_BASE_PRICE
+    assert second_worker.cache_stats()["shared"]["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_failure_falls_through_to_upstream(
+    venue_api, redis_server, redis_backend, make_venue_service
+):
+    service = make_venue_service(venue_api, shared_cache=redis_backend)
+    await redis_server.stop()
+
+    static = await service.get_venue_static("venue")
+
+    assert static.location.latitude == EXPECTED_VENUE_LATITUDE
+    assert venue_api.calls["venue/static"] == 1
+    # Update stamp read, data read and data write
+    assert service.cache_stats()["shared"]["errors"] == 3
+
+
+@pytest.mark.asyncio
+async def test_corrupt_shared_entry_is_ignored(venue_api, make_venue_service):
+    backend = MemoryCacheBackend()
+    service = make_venue_service(venue_api, shared_cache=backend)
+    await backend.set(service._shared_key("static", "venue"), b"not json", ttl=60)
+
+    await service.get_venue_static("venue")
+
+    assert venue_api.calls["venue/static"] == 1
+    assert service.cache_stats()["shared"]["errors"] == 1
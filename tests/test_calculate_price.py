@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import HTTPException
 import pytest
 from unittest.mock import AsyncMock
@@ -79,4 +80,62 @@ async def test_calculate_price_range_exceed(test_params, test_venue_data):
     with pytest.raises(HTTPException) as exc_info:
         await calculator.calculate_price()
     
-    assert exc_info.value.status_code == 400
\ No newline at end of file
+    assert exc_info.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_fetch_venue_data_runs_concurrently(test_params, test_venue_data):
+    calculator = DeliveryFeeCalculator(test_params)
+    both_started = asyncio.Event()
+    started = []
+
+    async def fetch(name, result):
+        started.append(name)
+        if len(started) == 2:
+            both_started.set()
+        await asyncio.wait_for(both_started.wait(), timeout=1)
+        return result
+
+    calculator.venue_service.get_venue_static = lambda slug, deadline=None: fetch(
+        "static", test_venue_data["static"]
+    )
+    calculator.venue_service.get_venue_dynamic = lambda slug, deadline=None: fetch(
+        "dynamic", test_venue_data["dynamic"]
+    )
+
+    static_data, dynamic_data = await calculator.fetch_venue_data("venue")
+
+    assert static_data == test_venue_data["static"]
+    assert dynamic_data == test_venue_data["dynamic"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_venue_data_cancels_sibling_on_error(test_params):
+    calculator = DeliveryFeeCalculator(test_params)
+    cancelled = asyncio.Event()
+
+    async def slow_dynamic(slug, deadline=None):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    calculator.venue_service.get_venue_static = AsyncMock(
+        side_effect=HTTPException(status_code=404)
+    )
+    calculator.venue_service.get_venue_dynamic = slow_dynamic
+
+    with pytest.raises(HTTPException) as exc_info:
+        await calculator.fetch_venue_data("missing")
+
+    assert exc_info.value.status_code == 404
+    assert cancelled.is_set()
+
+
+def test_quote_for_venue_matches_response_model(test_params, test_venue_data):
+    calculator = DeliveryFeeCalculator(test_params)
+
+    quote = calculator.quote_for_venue(test_venue_data["static"], test_venue_data["dynamic"])
+
+    assert quote.to_dict() == quote.to_response().model_dump()
+    assert quote.to_dict()["delivery"] == {"fee": 190, "distance": 176}
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from app.models import CompiledDeliverySpecs
+from app.services.total_fee_calculator import calculate_distance_fee
+
+
+@pytest.fixture
+def tiered_specs(make_specs):
+    return make_specs(
+        [
+            {"min": 0, "max": 500, "a": 0, "b": 0},
+            {"min": 500, "max": 1000, "a": 100, "b": 1},
+            {"min": 1000, "max": 1500, "a": 200, "b": 5},
+            {"min": 1500, "max": 2000, "a": 200, "b": 15},
+            {"min": 2000, "max": 0, "a": 0, "b": 0},
+        ]
+    )
+
+
+def test_compiled_fee_matches_linear_scan(tiered_specs):
+    compiled = tiered_specs.compiled
+
+    for distance in range(0, 2100):
+        try:
+            expected = calculate_distance_fee(
+                distance, tiered_specs.base_price, tiered_specs.distance_ranges
+            )
+        except ValueError:
+            expected = None
+        assert compiled.distance_fee(distance) == expected
+
+
+def test_bulk_fees_match_scalar(tiered_specs):
+    compiled = tiered_specs.compiled
+    distances = np.arange(0, 2100)
+
+    fees, available = compiled.distance_fees(distances)
+
+    for distance, fee, ok in zip(distances.tolist(), fees.tolist(), available.tolist()):
+        expected = compiled.distance_fee(distance)
+        assert ok == (expected is not None)
+        if ok:
+            assert fee == expected
+
+
+def test_compiled_is_cached_per_specs(tiered_specs):
+    assert tiered_specs.compiled is tiered_specs.compiled
+    assert tiered_specs.compiled.max_allowed_distance == tiered_specs.max_allowed_distance
+
+
+@pytest.mark.parametrize(
+    "ranges,message",
+    [
+        ([], "no distance ranges"),
+        (
+            [{"min": 0, "max": 500, "a": 0, "b": 0}, {"min": 600, "max": 0, "a": 0, "b": 0}],
+            "Gap",
+        ),
+        (
+            [{"min": 0, "max": 500, "a": 0, "b": 0}, {"min": 400, "max": 0, "a": 0, "b": 0}],
+            "overlap",
+        ),
+        (
+            [{"min": 500, "max": 0, "a": 0, "b": 0}, {"min": 0, "max": 500, "a": 0, "b": 0}],
+            "empty or reversed",
+        ),
+    ],
+    ids=["empty", "gap", "overlap", "unsorted"],
+)
+def test_compile_rejects_invalid_ranges(ranges, message, make_specs):
+    with pytest.raises(ValueError, match=message):
+        CompiledDeliverySpecs.compile(make_specs(ranges))
+
+
+@pytest.mark.asyncio
+async def test_invalid_upstream_specs_return_502(venue_api, venue_service):
+    pricing = venue_api.payloads["dynamic"]["venue_raw"]["delivery_specs"]["delivery_pricing"]
+    pricing["distance_ranges"][1]["min"] = 600
+
+    with pytest.raises(HTTPException) as exc_info:
+        await venue_service.get_venue_dynamic("venue")
+
+    assert exc_info.value.status_code == 502
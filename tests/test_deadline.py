@@ -0,0 +1,184 @@
+import asyncio
+import sys
+import time
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.dependencies import get_venue_service
+from app.main import app
+from app.utils.deadline import Deadline, run_with_deadline
+from app.utils.resilience import BreakerState
+
+URL = "/api/v1/delivery-order-price"
+PARAMS = {
+    "venue_slug": "venue",
+    "cart_value": 1000,
+    "user_lat": 60.17094,
+    "user_lon": 24.93087,
+}
+
+
+def test_deadline_from_header():
+    now = time.monotonic()
+
+    assert Deadline.from_header(None, 10, 30).expires_at == pytest.approx(now + 10, abs=1)
+    assert Deadline.from_header("800", 10, 30).expires_at == pytest.approx(now + 0.8, abs=0.1)
+    assert Deadline.from_header("600000", 10, 30).expires_at == pytest.approx(now + 30, abs=1)
+    for invalid in ("soon", "0", "-5", "nan"):
+        with pytest.raises(HTTPException) as exc_info:
+            Deadline.from_header(invalid, 10, 30)
+        assert exc_info.value.status_code == 400
+
+
+def test_deadline_remaining():
+    now = [100.0]
+    deadline = Deadline(2.0, clock=lambda: now[0])
+
+    assert deadline.timeout(10) == 2.0
+    assert deadline.timeout(1) == 1.0
+    now[0] = 103.0
+    assert deadline.remaining() == 0.0
+    assert deadline.expired
+    with pytest.raises(HTTPException) as exc_info:
+        deadline.check()
+    assert exc_info.value.status_code == 504
+
+
+@pytest.mark.asyncio
+async def test_upstream_call_gets_only_remaining_budget(make_http_client):
+    async def slow(request):
+        await asyncio.sleep(1)
+        return httpx.Response(200, json={})
+
+    client = make_http_client(slow)
+    start = time.perf_counter()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await client.get("venue/static", Deadline(0.05))
+
+    assert exc_info.value.status_code == 504
+    assert time.perf_counter() - start < 0.5
+    # Running out of our own time is not held against the upstream
+    assert client.breaker("static").state is BreakerState.CLOSED
+    assert client.breaker("static")._failures == 0
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_skips_upstream_call(make_http_client):
+    calls = []
+    client = make_http_client(lambda request: calls.append(request))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await client.get("venue/static", Deadline(0))
+
+    assert exc_info.value.status_code == 504
+    assert calls == []
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_no_retry_after_deadline_budget_is_spent(monkeypatch, make_http_client):
+    calls = []
+
+    def unavailable(request):
+        calls.append(request)
+        return httpx.Response(503, text="busy")
+
+    monkeypatch.setattr("app.utils.http_client.backoff_delay", lambda *args: 1.0)
+    client = make_http_client(unavailable, max_retries=2)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await client.get("venue/static", Deadline(0.5))
+
+    assert exc_info.value.status_code == 503
+    assert len(calls) == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_run_with_deadline_cancels_work():
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(HTTPException) as exc_info:
+        await run_with_deadline(work(), Deadline(0.01))
+
+    assert exc_info.value.status_code == 504
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+async def test_run_with_deadline_cancels_work_on_disconnect():
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def disconnected():
+        await asyncio.sleep(0.01)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await run_with_deadline(work(), Deadline(10), disconnected)
+
+    assert exc_info.value.status_code == 499
+    assert cancelled.is_set()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="Task.cancelling() is 3.11+")
+async def test_run_with_deadline_leaves_task_uncancelled():
+    with pytest.raises(HTTPException):
+        await run_with_deadline(asyncio.sleep(1), Deadline(0.01))
+
+    assert asyncio.current_task().cancelling() == 0
+
+
+@pytest.mark.asyncio
+async def test_run_with_deadline_returns_result():
+    async def work():
+        return 42
+
+    assert await run_with_deadline(work(), Deadline(1), asyncio.Event().wait) == 42
+
+
+@pytest.fixture
+def client(venue_service):
+    app.dependency_overrides[get_venue_service] = lambda: venue_service
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_price_endpoint_honours_deadline_header(client, venue_api):
+    venue_api.latency = 1.0
+    start = time.perf_counter()
+
+    response = client.get(URL, params=PARAMS, headers={"X-DOPC-Deadline-Ms": "100"})
+
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Deadline exceeded"}
+    assert time.perf_counter() - start < 0.8
+
+
+def test_price_endpoint_rejects_invalid_deadline(client):
+    response = client.get(URL, params=PARAMS, headers={"X-DOPC-Deadline-Ms": "later"})
+
+    assert response.status_code == 400
+
+
+def test_price_endpoint_within_deadline(client):
+    response = client.get(URL, params=PARAMS, headers={"X-DOPC-Deadline-Ms": "5000"})
+
+    assert response.status_code == 200
+    assert response.json()["total_price"] == 1190
@@ -0,0 +1,187 @@
+import random
+import pytest
+from fastapi.testclient import TestClient
+from app.dependencies import get_delivery_zones, get_venue_service
+from app.main import app
+from app.models import GPSCoordinates, VenueDynamic
+from app.services.delivery_zones import DeliveryZones, FeeTier, fee_tiers
+from app.services.distance_calculator import DistanceCalculator
+from app.utils.cache import TTLCache
+from app.utils.fast_json import loads
+
+VENUE = GPSCoordinates(latitude=60.17012143, longitude=24.92813512)
+ZONES_URL = "/api/v1/venues/venue/delivery-zones"
+
+
+def test_fee_tiers(make_specs):
+    assert fee_tiers(make_specs().compiled) == (
+        FeeTier(index=0, min_distance=0, max_distance=500, min_fee=190, max_fee=190),
+        FeeTier(index=1, min_distance=500, max_distance=1000, min_fee=340, max_fee=390),
+    )
+
+
+def test_lookup_matches_pricing(make_specs):
+    specs = make_specs().compiled
+    zones = DeliveryZones().render("venue", VENUE, specs)
+    rng = random.Random(0)
+
+    for _ in range(500):
+        latitude = VENUE.latitude + rng.uniform(-0.012, 0.012)
+        longitude = VENUE.longitude + rng.uniform(-0.024, 0.024)
+        match = zones.lookup(latitude, longitude)
+        distance = DistanceCalculator.haversine(
+            VENUE.latitude, VENUE.longitude, latitude, longitude
+        )
+
+        assert match.distance == distance
+        if distance >= specs.max_allowed_distance:
+            assert match.tier is None and match.fee is None
+        else:
+            assert match.fee == specs.distance_fee(distance)
+            tier = match.tier
+            assert tier.min_distance <= distance < tier.max_distance
+            assert tier.min_fee <= match.fee <= tier.max_fee
+
+
+def test_geojson_rings(make_specs):
+    specs = make_specs().compiled
+    zones = DeliveryZones(ring_points=32).render("venue", VENUE, specs)
+    geojson = loads(zones.body)
+
+    assert geojson["type"] == "FeatureCollection"
+    assert geojson["specs_version"] == specs.version
+    disc, ring = geojson["features"]
+    assert len(disc["geometry"]["coordinates"]) == 1
+    outer, hole = ring["geometry"]["coordinates"]
+    assert ring["properties"] == FeeTier(1, 500, 1000, 340, 390)._asdict()
+    for polygon_ring, radius in ((outer, 1000), (hole, 500)):
+        assert len(polygon_ring) == 33
+        assert polygon_ring[0] == polygon_ring[-1]
+        for longitude, latitude in polygon_ring:
+            distance = DistanceCalculator.haversine(
+                VENUE.latitude, VENUE.longitude, latitude, longitude
+            )
+            assert abs(distance - radius) <= 1
+
+
+def test_render_rebuilds_only_changed_venues(make_specs):
+    delivery_zones = DeliveryZones()
+    first = delivery_zones.render("venue", VENUE, make_specs().compiled)
+
+    assert delivery_zones.render("venue", VENUE, make_specs().compiled) is first
+    assert delivery_zones.builds == 1
+
+    updated = make_specs(base_price=250).compiled
+    changed = delivery_zones.render("venue", VENUE, updated)
+    assert changed.etag != first.etag
+    assert delivery_zones.builds == 2
+    assert delivery_zones.remove("venue")
+    assert "venue" not in delivery_zones
+
+
+def test_update_only_drops_outdated_zones(make_specs):
+    delivery_zones = DeliveryZones()
+    delivery_zones.update("venue", VENUE, make_specs().compiled)
+    assert "venue" not in delivery_zones
+
+    first = delivery_zones.render("venue", VENUE, make_specs().compiled)
+    delivery_zones.update("venue", VENUE, make_specs().compiled)
+    assert delivery_zones.get("venue") is first
+
+    delivery_zones.update("venue", VENUE, make_specs(base_price=250).compiled)
+    assert "venue" not in delivery_zones
+    assert delivery_zones.builds == 1
+
+
+@pytest.mark.asyncio
+async def test_zones_follow_venue_service(venue_api, venue_service, test_delivery_specs):
+    delivery_zones = DeliveryZones()
+    delivery_zones.attach(venue_service)
+
+    static = await venue_service.get_venue_static("venue")
+    dynamic = await venue_service.get_venue_dynamic("venue")
+    # Nothing is rendered until zones are asked for
+    assert "venue" not in delivery_zones
+    delivery_zones.render("venue", static.location, dynamic.delivery_specs.compiled)
+
+    updated = test_delivery_specs.model_copy(update={"base_price": 300})
+    await venue_service.replace_venue_data(
+        "dynamic", "venue", VenueDynamic(delivery_specs=updated)
+    )
+    assert "venue" not in delivery_zones
+    zones = delivery_zones.render("venue", static.location, updated.compiled)
+    assert zones.tiers[0].min_fee == 300
+    assert delivery_zones.builds == 2
+
+    await venue_service.invalidate_venue_data("static", "venue")
+    assert "venue" not in delivery_zones
+
+
+@pytest.mark.asyncio
+async def test_zones_are_bounded_by_the_venue_cache(venue_api, make_venue_service):
+    venue_service = make_venue_service(
+        venue_api,
+        static_cache=TTLCache(ttl=3600, max_size=2),
+        dynamic_cache=TTLCache(ttl=30, max_size=2),
+    )
+    delivery_zones = DeliveryZones()
+    delivery_zones.attach(venue_service)
+
+    for venue_slug in ("a", "b", "c"):
+        static = await venue_service.get_venue_static(venue_slug)
+        dynamic = await venue_service.get_venue_dynamic(venue_slug)
+        delivery_zones.render(
+            venue_slug, static.location, dynamic.delivery_specs.compiled
+        )
+
+    assert len(delivery_zones) == 2
+    assert "a" not in delivery_zones
+
+
+@pytest.fixture
+def client(venue_service):
+    app.dependency_overrides[get_venue_service] = lambda: venue_service
+    app.dependency_overrides[get_delivery_zones] = lambda: DeliveryZones()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_delivery_zones_endpoint(client, venue_api):
+    response = client.get(ZONES_URL)
+    etag = response.headers["etag"]
+    cached = client.get(ZONES_URL, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/geo+json"
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert len(response.json()["features"]) == 2
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+
+def test_delivery_zone_lookup_endpoint(client, venue_api):
+    inside = client.get(
+        f"{ZONES_URL}/lookup", params={"user_lat": 60.17094, "user_lon": 24.93087}
+    )
+    outside = client.get(
+        f"{ZONES_URL}/lookup", params={"user_lat": 60.2, "user_lon": 24.93087}
+    )
+
+    assert inside.status_code == 200
+    assert inside.json() == {
+        "venue_slug": "venue",
+        "deliverable": True,
+        "distance": 176,
+        "fee": 190,
+        "tier": {
+            "index": 0,
+            "min_distance": 0,
+            "max_distance": 500,
+            "min_fee": 190,
+            "max_fee": 190,
+        },
+    }
+    assert outside.status_code == 200
+    assert outside.json()["deliverable"] is False
+    assert outside.json()["tier"] is None
+    assert venue_api.calls["venue/dynamic"] == 1
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from app.models import GPSCoordinates
+from app.services.distance_calculator import DistanceCalculator
+from app.utils.constants import EXPECTED_VENUE_LATITUDE, EXPECTED_VENUE_LONGITUDE
+
+
+def scalar_distance(venue_lat, venue_lon, user_lat, user_lon):
+    return DistanceCalculator.calculate_straight_line(
+        GPSCoordinates(latitude=venue_lat, longitude=venue_lon),
+        GPSCoordinates(latitude=user_lat, longitude=user_lon),
+    )
+
+
+def test_bulk_matches_scalar_for_one_venue():
+    rng = np.random.default_rng(0)
+    user_lats = EXPECTED_VENUE_LATITUDE + rng.normal(0, 0.05, 2000)
+    user_lons = EXPECTED_VENUE_LONGITUDE + rng.normal(0, 0.05, 2000)
+
+    distances = DistanceCalculator.calculate_straight_line_bulk(
+        EXPECTED_VENUE_LATITUDE, EXPECTED_VENUE_LONGITUDE, user_lats, user_lons
+    )
+
+    expected = [
+        scalar_distance(EXPECTED_VENUE_LATITUDE, EXPECTED_VENUE_LONGITUDE, lat, lon)
+        for lat, lon in zip(user_lats, user_lons)
+    ]
+    assert distances.dtype == np.int64
+    assert distances.tolist() == expected
+
+
+def test_bulk_matches_scalar_pairwise():
+    rng = np.random.default_rng(1)
+    venue_lats = rng.uniform(-90, 90, 2000)
+    venue_lons = rng.uniform(-180, 180, 2000)
+    user_lats = rng.uniform(-90, 90, 2000)
+    user_lons = rng.uniform(-180, 180, 2000)
+
+    distances = DistanceCalculator.calculate_straight_line_bulk(
+        venue_lats, venue_lons, user_lats, user_lons
+    )
+
+    expected = [
+        scalar_distance(*coords)
+        for coords in zip(venue_lats, venue_lons, user_lats, user_lons)
+    ]
+    assert distances.tolist() == expected
+
+
+def test_bulk_broadcasts_venues_against_users():
+    venue_lats = np.array([[60.17], [60.18]])
+    venue_lons = np.array([[24.93], [24.94]])
+
+    distances = DistanceCalculator.calculate_straight_line_bulk(
+        venue_lats, venue_lons, [60.17, 60.175, 60.18], [24.93, 24.935, 24.94]
+    )
+
+    assert distances.shape == (2, 3)
+    assert distances[0, 0] == 0
+    assert distances[1, 2] == 0
+    assert distances[0, 1] == pytest.approx(
+        scalar_distance(60.17, 24.93, 60.175, 24.935), abs=0
+    )
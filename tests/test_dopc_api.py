@@ -4,6 +4,7 @@ from fastapi.testclient import TestClient
 from fastapi import HTTPException
 
 from app.main import app
+from app.dependencies import get_venue_service
 from app.models import DeliveryPriceResponse
 from app.utils.constants import (
     EXPECTED_CART_VALUE,
@@ -84,3 +85,19 @@ async def test_delivery_price_endpoint(
 
         response = client.get("/api/v1/delivery-order-price", params=query_params)
         assert response.status_code == expected_status
+
+
+def test_delivery_price_endpoint_with_fake_venue_api(venue_service, valid_query_params):
+    app.dependency_overrides[get_venue_service] = lambda: venue_service
+    try:
+        response = client.get("/api/v1/delivery-order-price", params=valid_query_params)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "total_price": 1190,
+        "small_order_surcharge": 0,
+        "cart_value": 1000,
+        "delivery": {"fee": 190, "distance": 176},
+    }
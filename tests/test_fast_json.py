@@ -0,0 +1,109 @@
+import json
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from app.utils.fast_json import FastJSONResponse, dumps, extract_paths
+
+COORDINATES = ("venue_raw", "location", "coordinates")
+DELIVERY_SPECS = ("venue_raw", "delivery_specs")
+
+
+@pytest.fixture
+def venue_body(venue_api_payloads):
+    """Static and dynamic payloads merged, padded with unrelated data and
+    formatted with whitespace."""
+    filler = {
+        f"field_{i}": {"name": "x" * 10, "values": list(range(5))} for i in range(50)
+    }
+    venue_raw = {
+        **filler,
+        **venue_api_payloads["static"]["venue_raw"],
+        **venue_api_payloads["dynamic"]["venue_raw"],
+    }
+    return json.dumps({"venue_raw": venue_raw, "more": filler}, indent=2).encode()
+
+
+def test_extract_paths_reads_nested_values(venue_body, venue_api_payloads):
+    coordinates, specs = extract_paths(venue_body, [COORDINATES, DELIVERY_SPECS])
+
+    venue_raw = json.loads(venue_body)["venue_raw"]
+    assert coordinates == venue_raw["location"]["coordinates"]
+    assert specs == venue_api_payloads["dynamic"]["venue_raw"]["delivery_specs"]
+
+
+def test_extract_paths_skips_keys_used_as_string_values():
+    body = b'{"venue_raw": {"note": "location", "location": {"coordinates": [1, 2]}}}'
+
+    assert extract_paths(body, [COORDINATES]) == [[1, 2]]
+
+
+@pytest.mark.parametrize(
+    "body, path, expected",
+    [
+        (
+            b'{"venue_raw":{"pickup":{"location":{"coordinates":[0,0]}},'
+            b'"location":{"coordinates":[24.93,60.17]}}}',
+            COORDINATES,
+            [24.93, 60.17],
+        ),
+        (
+            b'{"history":[{"venue_raw":{"delivery_specs":"old"}}],'
+            b'"venue_raw":{"brand":{"delivery_specs":"brand"},"delivery_specs":"venue"}}',
+            DELIVERY_SPECS,
+            "venue",
+        ),
+        (
+            b'{"venue_raw":{"note":"\\"location\\": {","location":{"coordinates":[1,2]}}}',
+            COORDINATES,
+            [1, 2],
+        ),
+    ],
+)
+def test_extract_paths_ignores_keys_at_other_depths(body, path, expected):
+    assert extract_paths(body, [path]) == [expected]
+
+
+def test_extract_paths_does_not_match_keys_of_nested_objects():
+    body = b'{"venue_raw": {"pickup": {"location": {"coordinates": [0, 0]}}}}'
+
+    with pytest.raises(KeyError):
+        extract_paths(body, [COORDINATES])
+
+
+def test_extract_paths_null_missing_and_invalid():
+    body = b'{"venue_raw": {"location": {"coordinates": null}}}'
+
+    assert extract_paths(body, [COORDINATES]) == [None]
+    with pytest.raises(KeyError):
+        extract_paths(b'{"venue_raw": {}}', [COORDINATES])
+    with pytest.raises(ValueError):
+        extract_paths(b'{"venue_raw": ', [COORDINATES])
+
+
+def test_dumps_matches_starlette_json_response():
+    content = {"total_price": 1190, "delivery": {"fee": 190}, "name": "Café"}
+
+    assert dumps(content) == JSONResponse(content).body
+    assert FastJSONResponse(content).body == JSONResponse(content).body
+
+
+@pytest.mark.asyncio
+async def test_client_get_paths(venue_body, make_http_client):
+    client = make_http_client(lambda request: httpx.Response(200, content=venue_body))
+
+    assert await client.get_paths("venue/static", COORDINATES) == [
+        json.loads(venue_body)["venue_raw"]["location"]["coordinates"]
+    ]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_rejects_invalid_json(make_http_client):
+    client = make_http_client(lambda request: httpx.Response(200, content=b"<html>"))
+
+    for call in (client.get("venue/static"), client.get_paths("venue/static", COORDINATES)):
+        with pytest.raises(HTTPException) as exc_info:
+            await call
+        assert exc_info.value.status_code == 500
+    await client.aclose()
@@ -0,0 +1,107 @@
+import json
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.dependencies import get_venue_service
+from app.services.fee_matrix import calculate_fee_matrix, stream_fee_matrix
+from app.services.delivery_fee_calculator import DeliveryFeeCalculator
+from app.models import DeliveryQueryParams
+
+
+@pytest.fixture
+def user_points(test_venue_data):
+    venue = test_venue_data["static"].location
+    rng = np.random.default_rng(0)
+    return (
+        (venue.latitude + rng.normal(0, 0.006, 500)).tolist(),
+        (venue.longitude + rng.normal(0, 0.012, 500)).tolist(),
+    )
+
+
+@pytest.fixture
+def client(venue_service):
+    app.dependency_overrides[get_venue_service] = lambda: venue_service
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_fee_matrix_matches_single_order_pipeline(test_venue_data, user_points):
+    static, dynamic = test_venue_data["static"], test_venue_data["dynamic"]
+
+    matrix = calculate_fee_matrix(static.location, dynamic.delivery_specs, *user_points)
+
+    assert matrix.available.any() and not matrix.available.all()
+    for lat, lon, distance, fee, ok in zip(*user_points, *matrix):
+        params = DeliveryQueryParams(
+            venue_slug="venue", cart_value=1000, user_lat=lat, user_lon=lon
+        )
+        calculator = DeliveryFeeCalculator(params)
+        try:
+            result = await calculator.calculate_price_for_venue(static, dynamic)
+        except HTTPException:
+            assert not ok
+            continue
+        assert ok
+        assert result.delivery.distance == distance
+        assert result.delivery.fee == fee
+
+
+def test_stream_fee_matrix_yields_one_line_per_point(test_venue_data, user_points):
+    static, dynamic = test_venue_data["static"], test_venue_data["dynamic"]
+
+    chunks = list(
+        stream_fee_matrix(static.location, dynamic.delivery_specs, *user_points, chunk_size=200)
+    )
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+
+    assert len(chunks) == 3
+    assert [row["index"] for row in rows] == list(range(500))
+    assert all((row["fee"] is None) != row["available"] for row in rows)
+
+
+def test_fee_matrix_endpoint(client, user_points):
+    response = client.post(
+        "/api/v1/venues/venue/delivery-fee-matrix",
+        json={"user_lats": user_points[0], "user_lons": user_points[1]},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["venue_slug"] == "venue"
+    assert len(body["distances"]) == len(body["fees"]) == len(body["available"]) == 500
+
+
+def test_fee_matrix_endpoint_streams_ndjson(client, user_points):
+    response = client.post(
+        "/api/v1/venues/venue/delivery-fee-matrix",
+        json={"user_lats": user_points[0], "user_lons": user_points[1]},
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert len(response.text.splitlines()) == 500
+
+
+def test_fee_matrix_endpoint_rejects_mismatched_lengths(client):
+    response = client.post(
+        "/api/v1/venues/venue/delivery-fee-matrix",
+        json={"user_lats": [60.17, 60.18], "user_lons": [24.93]},
+    )
+
+    assert response.status_code == 422
+
+
+def test_fee_matrix_endpoint_propagates_venue_errors(client, venue_api):
+    venue_api.fail("missing", 404)
+
+    response = client.post(
+        "/api/v1/venues/missing/delivery-fee-matrix",
+        json={"user_lats": [60.17], "user_lons": [24.93]},
+    )
+
+    assert response.status_code == 404
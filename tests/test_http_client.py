@@ -0,0 +1,57 @@
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.venue_service import VenueService
+from app.utils.http_client import HTTPClient
+
+
+@pytest.mark.asyncio
+async def test_get_reuses_pooled_client(make_http_client):
+    client = make_http_client(lambda request: httpx.Response(200, json={"ok": True}))
+
+    first = client.client
+    assert await client.get("venue/static") == {"ok": True}
+    assert await client.get("venue/dynamic") == {"ok": True}
+
+    assert client.client is first
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_propagates_upstream_status(make_http_client):
+    client = make_http_client(lambda request: httpx.Response(404, text="not found"))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await client.get("missing/static")
+
+    assert exc_info.value.status_code == 404
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_aclose_is_idempotent(make_http_client):
+    client = make_http_client(lambda request: httpx.Response(200, json={}))
+    await client.get("venue/static")
+
+    await client.aclose()
+    await client.aclose()
+
+    assert client._client is None
+
+
+def test_venue_service_uses_injected_client():
+    client = HTTPClient("http://venue-api/")
+
+    assert VenueService(client).client is client
+
+
+def test_lifespan_shares_and_closes_client():
+    with TestClient(app):
+        venue_service = app.state.venue_service
+        pooled = venue_service.client.client
+        assert not pooled.is_closed
+
+    assert pooled.is_closed
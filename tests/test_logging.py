@@ -0,0 +1,47 @@
+import pytest
+from app.utils.logging import SampledLogger, logger
+
+
+class ExplodingFormat:
+    def __format__(self, spec):
+        raise AssertionError("message was formatted")
+
+
+@pytest.fixture
+def messages():
+    captured = []
+    handler_id = logger.add(captured.append, level="DEBUG", format="{message}")
+    yield captured
+    logger.remove(handler_id)
+
+
+def test_full_rate_logs_every_call(messages):
+    sampled = SampledLogger(rate=1.0)
+
+    for distance in range(3):
+        sampled.info("Calculated delivery distance: {}m", distance)
+
+    assert [m.strip() for m in messages] == [
+        "Calculated delivery distance: 0m",
+        "Calculated delivery distance: 1m",
+        "Calculated delivery distance: 2m",
+    ]
+
+
+def test_zero_rate_skips_formatting(messages):
+    sampled = SampledLogger(rate=0.0)
+
+    sampled.info("value={}", ExplodingFormat())
+
+    assert messages == []
+
+
+def test_partial_rate_logs_a_fraction(messages, monkeypatch):
+    values = iter([0.05, 0.5, 0.09, 0.95])
+    monkeypatch.setattr("app.utils.logging.random.random", lambda: next(values))
+    sampled = SampledLogger(rate=0.1)
+
+    for index in range(4):
+        sampled.info("call {}", index)
+
+    assert [m.strip() for m in messages] == ["call 0", "call 2"]
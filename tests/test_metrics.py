@@ -0,0 +1,84 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app, register_cache_metrics
+from app.dependencies import get_venue_service
+from app.utils.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    STAGE_LATENCY,
+    UPSTREAM_RESPONSES,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value, "fetch")
+
+    lines = histogram.render().splitlines()
+
+    assert '# TYPE test_seconds histogram' in lines
+    assert 'test_seconds_bucket{stage="fetch",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{stage="fetch",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{stage="fetch",le="+Inf"} 4' in lines
+    assert 'test_seconds_sum{stage="fetch"} 6.05' in lines
+    assert 'test_seconds_count{stage="fetch"} 4' in lines
+
+
+def test_counter_and_gauge_render():
+    counter = Counter("test_responses", "Test", ("status",))
+    counter.inc("200")
+    counter.inc("200")
+    gauge = Gauge("test_in_flight", "Test")
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    assert 'test_responses_total{status="200"} 2' in counter.render()
+    assert "test_in_flight 1" in gauge.render()
+
+
+def test_label_values_are_escaped():
+    counter = Counter("test_escape", "Test", ("value",))
+    counter.inc('a"b\\c')
+
+    assert 'test_escape_total{value="a\\"b\\\\c"} 1' in counter.render()
+
+
+@pytest.fixture
+def client(venue_service):
+    app.dependency_overrides[get_venue_service] = lambda: venue_service
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_price_request_records_stage_metrics(client, valid_query_params):
+    stages = ("params", "static_fetch", "dynamic_fetch", "distance", "fee", "serialization")
+    before = {stage: STAGE_LATENCY.count(stage) for stage in stages}
+    upstream_before = UPSTREAM_RESPONSES.value("static", "200")
+
+    response = client.get("/api/v1/delivery-order-price", params=valid_query_params)
+
+    assert response.status_code == 200
+    for stage in stages:
+        assert STAGE_LATENCY.count(stage) == before[stage] + 1
+    assert UPSTREAM_RESPONSES.value("static", "200") == upstream_before + 1
+
+
+def test_metrics_endpoint_exposes_registry(client, venue_service, valid_query_params):
+    register_cache_metrics(venue_service)
+    client.get("/api/v1/delivery-order-price", params=valid_query_params)
+    client.get("/api/v1/delivery-order-price", params=valid_query_params)
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "dopc_stage_duration_seconds_bucket" in body
+    assert 'dopc_upstream_responses_total{endpoint="dynamic",status="200"}' in body
+    assert 'dopc_cache_hit_ratio{cache="static"} 0.5' in body
+    assert "dopc_in_flight_requests 1" in body  # the /metrics request itself
+    assert 'path="/api/v1/delivery-order-price",status="200"' in body
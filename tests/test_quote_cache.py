@@ -0,0 +1,128 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.dependencies import get_quote_cache, get_venue_service
+from app.main import app
+from app.models import (
+    DeliveryQueryParams,
+    DeliverySpecs,
+    GPSCoordinates,
+    PriceQuote,
+    VenueDynamic,
+)
+from app.services.quote_cache import QuoteCache, etag_matches
+
+URL = "/api/v1/delivery-order-price"
+
+
+@pytest.fixture
+def quote_cache():
+    return QuoteCache(ttl=60, max_size=100, precision=4)
+
+
+@pytest.fixture
+def client(venue_service, quote_cache):
+    app.dependency_overrides[get_venue_service] = lambda: venue_service
+    app.dependency_overrides[get_quote_cache] = lambda: quote_cache
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def params(**overrides):
+    values = {
+        "venue_slug": "venue",
+        "cart_value": 1000,
+        "user_lat": 60.17094,
+        "user_lon": 24.93087,
+    }
+    return DeliveryQueryParams(**{**values, **overrides})
+
+
+def test_key_rounds_coordinates(quote_cache):
+    location = GPSCoordinates(latitude=60.17, longitude=24.92)
+
+    key = quote_cache.key(params(), location, "v1")
+
+    assert quote_cache.key(params(user_lat=60.170941), location, "v1") == key
+    assert quote_cache.key(params(user_lat=60.1711), location, "v1") != key
+    assert quote_cache.key(params(cart_value=999), location, "v1") != key
+    assert quote_cache.key(params(), location, "v2") != key
+
+
+def test_put_returns_body_and_stable_etag(quote_cache):
+    quote = PriceQuote(
+        total_price=1190, small_order_surcharge=0, cart_value=1000, fee=190, distance=176
+    )
+
+    memo = quote_cache.put(("key",), quote)
+
+    assert quote_cache.get(("key",)) is memo
+    assert memo.body == (
+        b'{"total_price":1190,"small_order_surcharge":0,"cart_value":1000,'
+        b'"delivery":{"fee":190,"distance":176}}'
+    )
+    assert quote_cache.put(("other",), quote).etag == memo.etag
+
+
+def test_specs_version_follows_content(test_delivery_specs):
+    same = DeliverySpecs.model_validate(test_delivery_specs.model_dump())
+    changed = DeliverySpecs.model_validate(
+        {**test_delivery_specs.model_dump(), "base_price": 290}
+    )
+
+    assert same.compiled.version == test_delivery_specs.compiled.version
+    assert changed.compiled.version != test_delivery_specs.compiled.version
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"x", "abc"', True),
+        ("*", True),
+        ('"x"', False),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+def test_repeated_request_is_memoized(client, quote_cache, valid_query_params):
+    first = client.get(URL, params=valid_query_params)
+    second = client.get(URL, params=valid_query_params)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["delivery"] == {"fee": 190, "distance": 176}
+    assert second.content == first.content
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["cache-control"].startswith("public, max-age=")
+    assert len(quote_cache) == 1
+    assert quote_cache.stats()["hits"] == 1
+
+
+def test_matching_etag_gets_not_modified(client, valid_query_params):
+    etag = client.get(URL, params=valid_query_params).headers["etag"]
+
+    response = client.get(URL, params=valid_query_params, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_changed_specs_change_the_quote(
+    client, venue_service, test_delivery_specs, valid_query_params
+):
+    etag = client.get(URL, params=valid_query_params).headers["etag"]
+    specs = {**test_delivery_specs.model_dump(), "base_price": 290}
+    venue_service.dynamic_cache.set(
+        valid_query_params["venue_slug"],
+        VenueDynamic.model_validate({"delivery_specs": specs}),
+    )
+
+    response = client.get(URL, params=valid_query_params, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["delivery"]["fee"] == 290
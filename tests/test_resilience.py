@@ -0,0 +1,188 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import HTTPException
+from app.services.venue_service import VenueService
+from app.utils.cache import TTLCache
+from app.utils.resilience import (
+    BreakerState,
+    CircuitBreaker,
+    LatencyTracker,
+    RetryBudget,
+    backoff_delay,
+)
+
+
+def test_breaker_opens_after_consecutive_failures_and_probes_once():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10, clock=lambda: now[0])
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state is BreakerState.OPEN
+    assert not breaker.allow()
+
+    now[0] = 10
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state is BreakerState.OPEN
+
+    now[0] = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state is BreakerState.CLOSED
+    assert breaker.opened == 2
+
+
+def test_retry_budget_is_a_fraction_of_requests():
+    budget = RetryBudget(ratio=0.5, min_tokens=1, max_tokens=2)
+
+    assert budget.withdraw()
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert budget.exhausted == 1
+
+
+def test_latency_tracker_needs_min_samples():
+    tracker = LatencyTracker(window=100, min_samples=10)
+    for i in range(9):
+        tracker.record(i / 100)
+    assert tracker.percentile(0.95) is None
+
+    for i in range(9, 100):
+        tracker.record(i / 100)
+    assert tracker.percentile(0.95) == 0.95
+
+
+def test_backoff_delay_is_capped():
+    assert all(0 <= backoff_delay(attempt, 0.1, 0.3) <= 0.3 for attempt in range(1, 10))
+
+
+@pytest.mark.asyncio
+async def test_gateway_errors_are_retried(make_http_client):
+    responses = iter([503, 504, 200])
+
+    def handler(request):
+        status = next(responses)
+        return httpx.Response(status, json={"ok": True})
+
+    client = make_http_client(handler, max_retries=2)
+
+    assert await client.get("venue/static") == {"ok": True}
+    assert client.breaker("static").state is BreakerState.CLOSED
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_when_budget_is_spent(make_http_client):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503, text="unavailable")
+
+    client = make_http_client(handler, max_retries=5, retry_budget=RetryBudget(0, min_tokens=1))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await client.get("venue/static")
+
+    assert exc_info.value.status_code == 503
+    assert len(calls) == 2
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried_and_keep_breaker_closed(make_http_client):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(404, text="not found")
+
+    client = make_http_client(handler, breaker_failure_threshold=1)
+
+    for _ in range(3):
+        with pytest.raises(HTTPException):
+            await client.get("missing/static")
+
+    assert len(calls) == 3
+    assert client.breaker("static").state is BreakerState.CLOSED
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_fails_fast_per_endpoint(make_http_client):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path.endswith("static"):
+            return httpx.Response(500, text="boom")
+        return httpx.Response(200, json={})
+
+    client = make_http_client(handler, breaker_failure_threshold=2, max_retries=0)
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            await client.get("venue/static")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await client.get("venue/static")
+
+    assert exc_info.value.status_code == 503
+    assert len(calls) == 2
+    assert await client.get("venue/dynamic") == {}
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged(make_http_client):
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        # Only the first request after warm-up hangs
+        if len(calls) == 21:
+            await asyncio.sleep(10)
+        return httpx.Response(200, json={"call": len(calls)})
+
+    client = make_http_client(handler, hedge=True)
+    for _ in range(20):
+        await client.get("venue/static")
+
+    result = await asyncio.wait_for(client.get("venue/static"), timeout=1)
+
+    assert result == {"call": 22}
+    assert len(calls) == 22
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_venue_service_serves_expired_value_when_upstream_is_down(
+    venue_api, make_http_client
+):
+    now = [0.0]
+    client = make_http_client(venue_api, breaker_failure_threshold=1)
+    venue_service = VenueService(
+        client, static_cache=TTLCache(ttl=10, max_size=10, clock=lambda: now[0])
+    )
+    first = await venue_service.get_venue_static("venue")
+    venue_api.fail("venue", 500)
+    now[0] = 100
+
+    assert await venue_service.get_venue_static("venue") is first
+    # The breaker is open now, the next lookup does not reach the upstream
+    assert await venue_service.get_venue_static("venue") is first
+    assert venue_api.calls["venue/static"] == 2
+    assert venue_service.cache_stats()["static"]["error_fallbacks"] == 2
+
+    venue_api.fail("missing", 500)
+    with pytest.raises(HTTPException) as exc_info:
+        await venue_service.get_venue_static("missing")
+    assert exc_info.value.status_code == 503
+    await client.aclose()
@@ -0,0 +1,83 @@
+import pytest
+from app import server
+
+
+@pytest.fixture
+def cpu_max(tmp_path):
+    path = tmp_path / "cpu.max"
+
+    def write(content):
+        path.write_text(content)
+        return str(path)
+
+    return write
+
+
+def test_cgroup_cpu_limit(cpu_max):
+    assert server.cgroup_cpu_limit(cpu_max("150000 100000\n")) == 1.5
+    assert server.cgroup_cpu_limit(cpu_max("max 100000\n")) is None
+    assert server.cgroup_cpu_limit("/nonexistent/cpu.max") is None
+
+
+def test_available_cpus_respects_cgroup_quota(cpu_max, monkeypatch):
+    monkeypatch.setattr(server.os, "sched_getaffinity", lambda pid: set(range(8)))
+
+    assert server.available_cpus(cpu_max("150000 100000")) == 2
+    assert server.available_cpus(cpu_max("max 100000")) == 8
+    assert server.available_cpus(cpu_max("10000 100000")) == 1
+
+
+def test_resolve_workers(monkeypatch):
+    monkeypatch.setattr(server, "available_cpus", lambda: 6)
+
+    assert server.resolve_workers("auto") == 6
+    assert server.resolve_workers("3") == 3
+    with pytest.raises(ValueError):
+        server.resolve_workers("0")
+
+
+def test_server_config_production(monkeypatch):
+    monkeypatch.setattr(server, "SERVER_WORKERS", "4")
+    monkeypatch.setattr(server, "SERVER_LIMIT_MAX_REQUESTS", 0)
+    monkeypatch.setattr(server, "LOG_LEVEL", "SUCCESS")
+
+    config = server.server_config()
+
+    assert config["app"] == "app.main:app"
+    assert config["workers"] == 4
+    assert config["reload"] is False
+    assert config["limit_max_requests"] is None
+    assert config["loop"] in ("uvloop", "asyncio")
+    assert config["http"] in ("httptools", "h11")
+    assert config["log_level"] == "info"
+
+
+def test_server_config_reload_runs_single_worker(monkeypatch):
+    monkeypatch.setattr(server, "SERVER_WORKERS", "4")
+    monkeypatch.setattr(server, "SERVER_RELOAD", True)
+    monkeypatch.setattr(server, "SERVER_LIMIT_MAX_REQUESTS", 10000)
+
+    config = server.server_config()
+
+    assert config["workers"] == 1
+    assert config["reload"] is True
+    assert config["limit_max_requests"] == 10000
+
+
+def test_explicit_loop_is_kept(monkeypatch):
+    monkeypatch.setattr(server, "SERVER_LOOP", "asyncio")
+    monkeypatch.setattr(server, "SERVER_HTTP", "h11")
+
+    config = server.server_config()
+
+    assert (config["loop"], config["http"]) == ("asyncio", "h11")
+
+
+def test_webhook_without_shared_cache_warns_with_several_workers(monkeypatch):
+    monkeypatch.setattr(server, "WEBHOOK_SECRET", "secret")
+    monkeypatch.setattr(server, "CACHE_BACKEND_URL", "memory://")
+
+    assert server.worker_warnings(1) == []
+    assert len(server.worker_warnings(4)) == 1
+    monkeypatch.setattr(server, "CACHE_BACKEND_URL", "redis://cache:6379/0")
+    assert server.worker_warnings(4) == []
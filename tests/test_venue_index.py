@@ -0,0 +1,195 @@
+import random
+import pytest
+from fastapi.testclient import TestClient
+from app.dependencies import get_venue_index, get_venue_service
+from app.main import app
+from app.models import GPSCoordinates
+from app.services.distance_calculator import DistanceCalculator
+from app.services.venue_index import VenueGeoIndex
+from app.utils.cache import TTLCache
+
+NEARBY_URL = "/api/v1/venues/nearby"
+
+
+def brute_force(venues, latitude, longitude):
+    """(slug, distance, fee) of every venue delivering to the point."""
+    matches = []
+    for venue_slug, (location, specs) in venues.items():
+        distance = DistanceCalculator.haversine(
+            location.latitude, location.longitude, latitude, longitude
+        )
+        fee = specs.distance_fee(distance)
+        if distance < specs.max_allowed_distance and fee is not None:
+            matches.append((venue_slug, distance, fee))
+    return sorted(matches, key=lambda match: (match[2], match[1], match[0]))
+
+
+def random_venues(make_specs, count, seed=0):
+    rng = random.Random(seed)
+    return {
+        f"venue-{i}": (
+            GPSCoordinates(
+                latitude=60.17 + rng.uniform(-0.2, 0.2),
+                longitude=24.93 + rng.uniform(-0.4, 0.4),
+            ),
+            make_specs(
+                max_distance=rng.choice((1000, 2000, 5000)),
+                base_price=rng.randrange(100, 300),
+            ).compiled,
+        )
+        for i in range(count)
+    }
+
+
+def build_index(venues, **options):
+    index = VenueGeoIndex(**options)
+    for venue_slug, (location, specs) in venues.items():
+        index.update(venue_slug, location, specs)
+    return index
+
+
+@pytest.mark.parametrize("options", [{}, {"cell_size": 500}, {"max_cells": 4}])
+def test_nearby_matches_brute_force(options, make_specs):
+    venues = random_venues(make_specs, 2000)
+    index = build_index(venues, **options)
+    rng = random.Random(1)
+
+    for _ in range(50):
+        latitude = 60.17 + rng.uniform(-0.2, 0.2)
+        longitude = 24.93 + rng.uniform(-0.4, 0.4)
+        matches = index.nearby(latitude, longitude, cart_value=500)
+
+        found = [
+            (match.venue_slug, match.quote.distance, match.quote.fee)
+            for match in matches
+        ]
+        assert found == brute_force(venues, latitude, longitude)
+
+
+def test_nearby_prices_and_sorts(make_specs):
+    here = GPSCoordinates(latitude=60.0, longitude=25.0)
+    index = VenueGeoIndex()
+    for venue_slug, latitude, base_price in (
+        ("cheap-far", 60.01, 100),
+        ("dear-near", 60.001, 500),
+        ("too-far", 60.1, 190),
+    ):
+        index.update(
+            venue_slug,
+            GPSCoordinates(latitude=latitude, longitude=25.0),
+            make_specs(max_distance=2000, base_price=base_price).compiled,
+        )
+
+    by_fee = index.nearby(here.latitude, here.longitude, 800)
+    by_distance = index.nearby(here.latitude, here.longitude, 800, sort="distance")
+
+    assert [match.venue_slug for match in by_fee] == ["cheap-far", "dear-near"]
+    assert [match.venue_slug for match in by_distance] == ["dear-near", "cheap-far"]
+    quote = by_fee[0].quote
+    assert quote.small_order_surcharge == 200
+    assert quote.total_price == 800 + quote.fee + 200
+    assert len(index.nearby(here.latitude, here.longitude, 800, limit=1)) == 1
+
+
+def test_readd_and_remove(make_specs):
+    index = VenueGeoIndex()
+    location = GPSCoordinates(latitude=60.0, longitude=25.0)
+    specs = make_specs(max_distance=2000).compiled
+    index.update("venue", location, specs)
+    cells = index.stats()["cells"]
+
+    index.update("venue", location, specs)
+    index.update("venue", GPSCoordinates(latitude=61.0, longitude=25.0), specs)
+
+    assert len(index) == 1
+    assert index.nearby(60.0, 25.0, 1000) == []
+    assert index.nearby(61.0, 25.0, 1000)[0].venue_slug == "venue"
+    assert index.remove("venue")
+    assert index.stats() == {"venues": 0, "cells": 0, "wide_venues": 0}
+    assert cells > 0
+
+
+def test_venue_across_antimeridian(make_specs):
+    index = VenueGeoIndex()
+    location = GPSCoordinates(latitude=0.0, longitude=179.999)
+    index.update("dateline", location, make_specs(max_distance=2000).compiled)
+
+    matches = index.nearby(0.0, -179.999, 1000)
+
+    assert [match.venue_slug for match in matches] == ["dateline"]
+    assert matches[0].quote.distance < 300
+
+
+@pytest.mark.asyncio
+async def test_index_follows_venue_service(venue_api, venue_service):
+    index = VenueGeoIndex()
+    index.attach(venue_service)
+
+    await venue_service.get_venue_static("venue")
+    assert "venue" not in index
+    await venue_service.get_venue_dynamic("venue")
+    assert "venue" in index
+
+    await venue_service.invalidate_venue_data("dynamic", "venue")
+    assert "venue" not in index
+
+
+@pytest.mark.asyncio
+async def test_index_drops_evicted_and_expired_venues(venue_api, make_venue_service):
+    now = [0.0]
+    venue_service = make_venue_service(
+        venue_api,
+        static_cache=TTLCache(ttl=3600, max_size=1),
+        dynamic_cache=TTLCache(ttl=30, max_size=2, clock=lambda: now[0]),
+    )
+    index = VenueGeoIndex()
+    index.attach(venue_service)
+    for venue_slug in ("first", "second"):
+        await venue_service.get_venue_static(venue_slug)
+        await venue_service.get_venue_dynamic(venue_slug)
+
+    # Caching the second venue evicted the first one's static data
+    assert "first" not in index
+    matches = index.nearby(60.17094, 24.93087, 1000)
+    assert [match.venue_slug for match in matches] == ["second"]
+
+    now[0] = 31.0
+    assert index.nearby(60.17094, 24.93087, 1000) == []
+    assert "second" not in index
+
+
+def test_nearby_endpoint(venue_service, venue_api):
+    index = VenueGeoIndex()
+    app.dependency_overrides[get_venue_service] = lambda: venue_service
+    app.dependency_overrides[get_venue_index] = lambda: index
+    params = {
+        "venue_slug": "venue",
+        "cart_value": 1000,
+        "user_lat": 60.17094,
+        "user_lon": 24.93087,
+    }
+    try:
+        client = TestClient(app)
+        index.attach(venue_service)
+        # Pricing the venue once caches it, which indexes it
+        priced = client.get("/api/v1/delivery-order-price", params=params)
+        del params["venue_slug"]
+        response = client.get(NEARBY_URL, params={**params, "sort": "distance"})
+        invalid = client.get(NEARBY_URL, params={**params, "sort": "name"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert priced.status_code == 200
+    assert response.status_code == 200
+    assert response.json() == {
+        "venues": [
+            {
+                "venue_slug": "venue",
+                "total_price": 1190,
+                "small_order_surcharge": 0,
+                "cart_value": 1000,
+                "delivery": {"fee": 190, "distance": 176},
+            }
+        ]
+    }
+    assert invalid.status_code == 422
@@ -0,0 +1,205 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.utils.cache import TTLCache
+from app.utils.constants import EXPECTED_VENUE_LATITUDE, EXPECTED_VENUE_LONGITUDE
+from app.utils.deadline import Deadline
+
+
+@pytest.mark.asyncio
+async def test_get_venue_static_is_cached(venue_api, venue_service):
+    first = await venue_service.get_venue_static("venue")
+    second = await venue_service.get_venue_static("venue")
+
+    assert first.location.latitude == EXPECTED_VENUE_LATITUDE
+    assert first.location.longitude == EXPECTED_VENUE_LONGITUDE
+    assert second is first
+    assert venue_api.calls["venue/static"] == 1
+    assert venue_service.cache_stats()["static"]["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_static_is_served_and_refreshed(venue_api, venue_service):
+    now = [0.0]
+    venue_service.static_cache = TTLCache(
+        ttl=10, stale_ttl=100, max_size=10, clock=lambda: now[0]
+    )
+    first = await venue_service.get_venue_static("venue")
+    now[0] = 50
+
+    stale = await venue_service.get_venue_static("venue")
+    await asyncio.gather(*venue_service._refresh_tasks.values())
+
+    assert stale is first
+    assert venue_api.calls["venue/static"] == 2
+    assert venue_service.static_cache.refreshes == 1
+    assert venue_service.static_cache.get("venue") is not first
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_stale_value(venue_api, venue_service):
+    now = [0.0]
+    venue_service.static_cache = TTLCache(
+        ttl=10, stale_ttl=100, max_size=10, clock=lambda: now[0]
+    )
+    first = await venue_service.get_venue_static("venue")
+    venue_api.fail("venue", 500)
+    now[0] = 50
+
+    assert await venue_service.get_venue_static("venue") is first
+    await asyncio.gather(*venue_service._refresh_tasks.values())
+
+    assert venue_service.static_cache.refresh_failures == 1
+    assert venue_service.static_cache.peek("venue") is first
+
+
+@pytest.mark.asyncio
+async def test_static_errors_are_not_cached(venue_api, venue_service):
+    venue_api.fail("missing", 404)
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            await venue_service.get_venue_static("missing")
+        assert exc_info.value.status_code == 404
+
+    assert venue_api.calls["missing/static"] == 2
+
+
+@pytest.mark.asyncio
+async def test_get_venue_dynamic_is_cached(venue_api, venue_service):
+    first = await venue_service.get_venue_dynamic("venue")
+    second = await venue_service.get_venue_dynamic("venue")
+
+    assert second is first
+    assert first.delivery_specs.base_price == 190
+    assert venue_api.calls["venue/dynamic"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_dynamic_is_refetched(venue_api, venue_service):
+    now = [0.0]
+    venue_service.dynamic_cache = TTLCache(ttl=10, max_size=10, clock=lambda: now[0])
+    await venue_service.get_venue_dynamic("venue")
+    now[0] = 11
+
+    await venue_service.get_venue_dynamic("venue")
+
+    assert venue_api.calls["venue/dynamic"] == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_upstream_call(venue_api, venue_service):
+    venue_api.latency = 0.05
+
+    results = await asyncio.gather(
+        *(venue_service.get_venue_dynamic("venue") for _ in range(20))
+    )
+
+    assert all(result is results[0] for result in results)
+    assert venue_api.calls["venue/dynamic"] == 1
+    assert venue_service.in_flight.coalesced == 19
+
+
+@pytest.mark.asyncio
+async def test_coalesced_callers_all_receive_upstream_error(venue_api, venue_service):
+    venue_api.latency = 0.05
+    venue_api.fail("missing", 404)
+
+    results = await asyncio.gather(
+        *(venue_service.get_venue_dynamic("missing") for _ in range(5)),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, HTTPException) and r.status_code == 404 for r in results)
+    assert venue_api.calls["missing/dynamic"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call(venue_api, venue_service):
+    venue_api.latency = 0.05
+    impatient = asyncio.create_task(venue_service.get_venue_dynamic("venue"))
+    patient = asyncio.create_task(venue_service.get_venue_dynamic("venue"))
+    await asyncio.sleep(0.01)
+
+    impatient.cancel()
+    result = await patient
+
+    assert result.delivery_specs.base_price == 190
+    assert venue_api.calls["venue/dynamic"] == 1
+
+
+@pytest.mark.asyncio
+async def test_short_deadline_does_not_fail_coalesced_callers(venue_api, venue_service):
+    venue_api.latency = 0.2
+    hurried = asyncio.create_task(
+        venue_service.get_venue_dynamic("venue", Deadline(0.05))
+    )
+    await asyncio.sleep(0.01)
+    patient = asyncio.create_task(venue_service.get_venue_dynamic("venue", Deadline(5)))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await hurried
+    result = await patient
+
+    assert exc_info.value.status_code == 504
+    assert result.delivery_specs.base_price == 190
+    assert venue_api.calls["venue/dynamic"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_is_cancelled_when_its_last_caller_gives_up(venue_api, venue_service):
+    venue_api.latency = 3
+    first = asyncio.create_task(venue_service.get_venue_dynamic("venue", Deadline(0.1)))
+    second = asyncio.create_task(venue_service.get_venue_dynamic("venue", Deadline(0.2)))
+
+    for caller in (first, second):
+        with pytest.raises(HTTPException) as exc_info:
+            await caller
+        assert exc_info.value.status_code == 504
+    await asyncio.sleep(0.05)
+
+    assert venue_api.calls["venue/dynamic"] == 1
+    assert venue_api.cancelled["venue/dynamic"] == 1
+    assert len(venue_service.in_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_fetch_is_cancelled_when_every_caller_went_away(venue_api, venue_service):
+    venue_api.latency = 3
+    callers = [
+        asyncio.create_task(venue_service.get_venue_dynamic("venue")) for _ in range(2)
+    ]
+    await asyncio.sleep(0.01)
+
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0.01)
+
+    assert venue_api.cancelled["venue/dynamic"] == 1
+    assert venue_service.in_flight.abandoned == 1
+    assert len(venue_service.in_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_aclose_drains_in_flight_fetches(venue_api, venue_service):
+    venue_api.latency = 0.05
+    caller = asyncio.create_task(venue_service.get_venue_dynamic("venue"))
+    await asyncio.sleep(0.01)
+
+    await venue_service.aclose(drain_timeout=1)
+
+    assert (await caller).delivery_specs.base_price == 190
+
+
+@pytest.mark.asyncio
+async def test_aclose_cancels_fetches_after_drain_timeout(venue_api, venue_service):
+    venue_api.latency = 1
+    caller = asyncio.create_task(venue_service.get_venue_dynamic("venue"))
+    await asyncio.sleep(0.01)
+
+    await venue_service.aclose(drain_timeout=0.01)
+
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    assert len(venue_service.in_flight) == 0
@@ -0,0 +1,259 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.models import GPSCoordinates, VenueStatic
+from app.services.venue_snapshot import SnapshotRecord, VenueSnapshot
+
+
+def static_record(venue_slug, stored_at, latitude=60.0):
+    payload = VenueStatic(
+        location=GPSCoordinates(latitude=latitude, longitude=25.0)
+    ).model_dump_json()
+    return SnapshotRecord("static", venue_slug, stored_at, payload.encode())
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    return str(tmp_path / "venues.snapshot")
+
+
+def test_write_and_load(snapshot_path):
+    now = [1000.0]
+    snapshot = VenueSnapshot(snapshot_path, clock=lambda: now[0])
+
+    assert snapshot.write([static_record("a", 900.0), static_record("b", 990.0)]) == 2
+    assert snapshot.load() == 2
+    now[0] = 1010.0
+    value, age = snapshot.take("static", "a")
+
+    assert value.location.latitude == 60.0
+    assert age == 110.0
+    assert snapshot.take("static", "a") is None
+    assert ("static", "b") in snapshot
+    snapshot.discard("static", "b")
+    assert len(snapshot) == 0
+    snapshot.close()
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        lambda data: data[:-3],
+        lambda data: b"NOTSNAPS" + data[8:],
+        lambda data: b"",
+    ],
+)
+def test_invalid_snapshot_is_ignored(snapshot_path, corrupt):
+    VenueSnapshot(snapshot_path).write([static_record("a", time.time())])
+    with open(snapshot_path, "rb") as f:
+        data = f.read()
+    with open(snapshot_path, "wb") as f:
+        f.write(corrupt(data))
+
+    snapshot = VenueSnapshot(snapshot_path)
+
+    assert snapshot.load() == 0
+    assert snapshot.take("static", "a") is None
+
+
+def test_corrupt_record_is_not_restored(snapshot_path):
+    VenueSnapshot(snapshot_path).write(
+        [static_record("a", time.time()), static_record("b", time.time())]
+    )
+    with open(snapshot_path, "rb") as f:
+        data = f.read()
+    with open(snapshot_path, "wb") as f:
+        f.write(data[:-1] + bytes([data[-1] ^ 1]))  # last byte of b's payload
+
+    snapshot = VenueSnapshot(snapshot_path)
+
+    assert snapshot.load() == 2
+    assert snapshot.take("static", "b") is None
+    assert snapshot.take("static", "a")[0].location.latitude == 60.0
+    snapshot.close()
+
+
+def test_missing_snapshot_is_empty(snapshot_path):
+    assert VenueSnapshot(snapshot_path).load() == 0
+
+
+@pytest.mark.asyncio
+async def test_restart_serves_snapshot_while_upstream_is_down(
+    venue_api, snapshot_path, make_venue_service
+):
+    first = make_venue_service(venue_api, snapshot=VenueSnapshot(snapshot_path))
+    static = await first.get_venue_static("venue")
+    dynamic = await first.get_venue_dynamic("venue")
+    assert await first.save_snapshot()
+    assert not await first.save_snapshot()  # nothing changed since
+
+    venue_api.fail("venue", 503)
+    venue_api.calls.clear()
+    snapshot = VenueSnapshot(snapshot_path)
+    assert snapshot.load() == 2
+    restarted = make_venue_service(venue_api, snapshot=snapshot)
+
+    assert await restarted.get_venue_static("venue") == static
+    assert await restarted.get_venue_dynamic("venue") == dynamic
+    # Still fresh by the cache TTLs: no upstream call at all
+    assert sum(venue_api.calls.values()) == 0
+    assert restarted.cache_stats()["snapshot"]["restored"] == 2
+
+
+@pytest.mark.asyncio
+async def test_old_snapshot_data_is_only_a_fallback(
+    venue_api, snapshot_path, make_venue_service
+):
+    first = make_venue_service(venue_api, snapshot=VenueSnapshot(snapshot_path))
+    dynamic = await first.get_venue_dynamic("venue")
+    await first.save_snapshot()
+
+    venue_api.fail("venue", 503)
+    # Restarted ten minutes later: the specs are past their TTL
+    snapshot = VenueSnapshot(snapshot_path, clock=lambda: time.time() + 600)
+    snapshot.load()
+    restarted = make_venue_service(venue_api, snapshot=snapshot)
+
+    assert await restarted.get_venue_dynamic("venue") == dynamic
+    assert venue_api.calls["venue/dynamic"] >= 2
+    assert restarted.dynamic_cache.error_fallbacks == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidated_venue_is_not_restored(
+    venue_api, snapshot_path, make_venue_service
+):
+    snapshot = VenueSnapshot(snapshot_path)
+    snapshot.write([static_record("venue", time.time(), latitude=10.0)])
+    snapshot.load()
+    service = make_venue_service(venue_api, snapshot=snapshot)
+
+    await service.invalidate_venue_data("static", "venue")
+    static = await service.get_venue_static("venue")
+
+    assert static.location.latitude != 10.0
+    assert venue_api.calls["venue/static"] == 1
+
+
+@pytest.mark.asyncio
+async def test_save_carries_over_records_not_restored(
+    venue_api, snapshot_path, make_venue_service
+):
+    snapshot = VenueSnapshot(snapshot_path)
+    snapshot.write([static_record("other", time.time() - 5)])
+    snapshot.load()
+    service = make_venue_service(venue_api, snapshot=snapshot)
+
+    await service.get_venue_static("venue")
+    assert await service.save_snapshot()
+    snapshot.close()
+
+    reloaded = VenueSnapshot(snapshot_path)
+    assert reloaded.load() == 2
+    assert ("static", "other") in reloaded
+    assert ("static", "venue") in reloaded
+    reloaded.close()
+
+
+def test_workers_merge_into_one_snapshot(snapshot_path):
+    now = time.time()
+    first, second = VenueSnapshot(snapshot_path), VenueSnapshot(snapshot_path)
+
+    first.write([static_record("a", now - 10), static_record("shared", now - 10)])
+    second.write([static_record("b", now), static_record("shared", now, latitude=61.0)])
+    first.write([static_record("shared", now - 20)])  # older than the file's
+
+    snapshot = VenueSnapshot(snapshot_path)
+    assert snapshot.load() == 3
+    assert snapshot.take("static", "shared")[0].location.latitude == 61.0
+    snapshot.close()
+
+
+def test_merge_keeps_only_the_newest_records(snapshot_path):
+    now = time.time()
+    VenueSnapshot(snapshot_path).write(
+        [static_record(venue_slug, now - 30) for venue_slug in ("a", "b", "c")]
+    )
+    VenueSnapshot(snapshot_path).write(
+        [static_record("d", now), static_record("b", now - 10)], {"static": 2}
+    )
+
+    snapshot = VenueSnapshot(snapshot_path)
+    assert snapshot.load() == 2
+    assert ("static", "d") in snapshot
+    assert ("static", "b") in snapshot
+    snapshot.close()
+
+
+def test_discarded_records_are_not_merged_back(snapshot_path):
+    snapshot = VenueSnapshot(snapshot_path, clock=lambda: 1000.0)
+    snapshot.write([static_record("old", 900.0), static_record("new", 900.0)])
+    snapshot.load()
+    snapshot.discard("static", "old")
+    snapshot.discard("static", "new")
+
+    # Another worker stores newer data for one of them after the discard
+    VenueSnapshot(snapshot_path).write([static_record("new", 1010.0)])
+    snapshot.write([])
+
+    reloaded = VenueSnapshot(snapshot_path)
+    assert reloaded.load() == 1
+    assert ("static", "new") in reloaded
+    reloaded.close()
+    snapshot.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_save_finishes_before_the_next_one(
+    venue_api, snapshot_path, monkeypatch, make_venue_service
+):
+    snapshot = VenueSnapshot(snapshot_path)
+    service = make_venue_service(venue_api, snapshot=snapshot)
+    await service.get_venue_static("venue")
+    writing = threading.Lock()
+    overlapped = []
+    write = snapshot.write
+
+    def slow_write(records, max_records=None):
+        if not writing.acquire(blocking=False):
+            overlapped.append(True)
+            return write(records, max_records)
+        try:
+            time.sleep(0.1)
+            return write(records, max_records)
+        finally:
+            writing.release()
+
+    monkeypatch.setattr(snapshot, "write", slow_write)
+    periodic = asyncio.create_task(service.save_snapshot())
+    await asyncio.sleep(0.02)
+    periodic.cancel()  # as on shutdown, while its thread is writing
+    with pytest.raises(asyncio.CancelledError):
+        await periodic
+
+    await service.get_venue_dynamic("venue")
+    assert await service.save_snapshot()
+
+    assert overlapped == []
+    assert snapshot.load() == 2
+    snapshot.close()
+
+
+def test_lifespan_loads_and_saves_snapshot(monkeypatch, snapshot_path):
+    VenueSnapshot(snapshot_path).write([static_record("venue", time.time())])
+    monkeypatch.setattr("app.main.SNAPSHOT_PATH", snapshot_path)
+    pushed = VenueStatic(location=GPSCoordinates(latitude=61.0, longitude=25.0))
+
+    with TestClient(app) as client:
+        venue_service = app.state.venue_service
+        assert ("static", "venue") in venue_service.snapshot
+        client.portal.call(venue_service.replace_venue_data, "static", "pushed", pushed)
+
+    # Shutdown rewrote the file: the record not restored and the pushed venue
+    reloaded = VenueSnapshot(snapshot_path)
+    assert reloaded.load() == 2
+    assert reloaded.take("static", "pushed")[0] == pushed
+    reloaded.close()
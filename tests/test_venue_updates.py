@@ -0,0 +1,197 @@
+import asyncio
+import json
+import time
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.dependencies import get_venue_service
+from app.main import app
+from app.models import VenueDynamic
+from app.utils.cache_backends import MemoryCacheBackend
+from app.utils.webhook import sign, verify_signature
+
+SECRET = "test-secret"
+URL = "/internal/v1/venue-updates"
+
+
+@pytest.fixture
+def client(monkeypatch, venue_service):
+    monkeypatch.setattr("app.dependencies.WEBHOOK_SECRET", SECRET)
+    app.dependency_overrides[get_venue_service] = lambda: venue_service
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def post_signed(client, payload, secret=SECRET, timestamp=None):
+    body = json.dumps(payload).encode()
+    timestamp = str(int(time.time())) if timestamp is None else timestamp
+    return client.post(
+        URL,
+        content=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-DOPC-Timestamp": timestamp,
+            "X-DOPC-Signature": sign(secret, timestamp, body),
+        },
+    )
+
+
+def test_verify_signature_rejects_tampering_and_replays():
+    body = b'{"venue_slug": "venue"}'
+    signature = sign(SECRET, "1000", body)
+
+    verify_signature(SECRET, body, "1000", signature, 300, now=1100)
+    for args in (
+        (b'{"venue_slug": "other"}', "1000", signature, 1100),
+        (body, "1000", signature, 2000),
+        (body, None, signature, 1100),
+        (body, "soon", signature, 1100),
+    ):
+        with pytest.raises(HTTPException) as exc_info:
+            verify_signature(SECRET, args[0], args[1], args[2], 300, now=args[3])
+        assert exc_info.value.status_code == 401
+
+
+def test_update_replaces_static_data(client, venue_api, venue_service):
+    response = post_signed(
+        client,
+        {
+            "venue_slug": "venue",
+            "static": {"location": {"latitude": 60.2, "longitude": 24.9}},
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "venue_slug": "venue", "replaced": ["static"], "invalidated": []
+    }
+    static = asyncio.run(venue_service.get_venue_static("venue"))
+    assert static.location.latitude == 60.2
+    assert venue_api.calls["venue/static"] == 0
+
+
+def test_update_invalidates_dynamic_data(client, venue_api, venue_service):
+    asyncio.run(venue_service.get_venue_dynamic("venue"))
+
+    response = post_signed(client, {"venue_slug": "venue", "invalidate": ["dynamic"]})
+
+    assert response.json()["invalidated"] == ["dynamic"]
+    asyncio.run(venue_service.get_venue_dynamic("venue"))
+    assert venue_api.calls["venue/dynamic"] == 2
+
+
+def test_update_rejects_invalid_delivery_specs(client, venue_service):
+    specs = {
+        "order_minimum_no_surcharge": 1000,
+        "base_price": 190,
+        "distance_ranges": [
+            {"min": 0, "max": 500, "a": 0, "b": 0},
+            {"min": 600, "max": 0, "a": 0, "b": 0},
+        ],
+    }
+
+    response = post_signed(
+        client, {"venue_slug": "venue", "dynamic": {"delivery_specs": specs}}
+    )
+
+    assert response.status_code == 422
+    assert "venue" not in venue_service.dynamic_cache
+
+
+@pytest.mark.parametrize(
+    "payload, status_code",
+    [({"venue_slug": "venue"}, 422), ({"venue_slug": "venue", "invalidate": ["x"]}, 422)],
+)
+def test_update_validates_payload(client, payload, status_code):
+    assert post_signed(client, payload).status_code == status_code
+
+
+def test_update_requires_valid_signature(client):
+    payload = {"venue_slug": "venue", "invalidate": ["static"]}
+
+    assert post_signed(client, payload, secret="wrong").status_code == 401
+    assert client.post(URL, json=payload).status_code == 401
+
+
+def test_update_endpoint_disabled_without_secret(client, monkeypatch):
+    monkeypatch.setattr("app.dependencies.WEBHOOK_SECRET", "")
+
+    response = post_signed(client, {"venue_slug": "venue", "invalidate": ["static"]})
+
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_pushed_update_notifies_listeners_and_shared_cache(venue_api, venue_service):
+    venue_service.shared_cache = MemoryCacheBackend()
+    events = []
+    venue_service.add_listener(lambda kind, slug: events.append((kind, slug)))
+    static = await venue_service.get_venue_static("venue")
+    key = venue_service._shared_key("static", "venue")
+    assert await venue_service.shared_cache.get(key) is not None
+
+    assert await venue_service.invalidate_venue_data("static", "venue")
+    await venue_service.replace_venue_data("static", "other", static)
+
+    assert events == [("static", "venue"), ("static", "other")]
+    assert await venue_service.shared_cache.get(key) is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_racing_an_update_is_not_cached(venue_api, venue_service):
+    venue_api.latency = 0.05
+    fetch = asyncio.create_task(venue_service.get_venue_static("venue"))
+    await asyncio.sleep(0.01)
+
+    await venue_service.invalidate_venue_data("static", "venue")
+    await fetch
+
+    assert "venue" not in venue_service.static_cache
+
+
+@pytest.mark.asyncio
+async def test_update_pushed_to_one_worker_reaches_the_others(
+    venue_api, test_delivery_specs, make_venue_service
+):
+    backend = MemoryCacheBackend()
+    receiving = make_venue_service(
+        venue_api, shared_cache=backend, update_check_interval=0
+    )
+    other = make_venue_service(
+        venue_api, shared_cache=backend, update_check_interval=0
+    )
+    await other.get_venue_static("venue")
+    await other.get_venue_dynamic("venue")
+    await other.get_venue_dynamic("venue")  # a check without any update
+
+    updated = test_delivery_specs.model_copy(update={"base_price": 300})
+    await receiving.replace_venue_data(
+        "dynamic", "venue", VenueDynamic(delivery_specs=updated)
+    )
+    await receiving.invalidate_venue_data("static", "venue")
+    dynamic = await other.get_venue_dynamic("venue")
+    await other.get_venue_static("venue")
+
+    assert dynamic.delivery_specs.base_price == 300
+    # The pushed specs come from the shared cache, the static data from upstream
+    assert venue_api.calls["venue/dynamic"] == 1
+    assert venue_api.calls["venue/static"] == 2
+
+
+@pytest.mark.asyncio
+async def test_other_workers_check_for_updates_once_per_interval(
+    venue_api, test_delivery_specs, make_venue_service
+):
+    backend = MemoryCacheBackend()
+    receiving = make_venue_service(venue_api, shared_cache=backend)
+    other = make_venue_service(
+        venue_api, shared_cache=backend, update_check_interval=60
+    )
+    cached = await other.get_venue_dynamic("venue")
+
+    updated = test_delivery_specs.model_copy(update={"base_price": 300})
+    await receiving.replace_venue_data(
+        "dynamic", "venue", VenueDynamic(delivery_specs=updated)
+    )
+
+    assert await other.get_venue_dynamic("venue") is cached
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.warmup import VenueWarmup
+
+
+@pytest.fixture
+def client():
+    # Lifespan runs elsewhere in the suite leave their warm-up behind
+    app.state._state.pop("warmup", None)
+    yield TestClient(app)
+    app.state._state.pop("warmup", None)
+
+
+@pytest.mark.asyncio
+async def test_warmup_fills_venue_caches(venue_api, venue_service):
+    venue_api.fail("closed", 404)
+    warmup = VenueWarmup(venue_service, ["a", "b", "closed", "a"])
+
+    await warmup.run()
+
+    assert warmup.done
+    assert sorted(warmup.warmed) == ["a", "b"]
+    assert warmup.failed == {"closed": 404}
+    assert warmup.progress()["ready"]
+    assert warmup.progress()["total"] == 3
+    await venue_service.get_venue_static("a")
+    await venue_service.get_venue_dynamic("b")
+    assert venue_api.calls["a/static"] == 1
+    assert venue_api.calls["b/dynamic"] == 1
+
+
+@pytest.mark.asyncio
+async def test_warmup_bounds_concurrency(venue_api, make_venue_service):
+    in_flight = 0
+    peak = 0
+
+    async def counting_handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return await venue_api(request)
+        finally:
+            in_flight -= 1
+
+    venue_service = make_venue_service(counting_handler)
+    warmup = VenueWarmup(venue_service, [f"venue-{i}" for i in range(10)], max_concurrency=2)
+
+    await warmup.run()
+
+    assert len(warmup.warmed) == 10
+    # Two venues at a time, each fetching static and dynamic together
+    assert peak == 4
+
+
+@pytest.mark.asyncio
+async def test_warmup_timeout_still_finishes(venue_api, venue_service):
+    venue_api.latency = 1
+    warmup = VenueWarmup(venue_service, ["slow"], timeout=0.01)
+
+    await warmup.run()
+
+    assert warmup.done
+    assert warmup.timed_out
+    assert warmup.warmed == []
+    await venue_service.aclose()
+
+
+@pytest.mark.asyncio
+async def test_readiness_reflects_warmup_progress(client, venue_service):
+    warmup = VenueWarmup(venue_service, ["venue"])
+    app.state.warmup = warmup
+
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["ready"] is False
+
+    await warmup.run()
+
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["warmed"] == 1
+
+
+def test_readiness_without_warmup(client):
+    response = client.get("/health/ready")
+
+    assert response.status_code == 200
+    assert response.json() == {"ready": True}